@@ -0,0 +1,58 @@
+"""Local stand-in for the alert webhook.
+
+Run it, then start the dashboard pointing at it:
+
+    python alert_receiver.py --port 8765
+    NYT_ALERT_WEBHOOK_URL=http://localhost:8765/alerts streamlit run streamlit_app.py
+
+Every alert batch the dashboard posts is printed and appended to a JSONL log.
+"""
+import argparse
+import json
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class AlertHandler(BaseHTTPRequestHandler):
+    log_path = 'received_alerts.jsonl'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_response(400)
+            self.end_headers()
+            return
+
+        received_at = datetime.now().isoformat(timespec='seconds')
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            for alert in payload.get('alerts', []):
+                print(f"[{received_at}] {alert.get('rule')}: {alert.get('title')}")
+                f.write(json.dumps({'received_at': received_at, **alert}) + '\n')
+
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Alerts are printed above; skip the per-request access log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in receiver for dashboard alert webhooks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--log', default=AlertHandler.log_path, help="JSONL file receiving alerts")
+    args = parser.parse_args()
+
+    AlertHandler.log_path = args.log
+    server = ThreadingHTTPServer((args.host, args.port), AlertHandler)
+    print(f"Listening for alerts on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
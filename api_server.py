@@ -0,0 +1,272 @@
+"""Local JSON API over the dashboard's enriched article stream.
+
+Shares the dashboard's history log (data/articles.jsonl, or $NYT_DASHBOARD_DATA),
+so articles ingested by either process show up in both:
+
+    python api_server.py --port 8502            # follow what the dashboard ingests
+    python api_server.py --port 8502 --fetch    # also poll the NYT feed itself
+
+Endpoints (all GET):
+    /api/articles     paginated articles, newest first
+                      ?limit=50&offset=0&category=&sentiment=&q=&since=<epoch>&until=<epoch>
+    /api/aggregates   sentiment/category/entity counts and sentiment windows ?days=7
+    /api/updates      long-poll for articles ingested after a sequence number ?after=0&timeout=25
+                      (&revision=<n> also returns articles reworded after that store revision)
+    /api/stream       server-sent events, one `article` event per new article (honours Last-Event-ID)
+                      and a `revision` event per reworded one
+    /api/health       store size, version and revision
+
+Every JSON response carries an ETag derived from the store revision and the query,
+so clients polling with If-None-Match get a 304 until something is ingested or reworded.
+/api/aggregates also changes its ETag every TIME_BUCKET_SECONDS, as its rolling
+windows move with the clock.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from streamlit_app import (
+    CACHE_POLICY,
+    SENTIMENT_WINDOWS,
+    BoundedCache,
+    FeedTracker,
+    day_number,
+    feed_source,
+    fetch_nyt_politics_feed,
+    get_article_store,
+    get_taxonomy_loader,
+    register_cache,
+)
+
+# Fields exposed for each article
+ARTICLE_FIELDS = ('title', 'link', 'published', 'published_ts', 'summary', 'summary_text',
+                  'sentiment', 'polarity', 'summary_sentiment', 'summary_polarity', 'category', 'entities')
+
+MAX_PAGE_SIZE = 500
+MAX_POLL_TIMEOUT = 60
+
+# Endpoints whose answer also depends on the clock (rolling windows), and how
+# long one of their responses stays valid without new articles
+TIME_RELATIVE_ENDPOINTS = {'/api/aggregates'}
+TIME_BUCKET_SECONDS = 300
+
+# The store's revision counter restarts with the process; ETags carry the start time too
+STARTED = f"{int(time.time()):x}"
+
+
+def article_json(article, seq=None):
+    item = {field: article.get(field) for field in ARTICLE_FIELDS}
+    if seq is not None:
+        item['seq'] = seq
+    return item
+
+
+def query_articles(store, params):
+    """Filtered page of articles, newest first"""
+    limit = min(int(params.get('limit', 50)), MAX_PAGE_SIZE)
+    offset = int(params.get('offset', 0))
+    if limit < 0 or offset < 0:
+        raise ValueError("limit and offset must not be negative")
+    category = params.get('category')
+    sentiment = params.get('sentiment')
+    text = params.get('q', '').lower()
+    since = float(params['since']) if 'since' in params else None
+    until = float(params['until']) if 'until' in params else None
+
+    with store.lock:
+        articles = list(store.articles.values())
+    matches = [
+        a for a in articles
+        if (not category or a['category'] == category)
+        and (not sentiment or a['sentiment'] == sentiment)
+        and (since is None or a['published_ts'] >= since)
+        and (until is None or a['published_ts'] < until)
+        and (not text or text in a['title'].lower() or text in a.get('summary_text', a.get('summary', '')).lower())
+    ]
+    matches.sort(key=lambda a: a['published_ts'], reverse=True)
+    page = matches[offset:offset + limit]
+    return {
+        'total': len(matches),
+        'offset': offset,
+        'next_offset': offset + len(page) if offset + len(page) < len(matches) else None,
+        'items': [article_json(a) for a in page],
+    }
+
+
+def query_aggregates(store, params):
+    """Counts over the last N days plus the overall sentiment windows"""
+    days = max(int(params.get('days', 7)), 1)
+    today = day_number(time.time())
+    sentiments, categories = Counter(), Counter()
+    with store.lock:
+        for digest in store.briefings.digests(today, days):
+            sentiments.update(digest.sentiments)
+            categories.update(digest.categories)
+        entities = store.cooccurrence.mention_counts(days=days, today=today)
+        overall = store.timeseries.series.get('All')
+        windows = {}
+        if overall is not None:
+            for label, seconds in SENTIMENT_WINDOWS.items():
+                mean, count = overall.window(seconds)
+                windows[label] = {'mean_polarity': mean, 'articles': count}
+        ewma = overall.ewma if overall is not None else None
+    return {
+        'days': days,
+        'articles': sum(sentiments.values()),
+        'sentiments': dict(sentiments),
+        'categories': dict(categories.most_common()),
+        'entities': dict(entities.most_common(50)),
+        'sentiment_windows': windows,
+        'sentiment_ewma': ewma,
+    }
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    store = None
+    cache = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        routes = {
+            '/api/articles': query_articles,
+            '/api/aggregates': query_aggregates,
+            '/api/health': lambda store, params: {'articles': len(store.articles), 'version': store.version,
+                                                  'revision': store.revision},
+        }
+        try:
+            if url.path in routes:
+                self.send_cached(url, params, routes[url.path])
+            elif url.path == '/api/updates':
+                self.send_updates(params)
+            elif url.path == '/api/stream':
+                self.send_stream()
+            else:
+                self.send_json(404, {'error': f"Unknown endpoint {url.path}"})
+        except (ValueError, KeyError) as e:
+            self.send_json(400, {'error': str(e)})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away
+
+    def send_cached(self, url, params, build):
+        # The ETag only depends on the store revision and the query (plus the
+        # time bucket for rolling windows), so a revalidation costs nothing
+        # until new, reworded or retagged articles arrive
+        query_hash = hashlib.blake2b(f"{url.path}?{sorted(params.items())}".encode(), digest_size=8).hexdigest()
+        etag = f'"{STARTED}-{self.store.revision}-{query_hash}"'
+        if url.path in TIME_RELATIVE_ENDPOINTS:
+            etag = f'"{STARTED}-{self.store.revision}-{query_hash}-{int(time.time() // TIME_BUCKET_SECONDS)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = self.cache.get_or_build(etag, lambda: json.dumps(build(self.store, params)).encode('utf-8'))
+        self.send_body(200, body, etag)
+
+    def send_updates(self, params):
+        after = int(params.get('after', 0))
+        # Clients passing the revision they last saw also get reworded articles
+        revision = int(params['revision']) if 'revision' in params else None
+        timeout = min(float(params.get('timeout', 25)), MAX_POLL_TIMEOUT)
+        self.store.wait_for_change(after, revision, timeout)
+        items = [article_json(a, seq) for seq, a in self.store.since(after, limit=MAX_PAGE_SIZE)]
+        payload = {'after': after, 'latest': items[-1]['seq'] if items else after, 'items': items,
+                   'revision': self.store.revision}
+        if revision is not None:
+            payload['revised'] = [dict(article_json(a), revision=rev) for rev, a in self.store.revised_since(revision)]
+        self.send_json(200, payload)
+
+    def send_stream(self):
+        last = int(self.headers.get('Last-Event-ID', self.store.version))
+        last_revision = self.store.revision
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        while True:
+            if self.store.wait_for_change(last, last_revision, 15):
+                for seq, article in self.store.since(last):
+                    self.wfile.write(f"id: {seq}\nevent: article\ndata: {json.dumps(article_json(article, seq))}\n\n".encode('utf-8'))
+                    last = seq
+                # Read first: a revision landing while these are sent is picked up next round
+                latest_revision = self.store.revision
+                # No id: Last-Event-ID keeps counting articles
+                for revision, article in self.store.revised_since(last_revision):
+                    self.wfile.write(f"event: revision\ndata: {json.dumps(article_json(article))}\n\n".encode('utf-8'))
+                    latest_revision = max(latest_revision, revision)
+                last_revision = latest_revision
+            else:
+                self.wfile.write(b": keep-alive\n\n")
+            self.wfile.flush()
+
+    def send_json(self, status, payload):
+        self.send_body(status, json.dumps(payload).encode('utf-8'))
+
+    def send_body(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def follow(store, interval, fetch):
+    """Keep the store current: read other processes' history and optionally poll the feed"""
+    # In memory only: the dashboard owns the persisted tracker file
+    tracker = FeedTracker()
+    while True:
+        try:
+            store.apply_taxonomy(get_taxonomy_loader().check())
+            store.catch_up()
+            if fetch:
+                articles, _ = fetch_nyt_politics_feed(feed_source())
+                delta = tracker.diff(articles)
+                if delta.revised:
+                    store.revise(delta.revised)
+                if delta:
+                    store.ingest(articles)
+        except Exception as e:
+            print(f"Update failed: {str(e)}")
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON API over the enriched NYT politics stream")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8502)
+    parser.add_argument('--interval', type=float, default=5, help="seconds between history log checks")
+    parser.add_argument('--fetch', action='store_true', help="poll the NYT feed too, not just the shared history")
+    args = parser.parse_args()
+
+    store = get_article_store()
+    ApiHandler.store = store
+    ApiHandler.cache = register_cache(BoundedCache('api_responses', **CACHE_POLICY['api_responses']))
+    threading.Thread(target=follow, args=(store, args.interval, args.fetch), daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), ApiHandler)
+    server.daemon_threads = True
+    print(f"Serving {len(store.articles)} articles on http://{args.host}:{args.port}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
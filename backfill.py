@@ -0,0 +1,190 @@
+"""Import archived RSS snapshots of the NYT feed into the dashboard's history.
+
+    python backfill.py /archive/nyt-politics                  # every *.xml / *.rss (optionally .gz) below it
+    python backfill.py /archive/nyt-politics --workers 8 --batch-files 500
+    python backfill.py data/recordings --data /tmp/nyt-data   # into another data directory
+
+Files are handled in batches, oldest name first. Each batch is parsed in a
+process pool (--chunk-files snapshots per task). Articles are deduplicated
+by link against the batch and everything already stored, so only the
+first-seen version of each article is kept. The new ones are enriched in
+the same pool (reusing the enrichment cache) and loaded through the store
+in one ingest. That appends to the history log and the Arrow archive,
+where the dashboard and API server pick them up.
+
+Completed files are recorded in a checkpoint after every batch, so an
+interrupted run resumes where it stopped (--restart ignores it). Progress
+is printed per batch, and a throughput summary at the end.
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SNAPSHOT_SUFFIXES = ('.xml', '.rss', '.xml.gz', '.rss.gz')
+
+
+def find_snapshots(root):
+    """Snapshot files below `root`, sorted by path (recordings are named by capture time)"""
+    paths = []
+    for directory, _, files in os.walk(root):
+        paths += [os.path.join(directory, name) for name in files if name.endswith(SNAPSHOT_SUFFIXES)]
+    return sorted(paths)
+
+
+def captured_at(path):
+    """When a snapshot was taken: the epoch-ms file name of a recording, else its mtime"""
+    stem = os.path.basename(path).split('.')[0]
+    return int(stem) / 1000 if stem.isdigit() else os.path.getmtime(path)
+
+
+def parse_snapshots(paths):
+    """Worker task: articles from a chunk of snapshot files, first version of each link only"""
+    import feedparser
+    from streamlit_app import parse_feed
+
+    articles, seen, failed = [], set(), []
+    for path in paths:
+        try:
+            with (gzip.open if path.endswith('.gz') else open)(path, 'rb') as f:
+                feed = feedparser.parse(f.read())
+        except OSError as e:
+            failed.append((path, str(e)))
+            continue
+        if feed.bozo and not feed.entries:
+            failed.append((path, str(feed.get('bozo_exception', 'not a feed'))))
+            continue
+        entries, _ = parse_feed(feed)
+        for article in entries:
+            key = article['link'] or article['title']
+            if key in seen:
+                continue
+            seen.add(key)
+            if not article['published_parsed']:
+                # Undated entries count as published when the snapshot was taken
+                article['published_ts'] = int(captured_at(path))
+            articles.append(article)
+    return articles, failed
+
+
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding='utf-8') as f:
+        return set(json.load(f)['done'])
+
+
+def save_checkpoint(path, done):
+    """Atomically replaced, so a crash mid-write keeps the previous checkpoint"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'done': sorted(done), 'updated': time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+def backfill(args):
+    if args.data:
+        # The store's paths are read from the environment at import time
+        os.environ['NYT_DASHBOARD_DATA'] = args.data
+    from streamlit_app import DATA_DIR, enrich_articles, get_article_store
+
+    checkpoint = args.checkpoint or os.path.join(DATA_DIR, 'backfill_checkpoint.json')
+    done = set() if args.restart else load_checkpoint(checkpoint)
+    root = os.path.abspath(args.source)
+    paths = [p for p in find_snapshots(root) if os.path.relpath(p, root) not in done]
+    if not paths:
+        print(f"Nothing to import from {root} ({len(done)} files already done)")
+        return
+
+    store = get_article_store()
+    # A warm start indexes the log tail in the background; dedupe against all of it
+    for thread in threading.enumerate():
+        if thread.name == 'store-catch-up':
+            thread.join()
+    print(f"{len(paths)} snapshot files to import ({len(done)} done earlier); "
+          f"store has {store.version} articles")
+
+    totals = {'files': 0, 'parsed': 0, 'new': 0, 'failed': 0, 'parse_s': 0.0, 'enrich_s': 0.0, 'load_s': 0.0}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for first in range(0, len(paths), args.batch_files):
+            batch = paths[first:first + args.batch_files]
+
+            t0 = time.perf_counter()
+            chunks = [batch[i:i + args.chunk_files] for i in range(0, len(batch), args.chunk_files)]
+            parsed, seen = [], set()
+            # map keeps chunk order, so "first seen" follows the file order
+            for articles, failed in pool.map(parse_snapshots, chunks):
+                for path, error in failed:
+                    print(f"Skipping {path}: {error}")
+                totals['failed'] += len(failed)
+                totals['parsed'] += len(articles)
+                for article in articles:
+                    key = article['link'] or article['title']
+                    if key not in seen:
+                        seen.add(key)
+                        parsed.append(article)
+            with store.lock:
+                fresh = [a for a in parsed if (a['link'] or a['title']) not in store.articles]
+
+            t1 = time.perf_counter()
+            # Scores the misses in the pool and fills the enrichment cache, so the ingest below reuses them
+            enrich_articles(fresh, store.taxonomy, store.enrichment_cache,
+                            pool_min_batch=args.pool_min_batch, pool=pool)
+            t2 = time.perf_counter()
+            before = store.version
+            store.ingest(fresh)
+            t3 = time.perf_counter()
+
+            done.update(os.path.relpath(p, root) for p in batch)
+            save_checkpoint(checkpoint, done)
+
+            totals['files'] += len(batch)
+            totals['new'] += store.version - before
+            totals['parse_s'] += t1 - t0
+            totals['enrich_s'] += t2 - t1
+            totals['load_s'] += t3 - t2
+            elapsed = time.perf_counter() - start
+            rate = totals['files'] / elapsed
+            print(f"[{totals['files']}/{len(paths)} files] +{store.version - before} articles "
+                  f"({len(parsed)} distinct in batch), {rate:.0f} files/s, "
+                  f"{totals['new'] / elapsed:.0f} new articles/s, "
+                  f"ETA {(len(paths) - totals['files']) / rate:.0f}s")
+
+    # Dashboards started after this warm-start from the backfilled state
+    store.save_snapshot()
+    wall = time.perf_counter() - start
+    print(f"Imported {totals['new']} new articles from {totals['files']} files "
+          f"({totals['parsed']} entries, {totals['failed']} unreadable files) in {wall:.1f}s; "
+          f"store now has {store.version} articles")
+    print(f"{'stage':<10}{'seconds':>10}{'share':>8}")
+    for stage in ('parse_s', 'enrich_s', 'load_s'):
+        print(f"{stage[:-2]:<10}{totals[stage]:>10.2f}{totals[stage] / wall * 100:>7.0f}%")
+    print(f"throughput: {totals['files'] / wall:.1f} files/s, {totals['parsed'] / wall:.0f} entries/s, "
+          f"{totals['new'] / wall:.0f} new articles/s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(dict(totals, wall_s=wall, articles=store.version), f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the article history from archived RSS snapshots")
+    parser.add_argument('source', help="directory of snapshot files (searched recursively)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--batch-files', type=int, default=200, help="files parsed, deduplicated and loaded together")
+    parser.add_argument('--chunk-files', type=int, default=10, help="files per worker task")
+    parser.add_argument('--pool-min-batch', type=int, default=50,
+                        help="enrich in the pool when a batch has at least this many new articles")
+    parser.add_argument('--data', help="data directory to load into (default: NYT_DASHBOARD_DATA or data)")
+    parser.add_argument('--checkpoint', help="progress file (default: <data>/backfill_checkpoint.json)")
+    parser.add_argument('--restart', action='store_true', help="ignore the checkpoint and look at every file again")
+    parser.add_argument('--json', help="also write the throughput summary to this file")
+    backfill(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark phrase extraction on a large synthetic headline corpus.
+
+    python benchmarks/bench_phrases.py --titles 200000
+
+Compares the packed-id PhraseCounter against a plain Counter keyed by word
+tuples (same tokenizer), and reports counting throughput, memory held by the
+counts, ranking time, and the cost of an incremental update.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadtest import synthetic_title  # noqa: E402
+from streamlit_app import MAX_PHRASE_WORDS, PhraseCounter, phrase_runs  # noqa: E402
+
+
+def tuple_counts(titles):
+    """Baseline: n-grams as tuples of strings"""
+    counts = Counter()
+    for title in titles:
+        for run in phrase_runs(title):
+            for start in range(len(run)):
+                for n in range(1, min(MAX_PHRASE_WORDS, len(run) - start) + 1):
+                    counts[tuple(run[start:start + n])] += 1
+    return counts
+
+
+def measure(build):
+    """(result, seconds, MB allocated and still held)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, held / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark n-gram phrase counting")
+    parser.add_argument('--titles', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=100, help="titles per incremental update")
+    parser.add_argument('--vocab', type=int, default=20000, help="extra rare words mixed into titles")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # Template headlines plus a long tail of rare names, like real bylines and places
+    rare = [''.join(rng.choice('bcdfghklmnprstvz') + rng.choice('aeiou') for _ in range(3)).title()
+            for _ in range(args.vocab)]
+
+    def headline():
+        return f"{synthetic_title(rng)} in {rng.choice(rare)} {rng.choice(rare)}"
+
+    titles = [headline() for _ in range(args.titles)]
+
+    def packed():
+        counter = PhraseCounter()
+        for title in titles:
+            counter.add(title)
+        return counter
+
+    counter, packed_s, packed_mb = measure(packed)
+    baseline, tuple_s, tuple_mb = measure(lambda: tuple_counts(titles))
+    print(f"{args.titles} titles, {len(counter.counts)} distinct n-grams, {len(counter.vocab)} words")
+    print(f"{'':<14}{'seconds':>10}{'titles/s':>12}{'MB held':>10}")
+    print(f"{'packed ids':<14}{packed_s:>10.2f}{args.titles / packed_s:>12.0f}{packed_mb:>10.1f}")
+    print(f"{'word tuples':<14}{tuple_s:>10.2f}{args.titles / tuple_s:>12.0f}{tuple_mb:>10.1f}")
+    assert len(baseline) == len(counter.counts)
+
+    start = time.perf_counter()
+    top = counter.top_phrases(20)
+    print(f"top_phrases over the full corpus: {(time.perf_counter() - start) * 1000:.0f} ms")
+    print("  " + ", ".join(f"{phrase} ({count})" for phrase, count in top[:10]))
+
+    batch = [headline() for _ in range(args.batch)]
+    start = time.perf_counter()
+    for title in batch:
+        counter.add(title)
+    print(f"incremental add of {args.batch} titles: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    window = PhraseCounter()
+    for title in titles[-500:]:
+        window.add(title)
+    start = time.perf_counter()
+    window.top_phrases(30, reference=counter)
+    print(f"top_phrases over a 500-title window against the corpus: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
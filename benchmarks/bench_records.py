@@ -0,0 +1,99 @@
+"""Memory per stored article: enriched dicts versus ArticleRecord.
+
+    python benchmarks/bench_records.py --articles 200000
+
+Articles are built the way the store used to hold them: one dict per
+article, with the feed's struct_time, loaded from JSON lines (so every
+'Positive' or category string is its own object). The same articles are
+then held as ArticleRecords. Memory is what tracemalloc sees allocated by
+each collection, divided by the number of articles.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadtest import synthetic_title  # noqa: E402
+from streamlit_app import (  # noqa: E402
+    SENTIMENT_LABELS,
+    ArticleRecord,
+    current_taxonomy,
+    find_entities,
+)
+
+
+def json_lines(count, seed):
+    """History-log lines shaped like enriched articles"""
+    rng = random.Random(seed)
+    categories = current_taxonomy().category_names + ['📰 General']
+    now = time.time()
+    lines = []
+    for i in range(count):
+        title = synthetic_title(rng)
+        summary = f"<p>{title}. Lawmakers said the <b>proposal</b> faces a difficult path.</p>"
+        published_ts = int(now - rng.uniform(0, 365 * 86400))
+        lines.append(json.dumps({
+            'title': title,
+            'link': f"https://www.nytimes.com/2026/bench/{i}.html",
+            'published': time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(published_ts)),
+            'summary': summary,
+            'summary_text': f"{title}. Lawmakers said the proposal faces a difficult path.",
+            'published_ts': published_ts,
+            'sentiment': rng.choice(SENTIMENT_LABELS),
+            'polarity': rng.uniform(-1, 1),
+            'summary_sentiment': rng.choice(SENTIMENT_LABELS),
+            'summary_polarity': rng.uniform(-1, 1),
+            'category': rng.choice(categories),
+            'entities': find_entities(title),
+            'enrichment_version': 2,
+            'taxonomy': current_taxonomy().tag,
+        }))
+    return lines
+
+
+def as_dict(line):
+    article = json.loads(line)
+    # What feedparser hands us and the old store kept on every article
+    article['published_parsed'] = time.gmtime(article['published_ts'])
+    return article
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = build()
+    elapsed = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, held, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory per article for dicts and ArticleRecords")
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    lines = json_lines(args.articles, args.seed)
+    dicts, dict_bytes, dict_s = measure(lambda: [as_dict(line) for line in lines])
+    del dicts
+    records, record_bytes, record_s = measure(lambda: [ArticleRecord.from_dict(json.loads(line)) for line in lines])
+
+    print(f"{args.articles} articles")
+    print(f"{'':<16}{'bytes/article':>15}{'total MB':>10}{'build s':>9}")
+    for label, held, elapsed in (('dict', dict_bytes, dict_s), ('ArticleRecord', record_bytes, record_s)):
+        print(f"{label:<16}{held / args.articles:>15.0f}{held / 1024 / 1024:>10.1f}{elapsed:>9.2f}")
+    print(f"saving: {(1 - record_bytes / dict_bytes) * 100:.0f}%")
+
+    start = time.perf_counter()
+    positive = sum(1 for r in records if r['sentiment'] == 'Positive')
+    print(f"full scan reading sentiment: {(time.perf_counter() - start) * 1000:.0f} ms ({positive} positive)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Deltas and payload bytes the dashboard sends per rerun.
+
+    python benchmarks/bench_rendering.py --articles 500
+    python benchmarks/bench_rendering.py --articles 500 --baseline HEAD~1
+
+Runs the app under AppTest against a generated fixture feed and counts every
+delta message the script enqueues for the browser, with its serialized size,
+on the first load and on a few ordinary reruns. --baseline also runs
+streamlit_app.py (and taxonomy.json) as of that git revision on the same feed,
+so the two can be compared side by side. Each app is measured in its own
+process with its own data directory, since st.cache_resource singletons such
+as the article store would otherwise be shared between them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import feedparser  # noqa: E402
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from loadtest import find, write_fixture_feed  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every forward message enqueued since the last reset: (type, bytes)
+sent = []
+_enqueue = ForwardMsgQueue.enqueue
+
+
+def counting_enqueue(self, msg):
+    sent.append((msg.WhichOneof('type'), msg.ByteSize()))
+    return _enqueue(self, msg)
+
+
+ForwardMsgQueue.enqueue = counting_enqueue
+
+
+def serve_fixture_feed(path):
+    """Point feedparser at the fixture feed, for app revisions that fetch a hard-coded feed URL"""
+    parse = feedparser.parse
+
+    def fixture_parse(url, *args, **kwargs):
+        if isinstance(url, str) and url.startswith(('http://', 'https://')):
+            url = path
+        return parse(url, *args, **kwargs)
+
+    feedparser.parse = fixture_parse
+
+
+def rerun_steps(at):
+    """(label, action) for the reruns measured after the first load.
+
+    Widgets are found by label, which older app revisions share; an action
+    returns False if the app has no such widget.
+    """
+    def set_value(widget, value):
+        if widget is None:
+            return False
+        widget.set_value(value).run()
+
+    return [
+        ('rerun', lambda: at.run()),
+        ('sort', lambda: set_value(find(at.selectbox, "Sort by"), "Sentiment (Negative first)")),
+        ('search', lambda: set_value(find(at.text_input, "🔎 Search headlines"), 'Senate')),
+    ]
+
+
+def measure(app, timeout):
+    at = AppTest.from_file(app, default_timeout=timeout)
+    rows = []
+    steps = [('first load', lambda: at.run())] + rerun_steps(at)
+    for label, action in steps:
+        sent.clear()
+        start = time.perf_counter()
+        if action() is False:
+            continue
+        elapsed = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"{app}: {at.exception[0].message}")
+        deltas = [size for kind, size in sent if kind == 'delta']
+        rows.append((label, len(deltas), sum(deltas), elapsed))
+    return rows
+
+
+def measure_in_subprocess(app, data_dir, timeout):
+    """measure() in a fresh interpreter with its own data directory; rows come back as JSON"""
+    env = dict(os.environ, NYT_DASHBOARD_DATA=data_dir)
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', app, '--timeout', str(timeout)],
+                            env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{app} failed:\n{result.stderr[-2000:]}")
+    # The app may print too; the rows are the last line
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def git_show(revision, path):
+    """File contents at a git revision, or None if it did not exist there"""
+    result = subprocess.run(['git', 'show', f"{revision}:{path}"], cwd=REPO, capture_output=True)
+    return result.stdout if result.returncode == 0 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count deltas and bytes sent per dashboard rerun")
+    parser.add_argument('--articles', type=int, default=500, help="articles in the generated fixture feed")
+    parser.add_argument('--baseline', help="git revision of streamlit_app.py to compare against")
+    parser.add_argument('--timeout', type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--measure', help=argparse.SUPPRESS)  # child process: measure this app file
+    args = parser.parse_args()
+
+    if args.measure:
+        serve_fixture_feed(os.environ['NYT_FEED_URL'])
+        print(json.dumps(measure(args.measure, args.timeout)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix='nyt-bench-rendering-')
+    # Read by streamlit_app at every rerun; inherited by the measuring processes
+    os.environ['NYT_FEED_URL'] = write_fixture_feed(os.path.join(workdir, 'feed.xml'), args.articles, seed=args.seed)
+
+    apps = [('current', os.path.join(REPO, 'streamlit_app.py'))]
+    if args.baseline:
+        source = git_show(args.baseline, 'streamlit_app.py')
+        if source is None:
+            parser.error(f"no streamlit_app.py at {args.baseline}")
+        baseline_dir = os.path.join(workdir, 'baseline')
+        os.makedirs(baseline_dir)
+        with open(os.path.join(baseline_dir, 'streamlit_app.py'), 'wb') as f:
+            f.write(source)
+        # Apps that load taxonomy.json look for it next to themselves
+        taxonomy = git_show(args.baseline, 'taxonomy.json')
+        if taxonomy is not None:
+            with open(os.path.join(baseline_dir, 'taxonomy.json'), 'wb') as f:
+                f.write(taxonomy)
+        apps.append((args.baseline, os.path.join(baseline_dir, 'streamlit_app.py')))
+
+    print(f"{args.articles} articles in the feed")
+    print(f"{'app':<12}{'step':<12}{'deltas':>8}{'KB sent':>10}{'seconds':>9}")
+    for i, (name, app) in enumerate(apps):
+        for label, deltas, size, elapsed in measure_in_subprocess(app, os.path.join(workdir, f"data{i}"), args.timeout):
+            print(f"{name:<12}{label:<12}{deltas:>8}{size / 1024:>10.1f}{elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
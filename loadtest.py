@@ -0,0 +1,258 @@
+"""Concurrent-session load test for the dashboard.
+
+Runs N simulated viewers against streamlit_app.py with Streamlit's AppTest.
+AppTest is not thread-safe, so sessions are spread over --processes worker
+processes running in parallel; inside a worker its sessions take turns and share
+st.cache_resource/st.cache_data like sessions on one server process. The feed is
+served from a local fixture (generated with current timestamps unless --feed is
+given) and history goes to a temp directory.
+
+    python loadtest.py --sessions 8 --actions 20
+    python loadtest.py --sessions 16 --processes 4 --articles 500 --json results.json
+
+Each session loads the page, then performs a random mix of slider drags,
+searches, sort changes, chart controls in other tabs, "Get Context" clicks and
+refreshes. Reported: rerun latency percentiles (overall and per action), worker
+CPU seconds and resident memory growth per session.
+"""
+import argparse
+import email.utils
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+SUBJECTS = ["Trump", "Biden", "Harris", "Vance", "Senate Republicans", "House Democrats",
+            "The Supreme Court", "Schumer", "Pelosi", "DeSantis", "Newsom", "Ocasio-Cortez",
+            "The White House", "Pentagon officials", "NATO allies", "The FBI"]
+VERBS = ["blasts", "praises", "rejects", "approves", "delays", "wins support for",
+         "faces backlash over", "unveils", "quietly expands", "warns about"]
+OBJECTS = ["tax bill", "border security plan", "Ukraine aid", "China tariffs", "Gaza ceasefire",
+           "Medicaid cuts", "climate rules", "election ballot rules", "government shutdown",
+           "budget deal", "court ruling on immigration", "war powers vote", "strong jobs report",
+           "terrible inflation numbers", "Iran sanctions", "Supreme Court nominee"]
+SEARCHES = ["", "trump", "court", "tax", "border", "senate", ""]
+
+
+def synthetic_title(rng):
+    return f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+
+
+def write_fixture_feed(path, articles=200, hours=72, seed=0, now=None, first_id=0):
+    """Write an RSS 2.0 file shaped like the NYT Politics feed"""
+    rng = random.Random(seed)
+    now = time.time() if now is None else now
+    items = []
+    for i in range(first_id, first_id + articles):
+        title = escape(synthetic_title(rng))
+        link = f"https://www.nytimes.com/fixture/{i}.html"
+        published = email.utils.formatdate(now - rng.uniform(0, hours * 3600))
+        summary = escape(f"<p>{title}. Lawmakers said the <b>proposal</b> faces a difficult path.</p>")
+        items.append(
+            f"<item><title>{title}</title><link>{link}</link><guid>{link}</guid>"
+            f"<description>{summary}</description><pubDate>{published}</pubDate></item>"
+        )
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                '<title>NYT &gt; Politics</title><link>https://www.nytimes.com/section/politics</link>'
+                '<description>Fixture feed</description>' + ''.join(items) + '</channel></rss>')
+    return path
+
+
+def find(elements, label):
+    return next((e for e in elements if e.label == label), None)
+
+
+def keyed(at, kind, key):
+    try:
+        return getattr(at, kind)(key=key)
+    except KeyError:
+        return None
+
+
+def perform(at, action, rng):
+    """Apply one interaction to a session; returns False if it was not possible"""
+    if action == 'slider':
+        slider = keyed(at, 'slider', 'hours_back')
+        if slider is None:
+            return False
+        slider.set_value(rng.choice([6, 12, 24, 48, 72, 168]))
+    elif action == 'search':
+        search = keyed(at, 'text_input', 'search_query')
+        if search is None:
+            return False
+        search.set_value(rng.choice(SEARCHES))
+    elif action == 'sort':
+        sort = find(at.selectbox, "Sort by")
+        if sort is None:
+            return False
+        sort.set_value(rng.choice(sort.options))
+    elif action == 'tab':
+        # AppTest renders every tab, so "switching" means driving a control in another tab
+        widget = rng.choice([('radio', 'ts_resolution'), ('slider', 'cooc_days'), ('radio', 'briefing_period')])
+        kind, key = widget
+        element = keyed(at, kind, key)
+        if element is None:
+            return False
+        if kind == 'radio':
+            element.set_value(rng.choice(element.options))
+        else:
+            element.set_value(rng.randint(1, 30))
+    elif action == 'context':
+        buttons = [b for b in at.button if b.key and b.key.startswith('context_')]
+        if not buttons:
+            return False
+        rng.choice(buttons).click()
+    elif action == 'refresh':
+        refresh = find(at.sidebar.button, "🔄 Refresh Now")
+        if refresh is None:
+            return False
+        refresh.click()
+    return True
+
+
+# Relative frequency of each interaction
+ACTION_WEIGHTS = {'slider': 4, 'search': 3, 'sort': 2, 'tab': 3, 'context': 2, 'refresh': 1}
+
+
+def run_worker(session_ids, args):
+    """Drive several sessions in one process, one rerun at a time; returns timings and usage"""
+    from streamlit.testing.v1 import AppTest
+
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    actions, weights = zip(*ACTION_WEIGHTS.items())
+    sessions = [(sid, random.Random(args.seed + sid), AppTest.from_file(args.app, default_timeout=args.timeout))
+                for sid in session_ids]
+    results, errors = [], []
+
+    def timed(sid, at, action):
+        start = time.perf_counter()
+        at.run()
+        results.append((action, time.perf_counter() - start))
+        if at.exception:
+            errors.append((sid, action, at.exception[0].message))
+
+    for step in range(args.actions + 1):
+        for sid, rng, at in sessions:
+            try:
+                if step == 0:
+                    timed(sid, at, 'load')
+                    continue
+                action = rng.choices(actions, weights)[0]
+                if perform(at, action, rng):
+                    timed(sid, at, action)
+            except Exception as e:
+                errors.append((sid, 'harness', repr(e)))
+        time.sleep(random.uniform(0, args.think_time))
+
+    return {
+        'results': results,
+        'errors': errors,
+        'cpu_s': time.process_time() - cpu_before,
+        'rss_growth_mb': rss_mb() - rss_before,
+        'peak_rss_mb': rss_mb(),
+    }
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        'count': len(latencies),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': statistics.mean(latencies) * 1000,
+    }
+
+
+def rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent dashboard sessions")
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--processes', type=int, default=min(4, os.cpu_count() or 1),
+                        help="parallel worker processes (simulated server processes)")
+    parser.add_argument('--actions', type=int, default=15, help="interactions per session after the first load")
+    parser.add_argument('--articles', type=int, default=200, help="articles in the generated fixture feed")
+    parser.add_argument('--feed', help="use this RSS file instead of generating one")
+    parser.add_argument('--think-time', type=float, default=0.2, help="max seconds between interactions")
+    parser.add_argument('--timeout', type=float, default=60, help="per-rerun timeout in seconds")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--app', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py'))
+    parser.add_argument('--json', help="also write the report to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='nyt-loadtest-')
+    feed = args.feed or write_fixture_feed(os.path.join(workdir, 'feed.xml'), args.articles, seed=args.seed)
+    # Read by streamlit_app at every rerun
+    os.environ['NYT_FEED_URL'] = feed
+    os.environ['NYT_DASHBOARD_DATA'] = os.path.join(workdir, 'data')
+
+    processes = max(1, min(args.processes, args.sessions))
+    assignments = [list(range(i, args.sessions, processes)) for i in range(processes)]
+    wall_start = time.perf_counter()
+    with multiprocessing.get_context('spawn').Pool(processes) as pool:
+        workers = pool.starmap(run_worker, [(ids, args) for ids in assignments])
+    wall = time.perf_counter() - wall_start
+
+    results = [r for w in workers for r in w['results']]
+    errors = [e for w in workers for e in w['errors']]
+    cpu = sum(w['cpu_s'] for w in workers)
+    rss_growth = sum(w['rss_growth_mb'] for w in workers)
+    rss_after = max(w['peak_rss_mb'] for w in workers)
+
+    if not results:
+        print("No reruns completed")
+        for error in errors:
+            print("ERROR", error)
+        return
+
+    by_action = {}
+    for action, elapsed in results:
+        by_action.setdefault(action, []).append(elapsed)
+
+    report = {
+        'sessions': args.sessions,
+        'processes': processes,
+        'reruns': len(results),
+        'errors': len(errors),
+        'wall_s': wall,
+        'reruns_per_s': len(results) / wall,
+        'overall': summarize([elapsed for _, elapsed in results]),
+        'by_action': {action: summarize(values) for action, values in sorted(by_action.items())},
+        'cpu_s_per_session': cpu / args.sessions,
+        'peak_rss_mb': rss_after,
+        'rss_growth_mb_per_session': rss_growth / args.sessions,
+    }
+
+    print(f"{args.sessions} sessions on {processes} processes, {len(results)} reruns in {wall:.1f}s "
+          f"({report['reruns_per_s']:.1f} reruns/s), {len(errors)} errors")
+    print(f"{'action':<10}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for action, stats in [('ALL', report['overall'])] + list(report['by_action'].items()):
+        print(f"{action:<10}{stats['count']:>6}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}{stats['p99_ms']:>10.0f}")
+    print(f"CPU per session: {report['cpu_s_per_session']:.2f}s | peak worker RSS {rss_after:.0f} MB "
+          f"| RSS growth per session: {report['rss_growth_mb_per_session']:.1f} MB")
+    for error in errors[:10]:
+        print("ERROR", error)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Record the NYT feed, or replay recordings through the ingestion path offline.
+
+Record raw responses (one file per poll, named by capture time):
+
+    python replay_feed.py record --interval 300            # until interrupted
+    python replay_feed.py record --interval 300 --count 12 --dir data/recordings
+
+Replay them into a fresh store in a temp directory and time each poll:
+
+    python replay_feed.py replay                           # as fast as possible
+    python replay_feed.py replay --speed 2000 --profile    # a week of polls in ~5 minutes
+
+The dashboard and API server can also serve recordings instead of the live feed:
+
+    NYT_FEED_MODE=record streamlit run streamlit_app.py
+    NYT_FEED_MODE=replay NYT_REPLAY_SPEED=2000 streamlit run streamlit_app.py
+
+Replay reports, per poll: fetch+parse (through the cached fetch function),
+ingestion (the feed diff and revision of reworded entries, enrichment,
+indexing, history log and archive writes, listeners) and aggregate reads
+(trending terms, sentiment windows, briefing).
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import statistics
+import tempfile
+import time
+
+
+def record(args):
+    from streamlit_app import FEED_URL, read_feed_bytes, save_recording
+
+    url = args.url or FEED_URL
+    taken = 0
+    while not args.count or taken < args.count:
+        try:
+            path = save_recording(read_feed_bytes(url), args.dir)
+            taken += 1
+            print(f"[{time.strftime('%H:%M:%S')}] saved {path}")
+        except OSError as e:
+            print(f"Fetch failed: {str(e)}")
+        if not args.count or taken < args.count:
+            time.sleep(args.interval)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def replay(args):
+    # The store's paths are read from the environment at import time
+    os.environ['NYT_DASHBOARD_DATA'] = args.data or tempfile.mkdtemp(prefix='nyt-replay-')
+    from streamlit_app import (
+        SENTIMENT_WINDOWS,
+        fetch_nyt_politics_feed,
+        generate_summary,
+        get_alert_engine,
+        get_article_store,
+        get_feed_tracker,
+        get_rollup_store,
+        get_saved_views,
+        list_recordings,
+    )
+
+    recordings = list_recordings(args.dir)
+    if not recordings:
+        print(f"No recordings in {args.dir}")
+        return
+
+    store = get_article_store()
+    # Same listeners and feed diff as a dashboard process
+    get_alert_engine()
+    get_rollup_store()
+    get_saved_views()
+    tracker = get_feed_tracker()
+
+    profiler = cProfile.Profile() if args.profile else None
+    polls = []
+    replay_start = time.perf_counter()
+    for i, (recorded_at, path) in enumerate(recordings):
+        if args.speed and i:
+            time.sleep(max(recorded_at - recordings[i - 1][0], 0) / args.speed)
+        if profiler:
+            profiler.enable()
+
+        start = time.perf_counter()
+        articles, _ = fetch_nyt_politics_feed(path)
+        fetched = time.perf_counter()
+        before = store.version
+        # As main() does: reworded entries replace their stored version before the feed is ingested
+        delta = tracker.diff(articles, now=recorded_at)
+        if delta.revised:
+            store.revise(delta.revised)
+        store.ingest(articles)
+        ingested = time.perf_counter()
+        with store.lock:
+            store.bursts.trending()
+            overall = store.timeseries.series.get('All')
+            if overall is not None:
+                for seconds in SENTIMENT_WINDOWS.values():
+                    overall.window(seconds, now=recorded_at)
+        generate_summary(store)
+        done = time.perf_counter()
+
+        if profiler:
+            profiler.disable()
+        polls.append({
+            'recorded_at': recorded_at,
+            'entries': len(articles),
+            'new': store.version - before,
+            'revised': len(delta.revised),
+            'fetch_ms': (fetched - start) * 1000,
+            'ingest_ms': (ingested - fetched) * 1000,
+            'aggregate_ms': (done - ingested) * 1000,
+        })
+    wall = time.perf_counter() - replay_start
+
+    span = recordings[-1][0] - recordings[0][0]
+    print(f"Replayed {len(polls)} polls spanning {span / 3600:.1f}h in {wall:.2f}s; "
+          f"{store.version} articles stored in {os.environ['NYT_DASHBOARD_DATA']}")
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total s':>10}")
+    for stage in ('fetch_ms', 'ingest_ms', 'aggregate_ms'):
+        values = [p[stage] for p in polls]
+        print(f"{stage[:-3]:<12}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+              f"{max(values):>10.1f}{sum(values) / 1000:>10.2f}")
+    new_per_poll = [p['new'] for p in polls]
+    print(f"new articles per poll: mean {statistics.mean(new_per_poll):.1f}, max {max(new_per_poll)}; "
+          f"{sum(p['revised'] for p in polls)} reworded entries revised")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'polls': polls, 'wall_s': wall, 'articles': store.version}, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay the NYT politics feed")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    rec = commands.add_parser('record', help="save raw feed responses")
+    rec.add_argument('--url', help="feed to record (default: NYT_FEED_URL or the NYT Politics feed)")
+    rec.add_argument('--interval', type=float, default=300, help="seconds between polls")
+    rec.add_argument('--count', type=int, default=0, help="stop after this many polls (0: never)")
+
+    rep = commands.add_parser('replay', help="ingest recordings into a fresh store and time each poll")
+    rep.add_argument('--speed', type=float, default=0,
+                     help="replay this many times faster than recorded (0: no waiting)")
+    rep.add_argument('--data', help="data directory for the replayed store (default: a new temp dir)")
+    rep.add_argument('--profile', action='store_true', help="print a cProfile summary")
+    rep.add_argument('--json', help="also write per-poll timings to this file")
+
+    # Same default as the dashboard's RECORDINGS_DIR (replay points NYT_DASHBOARD_DATA elsewhere)
+    default_dir = os.environ.get('NYT_FEED_RECORDINGS',
+                                 os.path.join(os.environ.get('NYT_DASHBOARD_DATA', 'data'), 'recordings'))
+    for command in (rec, rep):
+        command.add_argument('--dir', default=default_dir, help="recordings directory")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args)
+    else:
+        replay(args)
+
+
+if __name__ == "__main__":
+    main()
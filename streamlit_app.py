@@ -9,427 +9,3320 @@ from datetime import datetime, timedelta
 import plotly.express as px
 import plotly.graph_objects as go
 from collections import Counter
+from itertools import combinations
 import re
+import math
 from textblob import TextBlob
 import time
+import calendar
+import threading
+import json
+import os
+import sys
+import hashlib
+import copy
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import html
+import bisect
+import io
+import pickle
+import struct
+import plotly.io as pio
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import urllib.request
+import uuid
 
-# Page config
-st.set_page_config(
-    page_title="NYT Politics Dashboard",
-    page_icon="📰",
-    layout="wide",
-    initial_sidebar_state="expanded"
+# Optional: only needed for the 'anthropic' context backend
+try:
+    from anthropic import Anthropic
+except ImportError:
+    Anthropic = None
+
+# NYT Politics RSS feed; point at a local file for offline runs and load tests
+FEED_URL = os.environ.get('NYT_FEED_URL', "https://rss.nytimes.com/services/xml/rss/nyt/Politics.xml")
+
+# Local storage for article history and derived data
+DATA_DIR = os.environ.get('NYT_DASHBOARD_DATA', 'data')
+HISTORY_PATH = os.path.join(DATA_DIR, 'articles.jsonl')
+
+# Feed mode: 'live' reads FEED_URL, 'record' also saves every raw response to
+# RECORDINGS_DIR, 'replay' serves saved responses on a clock REPLAY_SPEED times real time
+FEED_MODE = os.environ.get('NYT_FEED_MODE', 'live')
+RECORDINGS_DIR = os.environ.get('NYT_FEED_RECORDINGS', os.path.join(DATA_DIR, 'recordings'))
+REPLAY_SPEED = float(os.environ.get('NYT_REPLAY_SPEED', '1'))
+
+# "Get Context" lookups: backend name, worker threads, per-lookup timeout (s), cache lifetimes (s)
+CONTEXT_BACKEND = os.environ.get('NYT_CONTEXT_BACKEND', 'history')
+CONTEXT_WORKERS = 4
+CONTEXT_TIMEOUT = 20
+CONTEXT_TTL = 6 * 3600
+CONTEXT_ERROR_TTL = 60  # failed lookups are not retried for this long
+
+# Watchlist alerts: rule file and optional outbound webhook
+ALERT_RULES_PATH = os.path.join(DATA_DIR, 'alert_rules.json')
+ALERT_WEBHOOK_URL = os.environ.get('NYT_ALERT_WEBHOOK_URL', '')
+
+# Named sidebar filter sets, kept materialized over the article store
+SAVED_VIEWS_PATH = os.path.join(DATA_DIR, 'saved_views.json')
+# Longest time window the sidebar offers (hours)
+MAX_HOURS_BACK = 168
+
+# First/last seen times and revisions of feed entries; entries gone from the
+# feed are forgotten after FEED_TRACKER_RETENTION seconds
+FEED_TRACKER_PATH = os.path.join(DATA_DIR, 'feed_tracker.json')
+FEED_TRACKER_RETENTION = 30 * 86400
+
+# Enrichment results by content digest, reused across restarts and processes
+ENRICHMENT_CACHE_PATH = os.path.join(DATA_DIR, 'enrichment_cache.jsonl')
+# Batches at least this large are enriched in a process pool
+ENRICH_POOL_MIN_BATCH = 200
+
+# Warm-start snapshot of the article store, rewritten at most every SNAPSHOT_INTERVAL seconds
+SNAPSHOT_PATH = os.path.join(DATA_DIR, 'store_snapshot.bin')
+SNAPSHOT_INTERVAL = 300
+
+# Columnar copy of the history: Arrow IPC files under date=YYYY-MM-DD/ partitions
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'history')
+ARCHIVE_COMPACT_PARTS = 16  # files in one partition before they are merged into one
+HISTORY_WINDOWS = {'Live feed only': None, 'Last 7 days': 7, 'Last 30 days': 30,
+                   'Last 90 days': 90, 'Last 365 days': 365}
+
+# Materialized summaries of closed days
+ROLLUPS_PATH = os.path.join(DATA_DIR, 'daily_rollups.json')
+
+# Categories, briefing themes, tracked entities (with aliases) and stop words;
+# checked for edits at most every TAXONOMY_CHECK_INTERVAL seconds
+TAXONOMY_PATH = os.environ.get('NYT_TAXONOMY', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'taxonomy.json'))
+TAXONOMY_CHECK_INTERVAL = 5
+
+# Memory limits for every cache in the process: byte budgets for our own caches,
+# entry counts for st.cache_data ones (Streamlit does not size those). TTLs in seconds.
+CACHE_POLICY = {
+    'feed': {'max_entries': 4, 'ttl': 300},
+    'briefing': {'max_entries': 64, 'ttl': 1800},
+    'figures': {'max_bytes': 32 * 1024 * 1024, 'ttl': None},
+    'context': {'max_bytes': 4 * 1024 * 1024, 'ttl': CONTEXT_TTL},
+    'api_responses': {'max_bytes': 16 * 1024 * 1024, 'ttl': None},
+}
+
+def read_feed_bytes(source):
+    """Raw body of a feed URL or local file"""
+    if source.startswith(('http://', 'https://')):
+        request = urllib.request.Request(source, headers={'User-Agent': 'nyt-politics-dashboard'})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+def save_recording(raw, directory=RECORDINGS_DIR, recorded_at=None):
+    """Store one raw feed response; the file name is its capture time in epoch milliseconds"""
+    recorded_at = time.time() if recorded_at is None else recorded_at
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{int(recorded_at * 1000)}.xml")
+    with open(path, 'wb') as f:
+        f.write(raw)
+    return path
+
+def list_recordings(directory=RECORDINGS_DIR):
+    """(capture time, path) of every saved response, oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    recordings = []
+    for name in os.listdir(directory):
+        stem, ext = os.path.splitext(name)
+        if ext == '.xml' and stem.isdigit():
+            recordings.append((int(stem) / 1000, os.path.join(directory, name)))
+    return sorted(recordings)
+
+class FeedReplayer:
+    """Maps wall-clock time onto a series of recorded feed responses.
+    
+    Replay starts at the first recording and runs `speed` times faster than
+    real time, so a week of 5-minute polls plays back in about a minute at
+    speed 10000. The last recording is served once the clock passes it.
+    """
+    
+    def __init__(self, recordings, speed=1.0, started=None):
+        self.recordings = recordings
+        self.times = [recorded_at for recorded_at, _ in recordings]
+        self.speed = speed
+        self.started = time.time() if started is None else started
+    
+    def current(self, now=None):
+        """Path of the recording the replay clock has reached"""
+        if not self.recordings:
+            raise FileNotFoundError(f"No feed recordings in {RECORDINGS_DIR}")
+        elapsed = ((time.time() if now is None else now) - self.started) * self.speed
+        index = bisect.bisect_right(self.times, self.times[0] + elapsed) - 1
+        return self.recordings[max(index, 0)][1]
+
+
+@st.cache_resource
+def get_feed_replayer():
+    """Replay clock shared by every session of the server process"""
+    return FeedReplayer(list_recordings(), REPLAY_SPEED)
+
+def feed_source():
+    """What to fetch this run: the live feed URL, or in replay mode the current recording"""
+    if FEED_MODE == 'replay':
+        return get_feed_replayer().current()
+    return FEED_URL
+
+def parse_feed(feed):
+    """(articles, feed title) from a parsed feed"""
+    articles = []
+    for entry in feed.entries:
+        article = {
+            'title': entry.get('title', 'No title'),
+            'link': entry.get('link', ''),
+            'guid': entry.get('id', ''),
+            'published': entry.get('published', ''),
+            'summary': entry.get('summary', ''),
+            'published_parsed': entry.get('published_parsed', None)
+        }
+        articles.append(article)
+    return articles, feed.feed.get('title', 'NYT Politics')
+
+@st.cache_data(ttl=CACHE_POLICY['feed']['ttl'], max_entries=CACHE_POLICY['feed']['max_entries'])
+def fetch_nyt_politics_feed(source=None):
+    """Fetch NYT Politics RSS feed (or a recording of it); cached per source"""
+    source = source or FEED_URL
+    try:
+        if FEED_MODE == 'record' and source == FEED_URL:
+            raw = read_feed_bytes(source)
+            save_recording(raw)
+            feed = feedparser.parse(raw)
+        else:
+            feed = feedparser.parse(source)
+        
+        return parse_feed(feed)
+    except Exception as e:
+        st.error(f"Error fetching feed: {str(e)}")
+        return [], "Error"
+
+class FeedDelta:
+    """What one fetch changed relative to the previous one"""
+    
+    def __init__(self):
+        self.added = []     # raw articles never seen before
+        self.revised = []   # raw articles whose title or summary was reworded
+        self.returned = []  # raw articles back in the feed after dropping off
+        self.removed = []   # tracker keys no longer in the feed
+    
+    def __bool__(self):
+        return bool(self.added or self.revised or self.returned or self.removed)
+
+class FeedTracker:
+    """Diff stage between fetches, keyed by guid (else link).
+    
+    Each entry keeps when it was first and last seen in the feed, its
+    current title and content digest, and the titles it had before each
+    revision. A fetch identical to the previous one is recognised by its
+    fingerprint and costs nothing beyond hashing; otherwise only the added,
+    reworded and dropped entries are touched. Every change is also appended
+    to a numbered event feed that sessions read from their last position.
+    """
+    
+    def __init__(self, path=None, retention=FEED_TRACKER_RETENTION):
+        self.lock = threading.Lock()
+        self.path = path
+        self.retention = retention
+        self.entries = {}
+        self.by_link = {}  # link -> key, for enriched articles (which carry no guid)
+        self.in_feed = set()  # keys present in the last fetch
+        self.fingerprint = None
+        self.checked_at = 0.0  # time of the last fetch; "last seen" of everything in it
+        self.events = deque(maxlen=500)  # most recent changes, newest last
+        self.seq = 0
+        self._load()
+    
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable feed tracker state: {str(e)}")
+            return
+        self.entries = state['entries']
+        self.by_link = {entry['link']: key for key, entry in self.entries.items() if entry['link']}
+        self.in_feed = set(state['in_feed'])
+        self.fingerprint = state['fingerprint']
+        self.checked_at = state['checked_at']
+    
+    def _save(self):
+        """Atomically replaced, so a crash mid-write keeps the previous state"""
+        if not self.path:
+            return
+        state = {'entries': self.entries, 'in_feed': sorted(self.in_feed),
+                 'fingerprint': self.fingerprint, 'checked_at': self.checked_at}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save feed tracker state: {str(e)}")
+    
+    @staticmethod
+    def key(article):
+        return article.get('guid') or article['link'] or article['title']
+    
+    @staticmethod
+    def digest(article):
+        text = f"{article['title']}\0{article.get('summary', '')}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+    
+    def diff(self, articles, now=None):
+        """Compare a fetch with the previous one, record what changed and return it as a FeedDelta"""
+        now = time.time() if now is None else now
+        current = {}
+        for article in articles:
+            current.setdefault(self.key(article), (article, self.digest(article)))
+        fingerprint = hashlib.blake2b(''.join(f"{key}\0{digest}\n" for key, (_, digest) in current.items())
+                                      .encode('utf-8'), digest_size=16).hexdigest()
+        delta = FeedDelta()
+        with self.lock:
+            if fingerprint == self.fingerprint:
+                self.checked_at = now
+                return delta
+            # Everything in the very first fetch was already out there; date it by publication
+            baseline = self.fingerprint is None
+            for key, (article, digest) in current.items():
+                entry = self.entries.get(key)
+                if entry is None:
+                    first_seen = now
+                    if baseline and article.get('published_parsed'):
+                        first_seen = min(now, calendar.timegm(tuple(article['published_parsed'])))
+                    self.entries[key] = {'first_seen': first_seen, 'last_seen': now, 'title': article['title'],
+                                         'link': article['link'], 'digest': digest, 'revisions': []}
+                    if article['link']:
+                        self.by_link[article['link']] = key
+                    delta.added.append(article)
+                    continue
+                if entry['link'] != article['link']:
+                    self.by_link.pop(entry['link'], None)
+                    self.by_link[article['link']] = key
+                    entry['link'] = article['link']
+                if key not in self.in_feed:
+                    delta.returned.append(article)
+                if entry['digest'] != digest:
+                    entry['revisions'].append({'at': now, 'title': entry['title']})
+                    entry['title'] = article['title']
+                    entry['digest'] = digest
+                    delta.revised.append(article)
+            for key in self.in_feed - current.keys():
+                entry = self.entries.get(key)
+                if entry is not None:
+                    entry['last_seen'] = self.checked_at
+                    delta.removed.append(key)
+            
+            self.in_feed = set(current)
+            self.fingerprint = fingerprint
+            self.checked_at = now
+            for kind, items in (('added', delta.added), ('revised', delta.revised),
+                                ('returned', delta.returned), ('removed', delta.removed)):
+                for item in items:
+                    entry = self.entries[item if kind == 'removed' else self.key(item)]
+                    self.seq += 1
+                    self.events.append({'seq': self.seq, 'kind': kind, 'title': entry['title'],
+                                        'link': entry['link'], 'at': now})
+            self._prune(now)
+            self._save()
+        return delta
+    
+    def _prune(self, now):
+        expired = [key for key, entry in self.entries.items()
+                   if key not in self.in_feed and entry['last_seen'] < now - self.retention]
+        for key in expired:
+            if self.by_link.get(self.entries[key]['link']) == key:
+                del self.by_link[self.entries[key]['link']]
+            del self.entries[key]
+    
+    def _entry(self, article):
+        key = self.key(article)
+        if key not in self.entries:
+            key = self.by_link.get(article['link'], key)
+        return key, self.entries.get(key)
+    
+    def status(self, article):
+        """(first seen, last seen, revisions) of an article, or None if it was never in a fetch"""
+        with self.lock:
+            key, entry = self._entry(article)
+            if entry is None:
+                return None
+            last_seen = self.checked_at if key in self.in_feed else entry['last_seen']
+            return entry['first_seen'], last_seen, list(entry['revisions'])
+    
+    def breaking_count(self, articles, hours=3):
+        """Articles that first appeared in the feed within `hours`.
+        
+        Articles the tracker never saw (history, backfills) fall back to
+        their publication time, compared the way the sidebar compares it.
+        """
+        seen_cutoff = time.time() - hours * 3600
+        published_cutoff = window_cutoff(hours)
+        count = 0
+        with self.lock:
+            for article in articles:
+                _, entry = self._entry(article)
+                if entry is not None:
+                    count += entry['first_seen'] >= seen_cutoff
+                else:
+                    count += article['published_ts'] >= published_cutoff
+        return count
+    
+    def since(self, seq):
+        """Change events after `seq`, oldest first"""
+        with self.lock:
+            return [event for event in self.events if event['seq'] > seq]
+
+@st.cache_resource
+def get_feed_tracker():
+    """Single feed tracker per server process, persisted across restarts"""
+    return FeedTracker(FEED_TRACKER_PATH)
+
+def analyze_sentiment(text):
+    """Analyze sentiment of text using TextBlob"""
+    try:
+        blob = TextBlob(text)
+        polarity = blob.sentiment.polarity
+        
+        if polarity > 0.1:
+            return 'Positive', polarity
+        elif polarity < -0.1:
+            return 'Negative', polarity
+        else:
+            return 'Neutral', polarity
+    except:
+        return 'Neutral', 0.0
+
+def keyword_pattern(words, whole_words=False):
+    """One regex for a list of words or phrases, longest first so 'white house' wins over 'house'.
+    
+    Keywords match at the start of a word ('court' also finds 'courts');
+    entity names and aliases match whole words only.
+    """
+    ordered = sorted({w.lower() for w in words}, key=len, reverse=True)
+    if not ordered:
+        return None
+    end = r'\b' if whole_words else ''
+    return re.compile(rf"\b({'|'.join(re.escape(w) for w in ordered)}){end}", re.IGNORECASE)
+
+class Taxonomy:
+    """Categories, briefing themes, tracked entities and stop words, compiled into matchers.
+    
+    Built from taxonomy.json. Each section has a content hash, so a reload can
+    tell which derived data is affected; `tag` identifies the categories and
+    entities sections, which are stored on every article.
+    """
+    
+    SECTIONS = ('categories', 'themes', 'entities', 'stop_words')
+    ENTITY_GROUPS = ('politicians', 'locations', 'organizations')
+    
+    def __init__(self, config):
+        missing = [section for section in self.SECTIONS if section not in config]
+        if missing:
+            raise ValueError(f"Taxonomy is missing sections: {', '.join(missing)}")
+        self.hashes = {
+            section: hashlib.blake2b(json.dumps(config[section], sort_keys=True).encode('utf-8'),
+                                     digest_size=8).hexdigest()
+            for section in self.SECTIONS
+        }
+        self.version = hashlib.blake2b(''.join(self.hashes[s] for s in self.SECTIONS).encode(),
+                                       digest_size=4).hexdigest()
+        self.tag = hashlib.blake2b((self.hashes['categories'] + self.hashes['entities']).encode(),
+                                   digest_size=4).hexdigest()
+        
+        # Checked in order; the first category with a matching keyword wins
+        self.category_names = [category['name'] for category in config['categories']]
+        self.category_rank = {}
+        for rank, category in enumerate(config['categories']):
+            for keyword in category['keywords']:
+                self.category_rank.setdefault(keyword.lower(), rank)
+        self.category_pattern = keyword_pattern(self.category_rank)
+        
+        self.theme_names = list(config['themes'])
+        self.themes_by_word = {}
+        for theme, words in config['themes'].items():
+            for word in words:
+                self.themes_by_word.setdefault(word.lower(), set()).add(theme)
+        self.theme_pattern = keyword_pattern(self.themes_by_word)
+        
+        # Every spelling maps to one canonical name, so "AOC" and "Ocasio-Cortez" count together
+        self.entity_groups = {group: list(config['entities'].get(group, {})) for group in self.ENTITY_GROUPS}
+        self.entity_names = [name for group in self.ENTITY_GROUPS for name in self.entity_groups[group]]
+        self.entity_rank = {name: rank for rank, name in enumerate(self.entity_names)}
+        self.canonical = {}
+        for group in self.ENTITY_GROUPS:
+            for name, aliases in config['entities'].get(group, {}).items():
+                for spelling in [name] + list(aliases):
+                    self.canonical.setdefault(spelling.lower(), name)
+        self.entity_pattern = keyword_pattern(self.canonical, whole_words=True)
+        
+        self.stop_words = frozenset(w.lower() for w in config['stop_words'].get('keywords', []))
+        # Phrases never start, end or span across these
+        self.phrase_stop_words = self.stop_words | {w.lower() for w in config['stop_words'].get('phrases', [])}
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+    
+    def categorize(self, text):
+        """Category of the first (in taxonomy order) category with a keyword in `text`"""
+        if self.category_pattern is None:
+            return '📰 General'
+        ranks = [self.category_rank[m.lower()] for m in self.category_pattern.findall(text)]
+        return self.category_names[min(ranks)] if ranks else '📰 General'
+    
+    def themes(self, text):
+        """Briefing themes with a keyword in `text`"""
+        if self.theme_pattern is None:
+            return set()
+        return {theme for word in self.theme_pattern.findall(text) for theme in self.themes_by_word[word.lower()]}
+    
+    def entity_mentions(self, text):
+        """Canonical name of every entity mention in `text`, in order of appearance"""
+        if self.entity_pattern is None:
+            return []
+        return [self.canonical[m.lower()] for m in self.entity_pattern.findall(text)]
+    
+    def find_entities(self, text):
+        """Distinct entities mentioned in `text`, in taxonomy order"""
+        return sorted(set(self.entity_mentions(text)), key=self.entity_rank.__getitem__)
+    
+    def tag_fields(self, title, summary_text):
+        """The article fields that come from this taxonomy"""
+        category = self.categorize(title)
+        if category == '📰 General' and summary_text:
+            category = self.categorize(summary_text)
+        entities = self.find_entities(title)
+        entities += [e for e in self.find_entities(summary_text) if e not in entities]
+        return {'category': category, 'entities': entities, 'taxonomy': self.tag}
+    
+    def changed_sections(self, hashes):
+        """Sections whose content differs from the ones `hashes` were taken from"""
+        return {section for section in self.SECTIONS if hashes.get(section) != self.hashes[section]}
+
+class TaxonomyLoader:
+    """The current taxonomy, reloaded when its file changes on disk"""
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = os.stat(path).st_mtime_ns
+        self.checked_at = time.monotonic()
+        self.taxonomy = Taxonomy.load(path)
+    
+    def check(self):
+        """Reload if the file changed; a broken edit keeps the previous taxonomy"""
+        if time.monotonic() - self.checked_at < TAXONOMY_CHECK_INTERVAL or not self.lock.acquire(blocking=False):
+            return self.taxonomy
+        try:
+            self.checked_at = time.monotonic()
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime != self.mtime:
+                self.mtime = mtime
+                self.taxonomy = Taxonomy.load(self.path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Keeping the previous taxonomy: {str(e)}")
+        finally:
+            self.lock.release()
+        return self.taxonomy
+
+@st.cache_resource
+def get_taxonomy_loader():
+    """Single loader per process, so the taxonomy is compiled once and survives reruns"""
+    return TaxonomyLoader(TAXONOMY_PATH)
+
+def current_taxonomy():
+    return get_taxonomy_loader().taxonomy
+
+def keyword_tokens(text):
+    """Keyword candidates in a piece of text"""
+    words = re.findall(r'\b[a-z]{4,}\b', text.lower())
+    stop_words = current_taxonomy().stop_words
+    return [w for w in words if w not in stop_words]
+
+PHRASE_TOKEN = re.compile(r"[A-Za-z][A-Za-z'’-]*|[^\sA-Za-z]+")
+MAX_PHRASE_WORDS = 3
+MIN_PHRASE_COUNT = 2
+MIN_PHRASE_PMI = 2.0  # bits; how much more often the words co-occur than by chance
+
+def phrase_runs(text):
+    """Runs of candidate words between stop words and punctuation, lowercased.
+    
+    Words of three letters count (tax, war), as do all-caps acronyms of two
+    (GOP, ICE, EU), which the four-letter keyword_tokens rule drops.
+    """
+    stop_words = current_taxonomy().phrase_stop_words
+    runs, run = [], []
+    for token in PHRASE_TOKEN.findall(text):
+        word = token.lower().strip("'’-")
+        if word.endswith(("'s", "’s")):
+            word = word[:-2]
+        if word[:1].isalpha() and word not in stop_words and (len(word) >= 3 or (len(token) >= 2 and token.isupper())):
+            run.append(word)
+        elif run:
+            runs.append(run)
+            run = []
+    if run:
+        runs.append(run)
+    return runs
+
+# Word ids are packed into one int per n-gram, 21 bits per word
+PHRASE_ID_BITS = 21
+PHRASE_MAX_VOCAB = (1 << PHRASE_ID_BITS) - 1
+
+class PhraseCounter:
+    """Unigram, bigram and trigram counts keyed by packed word ids, updated per text"""
+    
+    def __init__(self, max_words=MAX_PHRASE_WORDS):
+        self.max_words = max_words
+        self.vocab = {}  # word -> id, starting at 1 so packed n-grams never collide across n
+        self.words = [None]  # id -> word
+        self.counts = Counter()  # packed n-gram -> occurrences
+        self.totals = [0] * (max_words + 1)  # n -> n-grams counted
+    
+    def _id(self, word):
+        word_id = self.vocab.get(word)
+        if word_id is None:
+            if len(self.words) > PHRASE_MAX_VOCAB:
+                return None
+            word_id = self.vocab[word] = len(self.words)
+            self.words.append(word)
+        return word_id
+    
+    def grams(self, text):
+        """(packed id, words) for every n-gram in the text, new words added to the vocabulary"""
+        packed = []
+        for run in phrase_runs(text):
+            ids = [self._id(word) for word in run]
+            for start in range(len(ids)):
+                key = 0
+                for n in range(min(self.max_words, len(ids) - start)):
+                    word_id = ids[start + n]
+                    if word_id is None:
+                        break
+                    key |= word_id << (PHRASE_ID_BITS * n)
+                    packed.append((key, n + 1))
+        return packed
+    
+    def add(self, text):
+        counts, totals = self.counts, self.totals
+        for key, n in self.grams(text):
+            counts[key] += 1
+            totals[n] += 1
+    
+    def length(self, key):
+        return (key.bit_length() + PHRASE_ID_BITS - 1) // PHRASE_ID_BITS
+    
+    def unpack(self, key):
+        ids = []
+        while key:
+            ids.append(key & PHRASE_MAX_VOCAB)
+            key >>= PHRASE_ID_BITS
+        return ids
+    
+    def phrase(self, key):
+        return ' '.join(self.words[i] for i in self.unpack(key))
+    
+    def pmi(self, key):
+        """Pointwise mutual information of a multi-word phrase, in bits"""
+        ids = self.unpack(key)
+        if len(ids) < 2 or not self.counts[key]:
+            return 0.0
+        observed = self.counts[key] / self.totals[len(ids)]
+        expected = 1.0
+        for word_id in ids:
+            expected *= self.counts[word_id] / self.totals[1]
+        return math.log2(observed / expected) if expected else 0.0
+    
+    def top_phrases(self, top_n=20, reference=None, min_count=MIN_PHRASE_COUNT, min_pmi=MIN_PHRASE_PMI):
+        """(phrase, count) pairs; multi-word phrases must be collocations.
+        
+        `reference` is a larger PhraseCounter (e.g. all stored history) used
+        to judge collocation strength when this one holds a small window.
+        """
+        reference = reference or self
+        phrases = set()
+        for key, count in self.counts.items():
+            if self.length(key) > 1 and count >= min_count:
+                ref_key = reference.key(self.phrase(key)) if reference is not self else key
+                if ref_key is not None and reference.pmi(ref_key) >= min_pmi:
+                    phrases.add(key)
+        
+        # Words and shorter phrases that only ever occur inside a kept phrase add nothing
+        subsumed = set()
+        for key in phrases:
+            ids = self.unpack(key)
+            for start in range(len(ids)):
+                for end in range(start + 1, len(ids) + 1):
+                    sub = self.pack(ids[start:end])
+                    if sub != key and self.counts[sub] == self.counts[key]:
+                        subsumed.add(sub)
+        
+        ranked = [(count, self.length(key), key) for key, count in self.counts.items()
+                  if (self.length(key) == 1 or key in phrases) and key not in subsumed]
+        ranked.sort(reverse=True)
+        return [(self.phrase(key), count) for count, _, key in ranked[:top_n]]
+    
+    def pack(self, ids):
+        key = 0
+        for n, word_id in enumerate(ids):
+            key |= word_id << (PHRASE_ID_BITS * n)
+        return key
+    
+    def key(self, phrase):
+        """Packed key for a space-separated phrase, or None if a word is unknown"""
+        ids = [self.vocab.get(word) for word in phrase.split()]
+        return None if None in ids else self.pack(ids)
+
+def extract_keywords(articles, top_n=20, reference=None):
+    """Most common words and collocated phrases in the headlines"""
+    counter = PhraseCounter()
+    for article in articles:
+        counter.add(article['title'])
+    return counter.top_phrases(top_n, reference)
+
+def categorize_article(title):
+    """Categorize article based on keywords in title"""
+    return current_taxonomy().categorize(title)
+
+def find_entities(text):
+    """Return the tracked entities mentioned in a single piece of text"""
+    return current_taxonomy().find_entities(text)
+
+def extract_entities(articles):
+    """Extract key political entities (people, places, orgs) from headlines"""
+    return group_entity_mentions(Counter(current_taxonomy().entity_mentions(' '.join([a['title'] for a in articles]))))
+
+def group_entity_mentions(mentions):
+    """Mention counts per entity group, most mentioned first"""
+    taxonomy = current_taxonomy()
+    groups = []
+    for group in Taxonomy.ENTITY_GROUPS:
+        counts = {entity: mentions[entity] for entity in taxonomy.entity_groups[group] if mentions[entity]}
+        groups.append(dict(sorted(counts.items(), key=lambda x: x[1], reverse=True)))
+    return tuple(groups)
+
+def extract_main_topic(title):
+    """Extract the main topic from headline for search"""
+    # Remove common political phrases
+    cleaned = title
+    remove_phrases = ['Trump', 'Biden', 'says', 'plans to', 'wants to', 'will', 'could', 'may']
+    
+    # Extract key noun phrases (simplified)
+    words = title.split()
+    if len(words) > 4:
+        # Take middle portion as likely to contain the main topic
+        topic = ' '.join(words[1:4])
+    else:
+        topic = ' '.join(words[:3])
+    
+    return topic
+
+# Bump when enrichment changes so cached briefings are rebuilt
+ENRICHMENT_VERSION = 2
+
+class DailyDigest:
+    """Briefing ingredients for one day, updated one article at a time"""
+    
+    def __init__(self):
+        self.count = 0
+        self.fingerprint = 0  # XOR of article key hashes: order independent, O(1) to update
+        self.sentiments = Counter()
+        self.categories = Counter()
+        self.entities = Counter()
+        self.keywords = Counter()
+        self.themes = Counter()
+        self.polarity_sum = 0.0
+        self.latest = []  # (published_ts, title) of the newest few articles
+    
+    def add(self, key, article):
+        self.count += 1
+        self.fingerprint ^= int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+        self.sentiments[article['sentiment']] += 1
+        self.categories[article['category']] += 1
+        self.entities.update(set(article['entities']))
+        self.polarity_sum += article['polarity']
+        self.keywords.update(keyword_tokens(article['title']))
+        self.themes.update(current_taxonomy().themes(article['title']))
+        self.latest.append((article['published_ts'], article['title']))
+        self.latest = sorted(self.latest, reverse=True)[:3]
+
+class BriefingIndex:
+    """Per-day digests so briefings for any day or week come from stored history"""
+    
+    def __init__(self):
+        self.days = {}  # day number -> DailyDigest
+    
+    def add(self, key, article):
+        day = day_number(article['published_ts'])
+        digest = self.days.get(day)
+        if digest is None:
+            digest = self.days[day] = DailyDigest()
+        digest.add(key, article)
+    
+    def digests(self, end_day, days=1):
+        """Digests for the `days` days ending at `end_day`"""
+        return [self.days[d] for d in range(end_day - days + 1, end_day + 1) if d in self.days]
+    
+    def latest_day(self, on_or_before):
+        """Most recent day with articles, or None"""
+        candidates = [d for d in self.days if d <= on_or_before]
+        return max(candidates) if candidates else None
+
+def briefing_fingerprint(digests):
+    """Cheap content fingerprint: which articles are in the period plus the enrichment and taxonomy versions"""
+    return (ENRICHMENT_VERSION, current_taxonomy().version) + tuple((d.fingerprint, d.count) for d in digests)
+
+@st.cache_data(ttl=CACHE_POLICY['briefing']['ttl'], max_entries=CACHE_POLICY['briefing']['max_entries'])
+def _compose_briefing(fingerprint, period_label, _snapshot):
+    """Briefing text for a set of digests; cached on the fingerprint only.
+    
+    `_snapshot` returns copies of the digests and is not hashed, so they are
+    only copied when the briefing actually has to be composed.
+    """
+    _digests = _snapshot()
+    count = sum(d.count for d in _digests)
+    positive = sum(d.sentiments['Positive'] for d in _digests)
+    negative = sum(d.sentiments['Negative'] for d in _digests)
+    neutral = sum(d.sentiments['Neutral'] for d in _digests)
+    
+    keywords = Counter()
+    themes = Counter()
+    latest = []
+    for digest in _digests:
+        keywords.update(digest.keywords)
+        themes.update(digest.themes)
+        latest.extend(digest.latest)
+    top_topics = [kw for kw, _ in keywords.most_common(5)]
+    # Same order as the taxonomy's themes, like the original keyword scan
+    theme_list = [theme for theme in current_taxonomy().theme_names if themes[theme]]
+    
+    # Generate summary
+    sentiment_tone = "mixed" if abs(positive - negative) < 3 else ("positive" if positive > negative else "negative")
+    
+    summary_parts = []
+    
+    # Opening
+    summary_parts.append(f"{period_label} political coverage features {count} articles with a {sentiment_tone} overall tone.")
+    
+    # Key topics
+    if top_topics:
+        topics_str = ", ".join([f"**{t}**" for t in top_topics[:3]])
+        summary_parts.append(f"The dominant themes include {topics_str}.")
+    
+    # Sentiment breakdown
+    if positive > 0 or negative > 0:
+        summary_parts.append(f"Sentiment analysis shows {positive} positive, {neutral} neutral, and {negative} negative headlines.")
+    
+    # Theme analysis
+    if theme_list:
+        theme_str = ", ".join([t.capitalize() for t in theme_list[:3]])
+        summary_parts.append(f"Major areas of focus: {theme_str}.")
+    
+    # Top headlines
+    summary_parts.append("\n\n**Top Stories:**")
+    for i, (_, title) in enumerate(sorted(latest, reverse=True)[:3], 1):
+        summary_parts.append(f"\n{i}. {title}")
+    
+    return " ".join(summary_parts), count
+
+def rollup_from_digest(day, digest, top_n=20):
+    """Compact, JSON-friendly summary of one day"""
+    return {
+        'day': day,
+        'count': digest.count,
+        'mean_polarity': digest.polarity_sum / digest.count if digest.count else 0.0,
+        'sentiments': dict(digest.sentiments),
+        'categories': dict(digest.categories),
+        'entities': dict(digest.entities.most_common(top_n)),
+        'keywords': dict(digest.keywords.most_common(top_n)),
+    }
+
+class RollupStore:
+    """Daily rollups computed once per closed day and kept in a small JSON file.
+    
+    Rollups hold category, entity and keyword counts, so they are recomputed
+    from the store's rebuilt digests whenever the taxonomy they were taken
+    under changes.
+    """
+    
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.path = path
+        self.rollups = {}  # day number -> rollup
+        self.taxonomy_hashes = None  # taxonomy sections the rollups were taken under
+        self.closed_through = None  # last day number checked for closing
+        self.dirty = set()  # closed days that received late articles since the last close
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            # Files from before the taxonomy was recorded are plain {day: rollup}
+            if 'days' in state:
+                self.taxonomy_hashes = state['taxonomy']
+                state = state['days']
+            self.rollups = {int(day): rollup for day, rollup in state.items()}
+    
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'taxonomy': self.taxonomy_hashes, 'days': self.rollups}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+    
+    def on_articles(self, articles):
+        """Store listener: late articles for a closed day (rolled up yet or not) mark it for rolling up"""
+        today = day_number(time.time())
+        with self.lock:
+            for article in articles:
+                day = day_number(article['published_ts'])
+                if day < today:
+                    self.dirty.add(day)
+    
+    def close_days(self, store, today=None):
+        """Roll up days that closed since the last call (and dirty ones, or all after a taxonomy edit)"""
+        if today is None:
+            today = day_number(time.time())
+        with self.lock:
+            with store.lock:
+                taxonomy_hashes = dict(store.taxonomy_hashes)
+            if self.closed_through is None:
+                # First call: every stored day without a rollup
+                with store.lock:
+                    days = {d for d in store.briefings.days if d < today and d not in self.rollups}
+            else:
+                days = set(range(self.closed_through + 1, today))
+            days |= self.dirty
+            self.dirty = set()
+            self.closed_through = today - 1
+            
+            changed = False
+            if taxonomy_hashes != self.taxonomy_hashes:
+                # Counted under another taxonomy
+                days |= set(self.rollups)
+                self.taxonomy_hashes = taxonomy_hashes
+                changed = True
+            for day in sorted(days):
+                with store.lock:
+                    digest = store.briefings.days.get(day)
+                    if digest is not None:
+                        self.rollups[day] = rollup_from_digest(day, digest)
+                        changed = True
+                    elif self.rollups.pop(day, None) is not None:
+                        changed = True  # nothing stored for it any more
+            if changed:
+                self._save()
+    
+    def get(self, day, store, today=None):
+        """Rollup for a day; the open day is summarized live from its digest"""
+        if today is None:
+            today = day_number(time.time())
+        if day >= today:
+            with store.lock:
+                digest = store.briefings.days.get(day)
+                return rollup_from_digest(day, digest) if digest else None
+        return self.rollups.get(day)
+
+@st.cache_resource
+def get_rollup_store():
+    """Single rollup store per server process"""
+    rollups = RollupStore(ROLLUPS_PATH)
+    get_article_store().listeners.append(rollups.on_articles)
+    return rollups
+
+def generate_summary(store, end_date=None, days=1):
+    """Generate intelligent summary of a day's (or week's) headlines from the briefing index"""
+    today = datetime.now().date()
+    end_date = end_date or today
+    end_day = (end_date - datetime(1970, 1, 1).date()).days
+    
+    with store.lock:
+        digests = store.briefings.digests(end_day, days)
+        if not digests and days == 1 and end_date == today:
+            # Nothing published yet today: brief on the most recent day instead
+            latest_day = store.briefings.latest_day(end_day)
+            if latest_day is not None:
+                digests = store.briefings.digests(latest_day)
+                end_date = datetime(1970, 1, 1).date() + timedelta(days=latest_day)
+        fingerprint = briefing_fingerprint(digests)
+    
+    def snapshot():
+        # Copies, so composition doesn't race with ingestion
+        with store.lock:
+            return [copy.deepcopy(d) for d in digests]
+    
+    if not digests:
+        return "No stored headlines for this period yet. Use the tabs below to explore sentiment analysis, trending keywords, and detailed insights.", 0
+    
+    if days > 1:
+        period_label = "This week's" if end_date == today else f"The week to {end_date.strftime('%b %d')}:"
+    elif end_date == today:
+        period_label = "Today's"
+    elif end_date == today - timedelta(days=1):
+        period_label = "Yesterday's"
+    else:
+        period_label = f"{end_date.strftime('%b %d')}:"
+    
+    return _compose_briefing(fingerprint, period_label, snapshot)
+
+# Point budgets that keep chart payloads bounded regardless of history length
+MAX_LINE_POINTS = 500
+MAX_TIME_BUCKETS = 120
+HISTOGRAM_BINS = 20
+
+# Candidate bar widths, finest first (pandas offset alias, seconds)
+TIME_BUCKETS = [
+    ('h', 3600),
+    ('3h', 3 * 3600),
+    ('6h', 6 * 3600),
+    ('12h', 12 * 3600),
+    ('D', 24 * 3600),
+    ('7D', 7 * 24 * 3600),
+    ('30D', 30 * 24 * 3600),
+]
+
+def lttb_indices(x, y, threshold=MAX_LINE_POINTS):
+    """Largest-Triangle-Three-Buckets: indices of at most `threshold` points preserving line shape"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    
+    indices = [0]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / span
+        avg_y = sum(y[next_start:next_end]) / span
+        
+        # Pick the point in this bucket forming the largest triangle with a and the average
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        a = best
+    indices.append(n - 1)
+    return indices
+
+def downsample_line(df, x_col, y_col, threshold=MAX_LINE_POINTS):
+    """Rows of a time-sorted frame reduced to at most `threshold` points with LTTB"""
+    if len(df) <= threshold:
+        return df
+    x = (df[x_col] - datetime(1970, 1, 1)).dt.total_seconds().tolist()
+    y = df[y_col].tolist()
+    return df.iloc[lttb_indices(x, y, threshold)]
+
+def choose_time_bucket(start, end, max_buckets=MAX_TIME_BUCKETS):
+    """Finest bar width that keeps the visible range within the bucket budget"""
+    span = max((end - start).total_seconds(), 1)
+    for alias, seconds in TIME_BUCKETS:
+        if span / seconds <= max_buckets:
+            return alias
+    return TIME_BUCKETS[-1][0]
+
+class BoundedCache:
+    """Thread-safe LRU cache with a byte budget and optional TTL that counts its evictions"""
+    
+    def __init__(self, name, max_bytes, ttl=None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (value, size in bytes, stored at)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = Counter()  # reason -> count
+    
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[2] > self.ttl:
+                self._evict(key, 'ttl')
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value, size):
+        with self.lock:
+            if key in self.entries:
+                self._evict(key, None)
+            if size > self.max_bytes:
+                self.evictions['too large'] += 1
+                return
+            self.entries[key] = (value, size, time.time())
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._evict(next(iter(self.entries)), 'lru')
+    
+    def get_or_build(self, key, build, size=len):
+        """Cached value for `key`, or `build()` stored under it"""
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value, size(value))
+        return value
+    
+    def _evict(self, key, reason):
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+        if reason:
+            self.evictions[reason] += 1
+    
+    def expire(self):
+        """Drop entries past their TTL (otherwise they go lazily on access)"""
+        if self.ttl is None:
+            return
+        with self.lock:
+            cutoff = time.time() - self.ttl
+            for key in [k for k, (_, _, stored) in self.entries.items() if stored < cutoff]:
+                self._evict(key, 'ttl')
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'cache': self.name,
+                'entries': len(self.entries),
+                'size_kb': self.bytes / 1024,
+                'budget_kb': self.max_bytes / 1024,
+                'ttl_s': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evicted_lru': self.evictions['lru'],
+                'evicted_ttl': self.evictions['ttl'],
+                'rejected_too_large': self.evictions['too large'],
+            }
+
+@st.cache_resource
+def get_cache_registry():
+    """Every BoundedCache in the process by name, for diagnostics"""
+    return {}
+
+def register_cache(cache):
+    get_cache_registry()[cache.name] = cache
+    return cache
+
+# Shared chart styling (wine red theme)
+CHART_LAYOUT = dict(
+    font=dict(family="Inter, sans-serif"),
+    title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
+    plot_bgcolor='rgba(0,0,0,0)',
+    paper_bgcolor='rgba(0,0,0,0)'
+)
+
+# Smaller titles used by the entity charts
+ENTITY_CHART_LAYOUT = dict(
+    yaxis={'categoryorder': 'total ascending'},
+    font=dict(family="Inter, sans-serif"),
+    title_font=dict(size=16, color='#8B0000'),
+    height=400,
+    showlegend=False
 )
 
-# Custom CSS for wine red theme and enhanced styling
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@700&family=Inter:wght@400;600&display=swap');
+def data_fingerprint(*parts):
+    """Stable digest of chart inputs (DataFrames, lists, scalars)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update(repr(list(part.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'|')
+    return digest.hexdigest()
+
+class FigureCache(BoundedCache):
+    """Serialized Plotly figures shared across sessions"""
+    
+    def get_or_build(self, key, build):
+        """Figure for `key`, calling `build()` only when it is not cached"""
+        fig_json = self.get(key)
+        if fig_json is not None:
+            return pio.from_json(fig_json)
+        fig = build()
+        fig_json = fig.to_json()
+        self.put(key, fig_json, len(fig_json))
+        return fig
+
+@st.cache_resource
+def get_figure_cache():
+    """Single figure cache per server process"""
+    return register_cache(FigureCache('figures', **CACHE_POLICY['figures']))
+
+def show_chart(name, data, build, filters=()):
+    """Render a chart, rebuilding it only when its data or the filters changed"""
+    parts = data if isinstance(data, tuple) else (data,)
+    key = f"{name}:{data_fingerprint(*parts, filters)}"
+    fig = get_figure_cache().get_or_build(key, lambda: build(data))
+    st.plotly_chart(fig, use_container_width=True)
+
+HTML_TAG = re.compile(r'<[^>]+>')
+
+def strip_html(text):
+    """Plain text of an RSS description"""
+    return ' '.join(html.unescape(HTML_TAG.sub(' ', text or '')).split())
+
+def enrichment_fields(title, summary):
+    """Sentiment fields for one article's text; pure, so it can run in a worker process.
+    
+    Category and entities depend on the taxonomy and are added by
+    enrich_articles in the calling process.
+    """
+    summary_text = strip_html(summary)
+    sentiment, polarity = analyze_sentiment(title)
+    if summary_text:
+        summary_sentiment, summary_polarity = analyze_sentiment(summary_text)
+    else:
+        summary_sentiment, summary_polarity = None, None
+    fields = {
+        'summary_text': summary_text,
+        'sentiment': sentiment,
+        'polarity': polarity,
+        'summary_sentiment': summary_sentiment,
+        'summary_polarity': summary_polarity,
+        'enrichment_version': ENRICHMENT_VERSION,
+    }
+    return fields
+
+def article_content(article):
+    """The wording of an article; it was revised when this differs"""
+    return article['title'], article.get('summary', '')
+
+def enrichment_digest(article):
+    # Text only: sentiment doesn't depend on the taxonomy, and enrich_articles redoes tags from another one
+    key = f"{ENRICHMENT_VERSION}\0{article['title']}\0{article.get('summary', '')}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+
+class EnrichmentCache:
+    """Append-only log of enrichment results keyed by content digest"""
+    
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        digest, fields = json.loads(line)
+                    except ValueError:
+                        continue
+                    if fields.get('enrichment_version') == ENRICHMENT_VERSION:
+                        self.entries[digest] = fields
+    
+    def get(self, digest):
+        return self.entries.get(digest)
+    
+    def put_many(self, results):
+        self.entries.update(results)
+        if not self.path or not results:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(b''.join(json.dumps([d, fields]).encode('utf-8') + b'\n' for d, fields in results.items()))
+        except OSError as e:
+            print(f"Could not save enrichment cache: {str(e)}")
+
+SENTIMENT_LABELS = ('Positive', 'Neutral', 'Negative')
+SENTIMENT_CODES = {label: code for code, label in enumerate(SENTIMENT_LABELS)}
+
+class ArticleRecord:
+    """Immutable enriched article: slotted, sentiment coded, category and entities interned.
+    
+    Reads like the dict it replaces (record['title'], record.get('category'))
+    so callers don't change; to_dict() gives the shape written to the history log.
+    """
+    
+    __slots__ = ('title', 'link', 'published', 'summary', 'summary_text', 'published_ts', 'polarity',
+                 'summary_polarity', '_sentiment', '_summary_sentiment', 'category', 'entities',
+                 'enrichment_version', 'taxonomy')
+    FIELDS = ('title', 'link', 'published', 'published_ts', 'summary', 'summary_text', 'sentiment',
+              'polarity', 'summary_sentiment', 'summary_polarity', 'category', 'entities', 'enrichment_version',
+              'taxonomy')
+    FIELD_SET = frozenset(FIELDS)
+    
+    @classmethod
+    def from_dict(cls, data):
+        summary_sentiment = data.get('summary_sentiment')
+        record = object.__new__(cls)
+        record.__setstate__((
+            data['title'],
+            data.get('link', ''),
+            data.get('published', ''),
+            data.get('summary', ''),
+            data.get('summary_text', ''),
+            int(data['published_ts']),
+            float(data['polarity']),
+            data.get('summary_polarity'),
+            SENTIMENT_CODES[data['sentiment']],
+            SENTIMENT_CODES[summary_sentiment] if summary_sentiment else None,
+            sys.intern(data['category']),
+            tuple(sys.intern(entity) for entity in data['entities']),
+            data.get('enrichment_version', 1),
+            sys.intern(data.get('taxonomy', '')),
+        ))
+        return record
+    
+    def retagged(self, taxonomy):
+        """This article with category and entities from `taxonomy`; itself if they already are"""
+        if self.taxonomy == taxonomy.tag:
+            return self
+        data = self.to_dict()
+        data.update(taxonomy.tag_fields(self.title, self.summary_text))
+        return ArticleRecord.from_dict(data)
+    
+    @property
+    def sentiment(self):
+        return SENTIMENT_LABELS[self._sentiment]
+    
+    @property
+    def summary_sentiment(self):
+        return None if self._summary_sentiment is None else SENTIMENT_LABELS[self._summary_sentiment]
+    
+    def __getitem__(self, key):
+        if key not in self.FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELD_SET else default
+    
+    def __contains__(self, key):
+        return key in self.FIELD_SET
+    
+    def keys(self):
+        return iter(self.FIELDS)
+    
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data['entities'] = list(self.entities)
+        return data
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("ArticleRecord is immutable")
+    
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+    
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            object.__setattr__(self, slot, value)
+    
+    def __repr__(self):
+        return f"ArticleRecord({self.title!r}, {self.sentiment}, {self.category})"
+
+def _enrichment_fields_batch(texts):
+    return [enrichment_fields(title, summary) for title, summary in texts]
+
+def enrich_articles(articles, taxonomy, cache=None, pool_min_batch=ENRICH_POOL_MIN_BATCH, workers=None, pool=None):
+    """Enrich a batch of articles (raw or stale) into ArticleRecords tagged with `taxonomy`.
+    
+    Sentiment is reused from the cache (keyed on the text only); cached tags
+    from another taxonomy are redone. Cache misses are scored inline for
+    small batches and in a process pool for large ones such as history
+    backfills; pass `pool` to reuse one executor across batches instead of
+    starting a new one each time.
+    """
+    digests = [enrichment_digest(a) for a in articles]
+    results = {}
+    missing = {}
+    for digest, article in zip(digests, articles):
+        cached = cache.get(digest) if cache else None
+        if cached is not None:
+            if cached.get('taxonomy') != taxonomy.tag:
+                # Scored under another taxonomy: the sentiment still holds, the tags are redone
+                cached = dict(cached, **taxonomy.tag_fields(article['title'], cached.get('summary_text', '')))
+            results[digest] = cached
+        elif digest not in missing:
+            missing[digest] = (article['title'], article.get('summary', ''))
+    
+    if missing:
+        texts = list(missing.values())
+        if len(texts) >= pool_min_batch:
+            chunks = [texts[i:i + 100] for i in range(0, len(texts), 100)]
+            if pool is None:
+                with ProcessPoolExecutor(max_workers=workers) as own_pool:
+                    computed = [fields for batch in own_pool.map(_enrichment_fields_batch, chunks) for fields in batch]
+            else:
+                computed = [fields for batch in pool.map(_enrichment_fields_batch, chunks) for fields in batch]
+        else:
+            computed = _enrichment_fields_batch(texts)
+        for (title, _), fields in zip(texts, computed):
+            fields.update(taxonomy.tag_fields(title, fields['summary_text']))
+        new_results = dict(zip(missing, computed))
+        results.update(new_results)
+        if cache:
+            cache.put_many(new_results)
+    
+    enriched = []
+    for digest, article in zip(digests, articles):
+        item = dict(article)
+        item.update(results[digest])
+        # Epoch seconds; published_parsed is UTC, articles without a date count as seen now
+        if 'published_ts' not in item:
+            if article.get('published_parsed'):
+                item['published_ts'] = calendar.timegm(tuple(article['published_parsed']))
+            else:
+                item['published_ts'] = int(time.time())
+        enriched.append(ArticleRecord.from_dict(item))
+    return enriched
+
+def enrich_article(article, taxonomy):
+    """Record for a raw feed article with sentiment, category and entities added"""
+    return enrich_articles([article], taxonomy)[0]
+
+def utc_datetime(timestamp):
+    """Naive UTC datetime for an epoch timestamp, matching datetime(*published_parsed[:6]) of the feed"""
+    return datetime(1970, 1, 1) + timedelta(seconds=timestamp)
+
+def day_number(timestamp):
+    """Day bucket (days since epoch, UTC) for an epoch timestamp"""
+    return int(timestamp // 86400)
+
+class EntityCooccurrenceIndex:
+    """Sparse per-day entity co-occurrence counts, updated one article at a time"""
+    
+    def __init__(self):
+        # day -> entity -> {other entity: articles mentioning both}
+        self.pairs = {}
+        # day -> {entity: articles mentioning it}
+        self.mentions = {}
+    
+    def add(self, entities, day):
+        """Record one article's entities in the given day bucket"""
+        unique = sorted(set(entities))
+        day_mentions = self.mentions.setdefault(day, Counter())
+        day_mentions.update(unique)
+        
+        day_pairs = self.pairs.setdefault(day, {})
+        for a, b in combinations(unique, 2):
+            day_pairs.setdefault(a, Counter())[b] += 1
+            day_pairs.setdefault(b, Counter())[a] += 1
+    
+    def _days(self, days, today):
+        if today is None:
+            today = day_number(time.time())
+        return range(today - days + 1, today + 1)
+    
+    def mention_counts(self, days=7, today=None):
+        """Number of articles mentioning each entity over the last N days"""
+        totals = Counter()
+        for day in self._days(days, today):
+            totals.update(self.mentions.get(day, {}))
+        return totals
+    
+    def top_comentions(self, entity, days=7, top_n=10, today=None):
+        """Entities most often mentioned alongside `entity` over the last N days"""
+        totals = Counter()
+        for day in self._days(days, today):
+            neighbours = self.pairs.get(day, {}).get(entity)
+            if neighbours:
+                totals.update(neighbours)
+        return totals.most_common(top_n)
+    
+    def top_pairs(self, days=7, top_n=10, today=None):
+        """Most frequent entity pairs over the last N days"""
+        totals = Counter()
+        for day in self._days(days, today):
+            for a, neighbours in self.pairs.get(day, {}).items():
+                for b, count in neighbours.items():
+                    if a < b:
+                        totals[(a, b)] += count
+        return totals.most_common(top_n)
+
+# Windows served by the sentiment time-series engine
+SENTIMENT_WINDOWS = {
+    '1h': 3600,
+    '24h': 24 * 3600,
+    '7d': 7 * 24 * 3600,
+    '30d': 30 * 24 * 3600,
+}
+
+class SentimentSeries:
+    """Hourly polarity buckets and a time-decayed EWMA for one series"""
+    
+    def __init__(self, half_life=24 * 3600):
+        self.half_life = half_life
+        self.buckets = {}  # hour number -> [polarity sum, article count]
+        # Decayed sums referenced to ewma_ts, so EWMA = ewma_sum / ewma_weight
+        self.ewma_sum = 0.0
+        self.ewma_weight = 0.0
+        self.ewma_ts = None
+    
+    def add(self, timestamp, polarity):
+        """O(1) update for one article"""
+        bucket = self.buckets.setdefault(int(timestamp // 3600), [0.0, 0])
+        bucket[0] += polarity
+        bucket[1] += 1
+        
+        if self.ewma_ts is None:
+            self.ewma_ts = timestamp
+        if timestamp >= self.ewma_ts:
+            decay = 0.5 ** ((timestamp - self.ewma_ts) / self.half_life)
+            self.ewma_sum = self.ewma_sum * decay + polarity
+            self.ewma_weight = self.ewma_weight * decay + 1.0
+            self.ewma_ts = timestamp
+        else:
+            # Late arrival: weight it as if it had been added at its own time
+            decay = 0.5 ** ((self.ewma_ts - timestamp) / self.half_life)
+            self.ewma_sum += polarity * decay
+            self.ewma_weight += decay
+    
+    @property
+    def ewma(self):
+        return self.ewma_sum / self.ewma_weight if self.ewma_weight else 0.0
+    
+    def window(self, seconds, now=None):
+        """Mean polarity and article count over the trailing window"""
+        if now is None:
+            now = time.time()
+        last_hour = int(now // 3600)
+        total, count = 0.0, 0
+        for hour in range(last_hour - max(int(seconds // 3600), 1) + 1, last_hour + 1):
+            bucket = self.buckets.get(hour)
+            if bucket:
+                total += bucket[0]
+                count += bucket[1]
+        return (total / count if count else None), count
+    
+    def resample(self, bucket_hours, span_hours, now=None):
+        """(bucket start, mean polarity, count) rows for a chart, oldest first"""
+        if now is None:
+            now = time.time()
+        last_hour = int(now // 3600)
+        first_bucket = (last_hour - span_hours + 1) // bucket_hours
+        rows = []
+        for b in range(first_bucket, last_hour // bucket_hours + 1):
+            total, count = 0.0, 0
+            for hour in range(b * bucket_hours, (b + 1) * bucket_hours):
+                bucket = self.buckets.get(hour)
+                if bucket:
+                    total += bucket[0]
+                    count += bucket[1]
+            if count:
+                rows.append((utc_datetime(b * bucket_hours * 3600), total / count, count))
+        return rows
+
+class SentimentTimeSeries:
+    """Overall, per-category and per-entity sentiment series over stored history"""
+    
+    def __init__(self):
+        self.series = {}
+    
+    def add(self, article):
+        keys = ['All', f"Category: {article['category']}"]
+        keys += [f"Entity: {entity}" for entity in article['entities']]
+        for key in keys:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = SentimentSeries()
+            series.add(article['published_ts'], article['polarity'])
+    
+    def names(self):
+        """Series names, overall first, then by number of articles"""
+        def size(name):
+            return sum(bucket[1] for bucket in self.series[name].buckets.values())
+        return sorted(self.series, key=lambda name: (name != 'All', -size(name), name))
+
+# Burst detection: the trailing window is compared against the hours before it
+BURST_WINDOW_HOURS = 6
+BURST_BASELINE_HOURS = 7 * 24
+BURST_MIN_MENTIONS = 3
+BURST_MIN_SCORE = 2.0
+
+class BurstDetector:
+    """Hourly keyword/entity counts with z-scores against a rolling baseline.
+    
+    Only terms touched by new articles, or whose counts slid across a window
+    edge since the last call, are rescored, so keeping the trending list
+    current costs time proportional to the new articles, not the history.
+    """
+    
+    def __init__(self, window_hours=BURST_WINDOW_HOURS, baseline_hours=BURST_BASELINE_HOURS,
+                 min_mentions=BURST_MIN_MENTIONS, min_score=BURST_MIN_SCORE):
+        self.window_hours = window_hours
+        self.baseline_hours = baseline_hours
+        self.min_mentions = min_mentions
+        self.min_score = min_score
+        self.counts = {}  # term -> {hour number: articles}
+        self.terms_by_hour = {}  # hour number -> terms seen that hour
+        self.dirty = set()
+        self.bursting = {}  # term -> (score, recent count, expected count), above min_score only
+        self.scored_hour = None
+    
+    def add(self, article):
+        """Count one article's keywords and entities in its publication hour"""
+        hour = int(article['published_ts'] // 3600)
+        terms = {f"keyword:{w}" for w in keyword_tokens(article['title'])}
+        terms.update(f"entity:{e}" for e in article['entities'])
+        hour_terms = self.terms_by_hour.setdefault(hour, set())
+        for term in terms:
+            hours = self.counts.setdefault(term, {})
+            hours[hour] = hours.get(hour, 0) + 1
+            hour_terms.add(term)
+        self.dirty.update(terms)
+    
+    def score(self, term, now_hour):
+        """(z-score, count in the window, expected count) for one term"""
+        hours = self.counts.get(term, {})
+        window_start = now_hour - self.window_hours + 1
+        recent = sum(hours.get(h, 0) for h in range(window_start, now_hour + 1))
+        baseline = [hours.get(h, 0) for h in range(window_start - self.baseline_hours, window_start)]
+        mean = sum(baseline) / len(baseline)
+        variance = sum((c - mean) ** 2 for c in baseline) / len(baseline)
+        expected = mean * self.window_hours
+        # Poisson floor on the variance keeps rare terms from scoring off a flat zero baseline
+        spread = (max(variance, mean) * self.window_hours + 1) ** 0.5
+        return (recent - expected) / spread, recent, expected
+    
+    def _slide(self, now_hour):
+        # Terms whose counts crossed the window or baseline edge since the last scoring
+        if self.scored_hour is None or now_hour - self.scored_hour > self.window_hours + self.baseline_hours:
+            self.dirty.update(self.counts)
+            return
+        for hour in range(self.scored_hour + 1, now_hour + 1):
+            for edge in (hour - self.window_hours, hour - self.window_hours - self.baseline_hours):
+                self.dirty.update(self.terms_by_hour.get(edge, ()))
+    
+    def trending(self, top_n=15, now=None):
+        """Most strongly bursting terms: [(term, score, recent count, expected count)]"""
+        now_hour = int((time.time() if now is None else now) // 3600)
+        if now_hour != self.scored_hour:
+            self._slide(now_hour)
+            self.scored_hour = now_hour
+        for term in self.dirty:
+            score, recent, expected = self.score(term, now_hour)
+            if recent >= self.min_mentions and score >= self.min_score:
+                self.bursting[term] = (score, recent, expected)
+            else:
+                self.bursting.pop(term, None)
+        self.dirty = set()
+        ranked = sorted(self.bursting.items(), key=lambda item: item[1][0], reverse=True)
+        return [(term, *values) for term, values in ranked[:top_n]]
+
+ARCHIVE_SCHEMA = pa.schema([
+    ('link', pa.string()),
+    ('title', pa.string()),
+    ('published_ts', pa.int64()),
+    ('sentiment', pa.dictionary(pa.int8(), pa.string())),
+    ('polarity', pa.float64()),
+    ('summary_sentiment', pa.dictionary(pa.int8(), pa.string())),
+    ('summary_polarity', pa.float64()),
+    ('category', pa.dictionary(pa.int8(), pa.string())),
+    ('entities', pa.list_(pa.string())),
+])
+
+class HistoryArchive:
+    """Enriched articles as uncompressed Arrow IPC files partitioned by UTC publication date.
+    
+    Scans prune partitions on the date and push time, category and sentiment
+    filters down to the files, which are memory-mapped, so numeric columns
+    are used in place rather than copied into Python objects. The tag of the
+    taxonomy the categories and entities were assigned under is kept next to
+    the partitions; after an edit the archive is rewritten from the store.
+    """
+    
+    def __init__(self, root):
+        self.root = root
+        self.partitioning = ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive')
+        self.filesystem = pafs.LocalFileSystem(use_mmap=True)
+    
+    def _partition(self, day):
+        return os.path.join(self.root, f"date={day}")
+    
+    def _write(self, directory, table):
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{time.time_ns()}-{os.getpid()}.arrow"
+        tmp_path = os.path.join(directory, f".{name}.tmp")
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, ARCHIVE_SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, os.path.join(directory, name))
+    
+    def append(self, articles, compact=True):
+        """Write a batch of enriched articles, one new file per date touched; returns the dates"""
+        by_day = {}
+        for article in articles:
+            day = utc_datetime(article['published_ts']).date().isoformat()
+            by_day.setdefault(day, []).append({field: article.get(field) for field in ARCHIVE_SCHEMA.names})
+        try:
+            for day, rows in by_day.items():
+                self._write(self._partition(day), pa.Table.from_pylist(rows, schema=ARCHIVE_SCHEMA))
+                if compact:
+                    self.compact(day)
+        except OSError as e:
+            print(f"Could not write history archive: {str(e)}")
+        return list(by_day)
+    
+    def bootstrap(self, store):
+        """Archive everything already in the store, once per archive directory"""
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            # Claimed atomically so only one process fills a new archive
+            os.close(os.open(os.path.join(self.root, '.bootstrapped'), os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return
+        with store.lock:
+            articles = list(store.articles.values())
+            tag = store.taxonomy.tag
+        self.append(articles)
+        self._set_tag(tag)
+    
+    def tag(self):
+        """Tag of the taxonomy the archived categories and entities come from, or None if unknown"""
+        try:
+            with open(os.path.join(self.root, '.taxonomy'), encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    def _set_tag(self, tag):
+        tmp_path = os.path.join(self.root, f".taxonomy.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(tag)
+        os.replace(tmp_path, os.path.join(self.root, '.taxonomy'))
+    
+    def retag(self, store):
+        """Rewrite every partition from the store's articles if they were archived under another taxonomy"""
+        if not os.path.isdir(self.root) or self.tag() == store.taxonomy.tag:
+            return
+        try:
+            # Once per taxonomy, whichever process gets here first
+            claim = os.path.join(self.root, f".retag-{store.taxonomy.tag}")
+            os.close(os.open(claim, os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return
+        try:
+            # Under the store lock this process appends nothing in between
+            with store.lock:
+                tag = store.taxonomy.tag
+                articles = list(store.articles.values())
+                old_parts = [os.path.join(directory, name) for directory, _, names in os.walk(self.root)
+                             for name in names if name.endswith('.arrow')]
+            days = self.append(articles, compact=False)
+            for path in old_parts:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # compacted by another process meanwhile
+            for day in days:
+                self.compact(day)
+            self._set_tag(tag)
+        except OSError as e:
+            print(f"Could not retag history archive: {str(e)}")
+        finally:
+            os.remove(claim)
+    
+    def compact(self, day, max_parts=ARCHIVE_COMPACT_PARTS):
+        """Merge a partition's files into one once there are more than `max_parts`"""
+        directory = self._partition(day)
+        parts = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.arrow')]
+        if len(parts) <= max_parts:
+            return
+        tables = []
+        for path in parts:
+            with pa.memory_map(path) as source:
+                tables.append(pa.ipc.open_file(source).read_all())
+        merged = pa.concat_tables(tables).unify_dictionaries().combine_chunks()
+        self._write(directory, self._dedupe(merged))
+        for path in parts:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    def _dedupe(self, table):
+        """Keep the first row per link (concurrent writers can archive an article twice)"""
+        indexed = table.append_column('_row', pa.array(range(len(table)), pa.int64()))
+        first = indexed.group_by('link', use_threads=False).aggregate([('_row', 'min')])['_row_min']
+        return table.take(pc.sort_indices(first))
+    
+    def scan(self, start_ts, end_ts=None, categories=None, sentiments=None, text=None, columns=None):
+        """Arrow table of archived articles published in [start_ts, end_ts) matching the filters"""
+        if not os.path.isdir(self.root):
+            return ARCHIVE_SCHEMA.empty_table()
+        condition = (ds.field('date') >= utc_datetime(start_ts).date().isoformat()) & (ds.field('published_ts') >= start_ts)
+        if end_ts is not None:
+            condition &= (ds.field('date') <= utc_datetime(end_ts).date().isoformat()) & (ds.field('published_ts') < end_ts)
+        if categories is not None:
+            condition &= ds.field('category').isin(list(categories))
+        if sentiments is not None:
+            condition &= ds.field('sentiment').isin(list(sentiments))
+        if text:
+            condition &= pc.match_substring(ds.field('title'), text, ignore_case=True)
+        # Files being written are dot-prefixed, which discovery skips
+        dataset = ds.dataset(self.root, format='ipc', partitioning=self.partitioning, filesystem=self.filesystem)
+        return dataset.to_table(columns=columns, filter=condition).unify_dictionaries()
+
+# Warm-start snapshot of the store: a fixed header, then a pickle of SNAPSHOT_FIELDS
+SNAPSHOT_MAGIC = b'NYTSNAP\0'
+SNAPSHOT_FORMAT = 3
+# magic, format, enrichment version, history log offset covered, payload bytes
+SNAPSHOT_HEADER = struct.Struct('<8sHHQQ')
+SNAPSHOT_FIELDS = ('articles', 'sequence', 'log_offset', 'cooccurrence', 'timeseries',
+                   'briefings', 'bursts', 'phrases', 'by_tag', 'taxonomy_hashes')
+CATCH_UP_CHUNK_LINES = 2000
+
+class SnapshotUnpickler(pickle.Unpickler):
+    """Only rebuilds the store's own classes and standard containers.
+    
+    The dashboard runs as __main__ under Streamlit but as streamlit_app when
+    imported by the API server, so our classes are resolved here by name.
+    """
+    
+    def find_class(self, module, name):
+        if module in ('__main__', 'streamlit_app', __name__) and isinstance(globals().get(name), type):
+            return globals()[name]
+        if module in ('builtins', 'collections', 'copyreg'):
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Unexpected class in snapshot: {module}.{name}")
+
+# Indexes the store keeps over every article, and how to start each one empty
+STORE_INDEX_FACTORIES = {
+    'cooccurrence': EntityCooccurrenceIndex,
+    'timeseries': SentimentTimeSeries,
+    'briefings': BriefingIndex,
+    'bursts': BurstDetector,
+    'phrases': PhraseCounter,
+    'by_tag': dict,
+}
+STORE_INDEXES = frozenset(STORE_INDEX_FACTORIES)
+
+# What has to be recomputed when a taxonomy section changes ('articles': their tags)
+TAXONOMY_DEPENDENTS = {
+    'categories': {'articles', 'timeseries', 'briefings', 'by_tag'},
+    'entities': {'articles', 'cooccurrence', 'timeseries', 'bursts', 'briefings', 'by_tag'},
+    'themes': {'briefings'},
+    'stop_words': {'phrases', 'bursts', 'briefings'},
+}
+
+class ArticleStore:
+    """Process-wide history of enriched articles, shared by all sessions"""
+    
+    def __init__(self, history_path=None, enrichment_cache_path=None, snapshot_path=None):
+        self.lock = threading.Lock()
+        self.log_lock = threading.Lock()  # held by whichever thread is reading the log
+        self.history_path = history_path
+        self.snapshot_path = snapshot_path
+        self.snapshot_revision = 0
+        self.snapshot_at = 0.0
+        self.articles = {}  # link -> enriched article
+        self.cooccurrence = EntityCooccurrenceIndex()
+        self.timeseries = SentimentTimeSeries()
+        self.briefings = BriefingIndex()
+        self.bursts = BurstDetector()
+        self.phrases = PhraseCounter()
+        # "entity:X" / "category:Y" -> most recent article keys, newest last
+        self.by_tag = {}
+        # Called with each batch of newly ingested articles, and of reworded ones
+        self.listeners = []
+        self.revision_listeners = []
+        # Article keys in ingestion order; an article's sequence number is its position + 1
+        self.sequence = []
+        # Bumped by every change to stored content: new, reworded or retagged articles
+        self.revision = 0
+        self.revised = deque(maxlen=1000)  # (revision, key) of reworded articles, oldest first
+        self.changed = threading.Condition(self.lock)
+        self.log_offset = 0  # bytes of the history log already read
+        self.archive = None  # HistoryArchive receiving what this process appends to the log
+        self.enrichment_cache = EnrichmentCache(enrichment_cache_path)
+        # Taxonomy new articles are tagged with, and the sections the stored ones and the indexes reflect
+        self.taxonomy = current_taxonomy()
+        self.taxonomy_hashes = dict(self.taxonomy.hashes)
+    
+    @property
+    def version(self):
+        return len(self.sequence)
+    
+    def catch_up(self, chunk_lines=CATCH_UP_CHUNK_LINES):
+        """Index articles appended to the history log since the last read (by any process).
+        
+        The log is read in chunks and the store lock released in between, so
+        sessions keep being served while a long tail is indexed. Returns at
+        once if another thread is already reading the log.
+        """
+        if not self.history_path or not os.path.exists(self.history_path):
+            return []
+        if not self.log_lock.acquire(blocking=False):
+            return []
+        try:
+            caught_up = []
+            more = True
+            while more:
+                new_articles, revised, more = self._read_log_chunk(chunk_lines)
+                if new_articles:
+                    for listener in self.listeners:
+                        listener(new_articles)
+                    caught_up += new_articles
+                if revised:
+                    for listener in self.revision_listeners:
+                        listener(revised)
+            return caught_up
+        finally:
+            self.log_lock.release()
+    
+    def _read_log_chunk(self, max_lines):
+        """Index up to `max_lines` log lines; returns (new articles, revised articles, whether lines remain)"""
+        new_articles = []
+        revisions = {}  # later lines for a key with other wording: the article was reworded
+        pending = {}  # key -> wording of the latest line read for an article not stored yet
+        more = False
+        with self.lock, open(self.history_path, 'rb') as f:
+            # Only advanced once the lines are indexed, so a snapshot in between can't skip them
+            offset = self.log_offset
+            f.seek(offset)
+            lines = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Still being written; read it next time
+                offset += len(line)
+                lines += 1
+                try:
+                    article = json.loads(line)
+                except ValueError:
+                    continue
+                key = article['link'] or article['title']
+                stored = revisions.get(key) or self.articles.get(key)
+                if stored is None and key not in pending:
+                    pending[key] = article_content(article)
+                    new_articles.append(article)
+                elif article_content(article) != (article_content(stored) if stored else pending[key]):
+                    # Lines repeating the stored wording (our own, or the same item logged by
+                    # another process) are not revisions
+                    revisions[key] = article
+                if lines >= max_lines:
+                    more = True
+                    break
+        
+        # Articles logged by an older enrichment are re-enriched, without holding the lock
+        new_articles = self._records(new_articles)
+        revised = self._records(list(revisions.values()))
+        with self.lock:
+            # Tagged under another taxonomy (or before there was one)
+            taxonomy = self.taxonomy
+            # An ingest may have stored some of them while the lock was released
+            new_articles = [a.retagged(taxonomy) for a in new_articles if (a['link'] or a['title']) not in self.articles]
+            for article in new_articles:
+                self.articles[article['link'] or article['title']] = article
+                self._index(article)
+            revised = self._replace(revised, taxonomy)
+            # An ingest that appended right at the old offset has already moved it past its own lines
+            self.log_offset = max(self.log_offset, offset)
+            if new_articles or revised:
+                self._changed(revised)
+        return new_articles, revised, more
+    
+    def save_snapshot(self):
+        """Write the articles and every index to the snapshot file (atomically replaced)"""
+        if not self.snapshot_path:
+            return
+        with self.lock:
+            state = {field: getattr(self, field) for field in SNAPSHOT_FIELDS}
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+            revision = self.revision
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, ENRICHMENT_VERSION,
+                                      state['log_offset'], len(payload))
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(header)
+                f.write(payload)
+            os.replace(tmp_path, self.snapshot_path)
+            self.snapshot_revision = revision
+        except OSError as e:
+            print(f"Could not save store snapshot: {str(e)}")
+    
+    def load_snapshot(self):
+        """Restore state from the snapshot file; False if it is missing, stale or unreadable"""
+        if not self.snapshot_path or not self.history_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                magic, fmt, enrichment, log_offset, size = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+                # Only valid against the log it was taken from (same or appended to since)
+                if (magic, fmt, enrichment) != (SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, ENRICHMENT_VERSION):
+                    return False
+                if not os.path.exists(self.history_path) or os.path.getsize(self.history_path) < log_offset:
+                    return False
+                payload = f.read(size)
+            state = SnapshotUnpickler(io.BytesIO(payload)).load()
+        except (OSError, EOFError, struct.error, pickle.UnpicklingError, AttributeError, ValueError) as e:
+            print(f"Ignoring unreadable store snapshot: {str(e)}")
+            return False
+        with self.lock:
+            for field in SNAPSHOT_FIELDS:
+                setattr(self, field, state[field])
+            self._changed()
+            self.snapshot_revision = self.revision
+        return True
+    
+    def maybe_snapshot(self, articles=None):
+        """Listener: snapshot in the background if anything changed and the last one is old enough"""
+        if not self.snapshot_path or self.revision == self.snapshot_revision:
+            return
+        if time.time() - self.snapshot_at < SNAPSHOT_INTERVAL:
+            return
+        self.snapshot_at = time.time()
+        threading.Thread(target=self.save_snapshot, daemon=True, name='store-snapshot').start()
+    
+    def since(self, seq, limit=100):
+        """(sequence number, article) pairs ingested after `seq`, oldest first"""
+        with self.lock:
+            keys = self.sequence[seq:seq + limit]
+            return [(seq + i + 1, self.articles[key]) for i, key in enumerate(keys)]
+    
+    def published_since(self, cutoff):
+        """Stored articles published at or after `cutoff` (epoch seconds), newest first"""
+        with self.lock:
+            recent = sorted(((a['published_ts'], key) for key, a in self.articles.items() if a['published_ts'] >= cutoff),
+                            reverse=True)
+            return [self.articles[key] for _, key in recent]
+    
+    def revised_since(self, revision):
+        """(revision, article) pairs reworded after `revision`, oldest first (recent ones only)"""
+        with self.lock:
+            return [(rev, self.articles[key]) for rev, key in self.revised if rev > revision]
+    
+    def wait_for_change(self, seq, revision=None, timeout=None):
+        """Block until an article newer than `seq` arrives (given `revision`: anything changes after it) or the timeout passes"""
+        with self.changed:
+            return self.changed.wait_for(
+                lambda: len(self.sequence) > seq or (revision is not None and self.revision > revision), timeout)
+    
+    def _changed(self, revised=()):
+        """Record a change to stored content and wake waiting clients (lock held)"""
+        self.revision += 1
+        self.revised.extend((self.revision, article['link'] or article['title']) for article in revised)
+        self.changed.notify_all()
+    
+    def ingest(self, articles):
+        """Enrich and index articles not seen before; return the enriched feed in order"""
+        enriched_feed = []
+        new_articles = []
+        with self.lock:
+            fresh = {}
+            for article in articles:
+                key = article['link'] or article['title']
+                if key not in self.articles:
+                    fresh[key] = article
+        # Scored without the lock, so sessions keep being served during a big batch
+        enriched_fresh = dict(zip(fresh, self._records(list(fresh.values()))))
+        
+        with self.lock:
+            taxonomy = self.taxonomy
+            for article in articles:
+                key = article['link'] or article['title']
+                # Checked again: another thread may have stored it in the meantime
+                enriched = self.articles.get(key)
+                if enriched is None:
+                    enriched = enriched_fresh[key].retagged(taxonomy)
+                    self.articles[key] = enriched
+                    self._index(enriched)
+                    new_articles.append(enriched)
+                enriched_feed.append(enriched)
+            if new_articles:
+                self._append_history(new_articles)
+                if self.archive:
+                    self.archive.append(new_articles)
+                self._changed()
+        
+        # Outside the lock so listeners may query the store
+        if new_articles:
+            for listener in self.listeners:
+                listener(new_articles)
+        return enriched_feed
+    
+    def revise(self, articles):
+        """Replace stored articles whose feed entry was reworded; returns the new records.
+        
+        The records are re-enriched and logged again, so the history (and
+        other processes reading it) carry the current wording. The indexes
+        keep counting each article as first ingested.
+        """
+        with self.lock:
+            known = [a for a in articles if (a['link'] or a['title']) in self.articles]
+        records = self._records(known)
+        with self.lock:
+            revised = self._replace(records, self.taxonomy)
+            if revised:
+                self._append_history(revised)
+                self._changed(revised)
+        
+        # Outside the lock so listeners may query the store
+        if revised:
+            for listener in self.revision_listeners:
+                listener(revised)
+        return revised
+    
+    def _records(self, articles):
+        """ArticleRecords, in order, for raw feed articles or logged lines.
+        
+        Raw articles and lines logged by an older enrichment are scored (in a
+        process pool for big batches), so this is called without the store
+        lock.
+        """
+        stale = [a for a in articles if a.get('enrichment_version', 1) < ENRICHMENT_VERSION]
+        upgraded = iter(enrich_articles(stale, self.taxonomy, self.enrichment_cache) if stale else [])
+        return [next(upgraded) if a.get('enrichment_version', 1) < ENRICHMENT_VERSION else ArticleRecord.from_dict(a)
+                for a in articles]
+    
+    def _replace(self, records, taxonomy):
+        """Swap in new versions of articles that are stored; returns those swapped in (lock held)"""
+        replaced = []
+        for record in records:
+            key = record['link'] or record['title']
+            # Skipped if the stored article already has this wording
+            if key in self.articles and article_content(self.articles[key]) != article_content(record):
+                self.articles[key] = record.retagged(taxonomy)
+                replaced.append(self.articles[key])
+        return replaced
+    
+    def _index(self, article):
+        key = article['link'] or article['title']
+        self.sequence.append(key)
+        self._add_to_indexes(key, article, STORE_INDEXES)
+    
+    def _add_to_indexes(self, key, article, indexes):
+        if 'cooccurrence' in indexes:
+            self.cooccurrence.add(article['entities'], day_number(article['published_ts']))
+        if 'timeseries' in indexes:
+            self.timeseries.add(article)
+        if 'bursts' in indexes:
+            self.bursts.add(article)
+        if 'phrases' in indexes:
+            self.phrases.add(article['title'])
+        if 'briefings' in indexes:
+            self.briefings.add(key, article)
+        if 'by_tag' in indexes:
+            for tag in [f"category:{article['category']}"] + [f"entity:{e}" for e in article['entities']]:
+                self.by_tag.setdefault(tag, deque(maxlen=200)).append(key)
+    
+    def apply_taxonomy(self, taxonomy):
+        """Bring articles and indexes in line with `taxonomy`; returns the sections that changed.
+        
+        Only what the changed sections feed is recomputed: new themes rebuild
+        the daily digests, new stop words the phrase, burst and digest counts,
+        and new categories or entities retag the articles and rebuild the
+        indexes keyed on them. Sentiment is never rescored.
+        """
+        with self.lock:
+            self.taxonomy = taxonomy
+            changed = taxonomy.changed_sections(self.taxonomy_hashes)
+            if not changed:
+                return changed
+            rebuild = set().union(*(TAXONOMY_DEPENDENTS[section] for section in changed))
+            if 'articles' in rebuild:
+                self.articles = {key: article.retagged(taxonomy) for key, article in self.articles.items()}
+            for name, factory in STORE_INDEX_FACTORIES.items():
+                if name in rebuild:
+                    setattr(self, name, factory())
+            for key in self.sequence:
+                self._add_to_indexes(key, self.articles[key], rebuild)
+            self.taxonomy_hashes = dict(taxonomy.hashes)
+            self._changed()
+        if self.archive and changed & {'categories', 'entities'}:
+            # Archived tags are rewritten in the background; scans skip category pushdown until then
+            threading.Thread(target=self.archive.retag, args=(self,), daemon=True, name='archive-retag').start()
+        return changed
+    
+    def related(self, article, top_n=5):
+        """Stored articles sharing the most entities (then the category) with `article`"""
+        own_key = article['link'] or article['title']
+        scores = Counter()
+        with self.lock:
+            for entity in article['entities']:
+                for key in self.by_tag.get(f"entity:{entity}", ()):
+                    scores[key] += 2
+            for key in self.by_tag.get(f"category:{article['category']}", ()):
+                scores[key] += 1
+            scores.pop(own_key, None)
+            ranked = sorted(scores, key=lambda k: (scores[k], self.articles[k]['published_ts']), reverse=True)
+            return [self.articles[k] for k in ranked[:top_n]]
+    
+    def _append_history(self, articles):
+        if not self.history_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.history_path) or '.', exist_ok=True)
+            with open(self.history_path, 'ab') as f:
+                start = f.seek(0, os.SEEK_END)
+                for article in articles:
+                    f.write(json.dumps(article.to_dict()).encode('utf-8') + b'\n')
+                # Skip re-reading our own lines unless another process wrote in between
+                if start == self.log_offset:
+                    self.log_offset = f.tell()
+        except OSError as e:
+            st.warning(f"Could not save article history: {str(e)}")
+
+@st.cache_resource
+def get_article_store():
+    """Single article store per server process, warmed from the snapshot and history log"""
+    store = ArticleStore(HISTORY_PATH, ENRICHMENT_CACHE_PATH, SNAPSHOT_PATH)
+    store.archive = HistoryArchive(ARCHIVE_DIR)
+    
+    def warm_up():
+        store.catch_up()
+        store.archive.bootstrap(store)
+        # The taxonomy may have been edited while nothing was running
+        store.archive.retag(store)
+    
+    if store.load_snapshot():
+        # The taxonomy may have been edited since the snapshot was taken
+        store.apply_taxonomy(current_taxonomy())
+        # Serve from the snapshot right away; index what was logged since in the background
+        threading.Thread(target=warm_up, daemon=True, name='store-catch-up').start()
+    else:
+        warm_up()
+    store.listeners.append(store.maybe_snapshot)
+    store.revision_listeners.append(store.maybe_snapshot)
+    store.maybe_snapshot()
+    return store
+
+class ContextBackend:
+    """Interface for "Get Context" lookups; subclasses return a dict for the context panel"""
+    
+    label = 'Context'
+    
+    def lookup(self, topic, article):
+        raise NotImplementedError
+
+class HistoryContextBackend(ContextBackend):
+    """Offline backend: related headlines and entity sentiment from stored history"""
+    
+    label = 'Stored history'
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def lookup(self, topic, article):
+        entity_sentiment = {}
+        for entity in article['entities']:
+            series = self.store.timeseries.series.get(f"Entity: {entity}")
+            if series is not None:
+                entity_sentiment[entity] = series.ewma
+        return {
+            'related': [
+                {'title': a['title'], 'link': a['link'], 'published': a['published'], 'sentiment': a['sentiment']}
+                for a in self.store.related(article)
+            ],
+            'entity_sentiment': entity_sentiment,
+        }
+
+class AnthropicContextBackend(ContextBackend):
+    """Short background paragraph from Claude (needs `anthropic` and ANTHROPIC_API_KEY)"""
+    
+    label = 'Claude'
+    
+    def __init__(self, store, model=None):
+        if Anthropic is None:
+            raise RuntimeError("The anthropic package is not installed")
+        self.client = Anthropic()
+        self.model = model or os.environ.get('NYT_CONTEXT_MODEL', 'claude-3-5-haiku-latest')
+        # Related headlines still come from local history
+        self.history = HistoryContextBackend(store)
+    
+    def lookup(self, topic, article):
+        context = self.history.lookup(topic, article)
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=300,
+            messages=[{
+                'role': 'user',
+                'content': f"In three sentences, give neutral background for this US politics headline: {article['title']}"
+            }]
+        )
+        context['background'] = ''.join(block.text for block in response.content if hasattr(block, 'text'))
+        return context
+
+CONTEXT_BACKENDS = {
+    'history': HistoryContextBackend,
+    'anthropic': AnthropicContextBackend,
+}
+
+class ContextService:
+    """Runs context lookups on a small thread pool and caches results by topic"""
+    
+    def __init__(self, backend, max_workers=CONTEXT_WORKERS, timeout=CONTEXT_TIMEOUT, error_ttl=CONTEXT_ERROR_TTL):
+        self.backend = backend
+        self.timeout = timeout
+        self.error_ttl = error_ttl
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='context')
+        self.pending = {}  # topic key -> (future, submitted at)
+        self.failures = {}  # topic key -> (message, retry after)
+        self.results = register_cache(BoundedCache('context', **CACHE_POLICY['context']))
+    
+    @staticmethod
+    def key(article):
+        return extract_main_topic(article['title']).lower()
+    
+    def request(self, article):
+        """Start a lookup unless one is cached or already running"""
+        key = self.key(article)
+        with self.lock:
+            if self.results.get(key) is not None or self._failure(key):
+                return
+            if key not in self.pending:
+                topic = extract_main_topic(article['title'])
+                future = self.executor.submit(self.backend.lookup, topic, article)
+                self.pending[key] = (future, time.time())
+    
+    def status(self, article):
+        """('ready', context), ('pending', None), ('error', message) or (None, None) if never requested"""
+        key = self.key(article)
+        with self.lock:
+            if key in self.pending:
+                future, submitted = self.pending[key]
+                if future.done():
+                    del self.pending[key]
+                    try:
+                        context = future.result()
+                    except Exception as e:
+                        self.failures[key] = (str(e), time.time() + self.error_ttl)
+                        return 'error', str(e)
+                    self.results.put(key, context, len(json.dumps(context, default=str)))
+                elif time.time() - submitted > self.timeout:
+                    message = f"Lookup timed out after {self.timeout}s"
+                    if future.cancel():
+                        # Never started; retried once the failure expires
+                        del self.pending[key]
+                        self.failures[key] = (message, time.time() + self.error_ttl)
+                    # A running lookup stays pending so it is not submitted again while it
+                    # holds a worker; its result is still cached if it finishes
+                    return 'error', message
+                else:
+                    return 'pending', None
+            
+            context = self.results.get(key)
+            if context is not None:
+                return 'ready', context
+            message = self._failure(key)
+            if message:
+                return 'error', message
+        return None, None
+    
+    def _failure(self, key):
+        """Message of a recent failed lookup, or None once it may be retried (lock held)"""
+        if key not in self.failures:
+            return None
+        message, retry_after = self.failures[key]
+        if time.time() >= retry_after:
+            del self.failures[key]
+            return None
+        return message
+
+@st.cache_resource
+def get_context_service():
+    """Single context service per server process, so results are shared across sessions"""
+    store = get_article_store()
+    try:
+        backend = CONTEXT_BACKENDS[CONTEXT_BACKEND](store)
+    except Exception as e:
+        st.warning(f"Context backend '{CONTEXT_BACKEND}' unavailable ({str(e)}); using stored history")
+        backend = HistoryContextBackend(store)
+    return ContextService(backend)
+
+def poll_context_panel(article, service):
+    """Fragment body while a lookup runs; once it settles the app reruns and draws the panel without a timer"""
+    if service.status(article)[0] == 'pending':
+        render_context_panel(article, service)
+    else:
+        st.rerun()
+
+def render_context_panel(article, service):
+    """Context panel for one headline; never blocks on a running lookup"""
+    state, context = service.status(article)
+    topic = extract_main_topic(article['title'])
+    category = article.get('category', '📰 General')
+    
+    if state == 'pending':
+        st.caption(f"⏳ Gathering context for *{topic}*...")
+        return
+    if state == 'error':
+        st.info(f"**Topic:** {topic} | **Category:** {category} — context unavailable: {context}")
+        return
+    if state is None:
+        return
+    
+    # Feed and backend text is escaped like the cards' (html_text)
+    related_html = "".join(
+        f'<li><a href="{html_text(r["link"])}" target="_blank" style="color: #8B0000;">{html_text(r["title"])}</a> '
+        f'<span class="sentiment-{r["sentiment"].lower()}">{r["sentiment"]}</span></li>'
+        for r in context.get('related', [])
+    )
+    entity_html = ", ".join(f"{html_text(entity)} ({score:+.2f})"
+                            for entity, score in context.get('entity_sentiment', {}).items())
+    background = context.get('background')
+    
+    # Optional sections joined on one line; blank lines would end the HTML block
+    extras = ''.join([
+        f'<p>{html_text(background)}</p>' if background else '',
+        f'<p><strong>Entity sentiment (24h EWMA):</strong> {entity_html}</p>' if entity_html else '',
+        f'<p><strong>Related coverage:</strong></p><ul>{related_html}</ul>' if related_html else '',
+    ])
+    
+    st.markdown(f"""
+    <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; 
+                border-left: 4px solid #8B0000; margin: 10px 0;">
+        <h4 style="color: #8B0000; margin-bottom: 10px;">📰 Article Context</h4>
+        <p><strong>Main Topic:</strong> {html_text(topic)}</p>
+        <p><strong>Category:</strong> {html_text(category)}</p>
+        <p><strong>Sentiment:</strong> {article['sentiment']} ({article['polarity']:.2f})</p>
+        {extras}
+        <p style="margin-top: 10px; font-size: 12px; color: #666;">Source: {service.backend.label}</p>
+        <p style="margin-top: 10px;">
+            <a href="{html_text(article['link'])}" target="_blank" 
+               style="color: #8B0000; text-decoration: underline;">
+                Read full article on NYT →
+            </a>
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+
+class AlertEngine:
+    """Watchlist rules compiled into an index of conditions and evaluated against newly ingested articles"""
+    
+    def __init__(self, rules_path=None, webhook_url=''):
+        self.lock = threading.Lock()
+        self.rules_path = rules_path
+        self.webhook_url = webhook_url
+        self.rules = []
+        self.feed = deque(maxlen=200)  # most recent alerts, newest last
+        self.seq = 0
+        self.webhook_error = None  # (message, failed at) of the last failed delivery
+        self.sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alert-webhook')
+        self._load()
+        self._compile()
+    
+    def _load(self):
+        if self.rules_path and os.path.exists(self.rules_path):
+            with open(self.rules_path, encoding='utf-8') as f:
+                self.rules = json.load(f)
+    
+    def _save(self):
+        if not self.rules_path:
+            return
+        os.makedirs(os.path.dirname(self.rules_path) or '.', exist_ok=True)
+        with open(self.rules_path, 'w', encoding='utf-8') as f:
+            json.dump(self.rules, f, indent=2)
+    
+    def _compile(self):
+        """Build an inverted index from condition to rules, and the longest keyword phrase in words"""
+        self.rules_by_condition = {}
+        self.max_phrase_words = 0
+        for rule in self.rules:
+            for condition in self._conditions(rule):
+                self.rules_by_condition.setdefault(condition, []).append(rule['id'])
+                if condition[0] == 'keyword':
+                    self.max_phrase_words = max(self.max_phrase_words, len(condition[1].split()))
+    
+    @staticmethod
+    def _words(text):
+        return re.findall(r'\w+', text.lower())
+    
+    @classmethod
+    def _conditions(cls, rule):
+        """All conditions a rule requires; every one must hold for it to fire"""
+        phrases = (' '.join(cls._words(phrase)) for phrase in rule.get('keywords', []))
+        conditions = [('keyword', phrase) for phrase in phrases if phrase]
+        for kind in ('entity', 'category', 'sentiment'):
+            if rule.get(kind):
+                conditions.append((kind, rule[kind]))
+        return conditions
+    
+    def add_rule(self, name, keywords=(), entity=None, category=None, sentiment=None):
+        rule = {
+            'id': uuid.uuid4().hex[:12],
+            'name': name,
+            'keywords': [k.strip() for k in keywords if k.strip()],
+            'entity': entity,
+            'category': category,
+            'sentiment': sentiment,
+        }
+        if not self._conditions(rule):
+            raise ValueError("A rule needs at least one keyword, entity, category or sentiment")
+        with self.lock:
+            self.rules.append(rule)
+            self._save()
+            self._compile()
+        return rule
+    
+    def remove_rule(self, rule_id):
+        with self.lock:
+            self.rules = [r for r in self.rules if r['id'] != rule_id]
+            self._save()
+            self._compile()
+    
+    def match(self, article):
+        """Ids of rules whose conditions all hold for the article"""
+        found = set()
+        # Every word run of up to the longest phrase, so "white house" and "house" both match
+        words = self._words(article['title'])
+        for n in range(1, self.max_phrase_words + 1):
+            found.update(('keyword', ' '.join(words[i:i + n])) for i in range(len(words) - n + 1))
+        found.update(('entity', entity) for entity in article['entities'])
+        found.add(('category', article['category']))
+        found.add(('sentiment', article['sentiment']))
+        
+        hits = Counter()
+        for condition in found:
+            hits.update(self.rules_by_condition.get(condition, ()))
+        return [rule for rule in self.rules if hits[rule['id']] == len(self._conditions(rule))]
+    
+    def on_articles(self, articles):
+        """Store listener: evaluate each new article once"""
+        alerts = []
+        with self.lock:
+            for article in articles:
+                for rule in self.match(article):
+                    self.seq += 1
+                    alert = {
+                        'seq': self.seq,
+                        'rule': rule['name'],
+                        'title': article['title'],
+                        'link': article['link'],
+                        'sentiment': article['sentiment'],
+                        'category': article['category'],
+                        'triggered_at': datetime.now().isoformat(timespec='seconds'),
+                    }
+                    self.feed.append(alert)
+                    alerts.append(alert)
+        if alerts and self.webhook_url:
+            self.sender.submit(self.post, alerts)
+    
+    def since(self, seq):
+        """Alerts newer than `seq`, oldest first"""
+        with self.lock:
+            return [a for a in self.feed if a['seq'] > seq]
+    
+    def post(self, alerts):
+        """POST alerts as JSON to the webhook; returns the HTTP status"""
+        request = urllib.request.Request(
+            self.webhook_url,
+            data=json.dumps({'alerts': alerts}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                self.webhook_error = None
+                return response.status
+        except OSError as e:
+            # Runs on the sender thread; the sidebar reports it on the next rerun
+            self.webhook_error = (str(e), datetime.now().isoformat(timespec='seconds'))
+            return None
+
+@st.cache_resource
+def get_alert_engine():
+    """Single alert engine per server process, subscribed to the article store"""
+    engine = AlertEngine(ALERT_RULES_PATH, ALERT_WEBHOOK_URL)
+    get_article_store().listeners.append(engine.on_articles)
+    return engine
+
+def window_cutoff(hours, now=None):
+    """Earliest published_ts inside the last `hours`, compared the way the sidebar time filter compares"""
+    now = datetime.now() if now is None else now
+    return (now - timedelta(hours=hours) - datetime(1970, 1, 1)).total_seconds()
+
+class SavedView:
+    """A named filter set with its matching articles and their counts kept materialized.
+    
+    Articles are held in publication order, so the time window is applied by
+    dropping expired ones from the front; counts are updated as articles
+    enter and leave, never recomputed.
+    """
+    
+    def __init__(self, name, filters):
+        self.name = name
+        self.filters = filters
+        self.hours = 3 if filters['show_breaking'] else filters['hours_back']
+        self.query = filters['search_query'].lower()
+        # None: any category, including ones not in the feed when the view was saved
+        self.categories = None if filters['selected_categories'] is None else set(filters['selected_categories'])
+        self.sentiments = set(filters['sentiment_filter'])
+        self.entries = []  # (published_ts, key), oldest first
+        self.articles = {}  # key -> article
+        self.mentions = {}  # key -> entity mentions it was counted with, so removal subtracts the same
+        self.sentiment_counts = Counter()
+        self.category_counts = Counter()
+        self.entity_mentions = Counter()  # title mentions, as extract_entities counts them
+    
+    def matches(self, article):
+        """Every filter but the time window"""
+        if self.categories is not None and article['category'] not in self.categories:
+            return False
+        if article['sentiment'] not in self.sentiments:
+            return False
+        return not self.query or self.query in article['title'].lower() or \
+            self.query in article.get('summary_text', article.get('summary', '')).lower()
+    
+    def _count(self, article, mentions, sign):
+        for counter, values in ((self.sentiment_counts, [article['sentiment']]),
+                                (self.category_counts, [article['category']]),
+                                (self.entity_mentions, mentions)):
+            for value in values:
+                counter[value] += sign
+                if counter[value] <= 0:
+                    del counter[value]
+    
+    def add(self, key, article, cutoff, taxonomy):
+        if key in self.articles or article['published_ts'] < cutoff or not self.matches(article):
+            return
+        bisect.insort(self.entries, (article['published_ts'], key))
+        self.articles[key] = article
+        self.mentions[key] = taxonomy.entity_mentions(article['title'])
+        self._count(article, self.mentions[key], 1)
+    
+    def remove(self, key):
+        article = self.articles.pop(key, None)
+        if article is None:
+            return
+        del self.entries[bisect.bisect_left(self.entries, (article['published_ts'], key))]
+        self._count(article, self.mentions.pop(key), -1)
+    
+    def expire(self, cutoff):
+        drop = bisect.bisect_left(self.entries, (cutoff,))
+        for _, key in self.entries[:drop]:
+            self._count(self.articles.pop(key), self.mentions.pop(key), -1)
+        del self.entries[:drop]
+    
+    def applies_to(self, filters, all_categories):
+        """Whether the sidebar still shows exactly this view's filters"""
+        categories = all_categories if self.filters['selected_categories'] is None else self.filters['selected_categories']
+        return (filters['search_query'] == self.filters['search_query']
+                and sorted(filters['selected_categories']) == sorted(categories)
+                and sorted(filters['sentiment_filter']) == sorted(self.filters['sentiment_filter'])
+                and filters['hours_back'] == self.filters['hours_back']
+                and filters['show_breaking'] == self.filters['show_breaking'])
+
+class SavedViews:
+    """Saved views persisted to a JSON file and refreshed from the store's new articles"""
+    
+    def __init__(self, store, path=None):
+        self.lock = threading.Lock()
+        self.store = store
+        self.path = path
+        self.views = {}
+        # Taxonomy the views were matched and counted under, and its section hashes
+        self.taxonomy = None
+        self.taxonomy_hashes = None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for name, filters in json.load(f).items():
+                    self.views[name] = SavedView(name, filters)
+        self._materialize(list(self.views.values()))
+    
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({name: view.filters for name, view in self.views.items()}, f, indent=2)
+    
+    def _materialize(self, views):
+        """Fill views from everything stored; only needed once per view (or taxonomy edit)"""
+        with self.store.lock:
+            items = list(self.store.articles.items())
+            self.taxonomy = self.store.taxonomy
+            self.taxonomy_hashes = dict(self.store.taxonomy_hashes)
+        for view in views:
+            fresh = SavedView(view.name, view.filters)
+            cutoff = window_cutoff(fresh.hours)
+            for key, article in items:
+                fresh.add(key, article, cutoff, self.taxonomy)
+            self.views[view.name] = fresh
+    
+    def names(self):
+        with self.lock:
+            return sorted(self.views)
+    
+    def save(self, name, filters):
+        name = name.strip()
+        if not name:
+            raise ValueError("A saved view needs a name")
+        with self.lock:
+            self.views[name] = SavedView(name, filters)
+            self._materialize([self.views[name]])
+            self._save()
+    
+    def delete(self, name):
+        with self.lock:
+            self.views.pop(name, None)
+            self._save()
+    
+    def lookup(self, name):
+        """(view, its articles newest first) with expired articles dropped; (None, []) if unknown"""
+        with self.store.lock:
+            hashes = dict(self.store.taxonomy_hashes)
+        with self.lock:
+            if self.taxonomy_hashes != hashes:
+                # Articles were retagged; categories and entities have to be matched again
+                self._materialize(list(self.views.values()))
+            view = self.views.get(name)
+            if view is None:
+                return None, []
+            view.expire(window_cutoff(view.hours))
+            return view, [view.articles[key] for _, key in reversed(view.entries)]
+    
+    def on_articles(self, articles):
+        """Store listener: add new articles to the views they match"""
+        with self.lock:
+            for view in self.views.values():
+                cutoff = window_cutoff(view.hours)
+                for article in articles:
+                    view.add(article['link'] or article['title'], article, cutoff, self.taxonomy)
+    
+    def on_revised(self, articles):
+        """Store revision listener: match reworded articles again, which may move them in or out of a view"""
+        with self.lock:
+            for view in self.views.values():
+                cutoff = window_cutoff(view.hours)
+                for article in articles:
+                    key = article['link'] or article['title']
+                    view.remove(key)
+                    view.add(key, article, cutoff, self.taxonomy)
+
+@st.cache_resource
+def get_saved_views():
+    """Saved views per server process, subscribed to the article store"""
+    store = get_article_store()
+    views = SavedViews(store, SAVED_VIEWS_PATH)
+    store.listeners.append(views.on_articles)
+    store.revision_listeners.append(views.on_revised)
+    return views
+
+def show_feed_changes(tracker):
+    """List what the feed added, reworded or dropped since this session last looked"""
+    if 'feed_changes_seen' not in st.session_state:
+        # A new session starts from the current feed rather than the whole event backlog
+        st.session_state.feed_changes_seen = tracker.seq
+    changes = tracker.since(st.session_state.feed_changes_seen)
+    if not changes:
+        return
+    labels = {'added': '🆕 New', 'revised': '✏️ Revised', 'returned': '↩️ Back', 'removed': '🗑️ Dropped'}
+    counts = Counter(change['kind'] for change in changes)
+    summary = ", ".join(f"{counts[kind]} {kind}" for kind in labels if counts[kind])
+    with st.expander(f"🛰️ Feed changes since you last checked ({summary})"):
+        for change in reversed(changes[-50:]):
+            title = html_text(change['title'])
+            if change['link'] and change['kind'] != 'removed':
+                title = f'<a href="{html.escape(change["link"], quote=True)}" target="_blank" rel="noopener">{title}</a>'
+            st.markdown(f"`{datetime.fromtimestamp(change['at']).strftime('%H:%M')}` {labels[change['kind']]} — {title}",
+                        unsafe_allow_html=True)
+        if st.button("Mark as seen", key="feed_changes_ack"):
+            st.session_state.feed_changes_seen = changes[-1]['seq']
+            st.rerun()
+
+def alert_sidebar(engine, categories):
+    """Sidebar controls for registering and removing watchlist rules"""
+    st.sidebar.markdown('<h3 style="color: #8B0000;">🔔 Watchlist Alerts</h3>', unsafe_allow_html=True)
+    
+    with st.sidebar.expander("Manage alert rules"):
+        with st.form("new_alert_rule", clear_on_submit=True):
+            name = st.text_input("Rule name")
+            keywords = st.text_input("Keywords or phrases (comma separated)")
+            entity = st.selectbox("Entity", [None] + current_taxonomy().entity_names,
+                                  format_func=lambda v: v or "Any")
+            category = st.selectbox("Category", [None] + categories, format_func=lambda v: v or "Any")
+            sentiment = st.selectbox("Sentiment", [None, "Positive", "Neutral", "Negative"],
+                                     format_func=lambda v: v or "Any")
+            if st.form_submit_button("Add rule"):
+                try:
+                    engine.add_rule(name or keywords or entity or category or sentiment,
+                                    keywords.split(','), entity, category, sentiment)
+                except ValueError as e:
+                    st.error(str(e))
+        
+        for rule in engine.rules:
+            conditions = ", ".join(f"{kind}: {value}" for kind, value in engine._conditions(rule))
+            col_a, col_b = st.columns([4, 1])
+            with col_a:
+                st.markdown(f"**{rule['name']}**  \n{conditions}")
+            with col_b:
+                if st.button("✕", key=f"remove_rule_{rule['id']}"):
+                    engine.remove_rule(rule['id'])
+                    st.rerun()
+        
+        if engine.webhook_url and st.button("Send test alert"):
+            status = engine.post([{'seq': 0, 'rule': 'Test', 'title': 'Test alert from NYT Politics Dashboard',
+                                   'link': '', 'sentiment': 'Neutral', 'category': '📰 General',
+                                   'triggered_at': datetime.now().isoformat(timespec='seconds')}])
+            st.write(f"Webhook responded with {status}" if status else "Webhook unreachable")
+    
+    if engine.webhook_error:
+        message, failed_at = engine.webhook_error
+        st.sidebar.error(f"Alert webhook failed at {failed_at}: {message}")
+
+def show_alerts(engine):
+    """Toast alerts this session has not seen yet and list the recent alert feed"""
+    if 'alerts_seen' not in st.session_state:
+        # A new session starts from the current alert rather than toasting the backlog
+        st.session_state.alerts_seen = engine.seq
+    last_seen = st.session_state.alerts_seen
+    new_alerts = engine.since(last_seen)
+    for alert in new_alerts[-5:]:
+        st.toast(f"🔔 {html_text(alert['rule'])}: {html_text(alert['title'])}")
+    if new_alerts:
+        st.session_state.alerts_seen = new_alerts[-1]['seq']
+    
+    recent = engine.since(0)
+    if recent:
+        with st.expander(f"🔔 Alert feed ({len(recent)})"):
+            for alert in reversed(recent[-20:]):
+                st.markdown(f"`{alert['triggered_at']}` <strong>{html_text(alert['rule'])}</strong> — "
+                            f'<a href="{html_text(alert["link"])}" target="_blank">{html_text(alert["title"])}</a> · '
+                            f"{alert['sentiment']} · {html_text(alert['category'])}", unsafe_allow_html=True)
+
+def open_saved_view(views):
+    """Selectbox callback: load the chosen view's filters into the sidebar widgets"""
+    view = views.views.get(st.session_state.get('saved_view'))
+    if view is None:
+        return
+    for key in ('search_query', 'sentiment_filter', 'hours_back', 'show_breaking'):
+        st.session_state[key] = view.filters[key]
+    if view.filters['selected_categories'] is None:
+        # Back to the widget default: every category
+        st.session_state.pop('selected_categories', None)
+    else:
+        st.session_state['selected_categories'] = view.filters['selected_categories']
+
+def save_view(views, filters, all_categories):
+    """Button callback: save the sidebar filters under the name typed in, and open it"""
+    name = st.session_state.get('saved_view_name', '').strip()
+    saved = dict(filters)
+    if sorted(saved['selected_categories']) == sorted(all_categories):
+        saved['selected_categories'] = None
+    try:
+        views.save(name, saved)
+    except ValueError as e:
+        st.session_state['saved_view_error'] = str(e)
+        return
+    st.session_state['saved_view'] = name
+    st.session_state['saved_view_name'] = ''
+
+def delete_view(views, name):
+    views.delete(name)
+    st.session_state['saved_view'] = None
+
+def saved_view_selector(views):
+    """Sidebar selectbox of saved views; returns the open view's name or None"""
+    return st.sidebar.selectbox("⭐ Saved view", [None] + views.names(), key="saved_view",
+                                format_func=lambda name: name or "None (ad hoc filters)",
+                                on_change=open_saved_view, args=(views,))
+
+def saved_views_sidebar(views, filters, all_categories, view, materialized):
+    """Sidebar controls for saving the current filters and deleting the open view"""
+    if view is not None:
+        if materialized:
+            st.sidebar.caption(f"⭐ {view.name}: {len(view.articles)} stored articles, served from the saved view")
+        else:
+            st.sidebar.caption(f"⭐ {view.name}: filters changed since opening, showing ad hoc results")
+    with st.sidebar.expander("Manage saved views"):
+        st.text_input("View name", key="saved_view_name")
+        st.button("💾 Save current filters", key="save_view",
+                  on_click=save_view, args=(views, filters, all_categories))
+        error = st.session_state.pop('saved_view_error', None)
+        if error:
+            st.error(error)
+        if view is not None:
+            st.button(f"🗑️ Delete '{view.name}'", key="delete_view", on_click=delete_view, args=(views, view.name))
+
+def archive_sentiment_view(table, label, filter_state):
+    """Daily sentiment and category mix over an archive scan"""
+    st.markdown(f'<h3 style="color: #8B0000;">📚 {label}: {len(table):,} archived articles</h3>', unsafe_allow_html=True)
+    if not len(table):
+        st.info("No archived articles match the filters in this window")
+        return
+    # Aggregated in Arrow; only the per-day rows reach pandas
+    daily = table.group_by(['date', 'sentiment']).aggregate([('polarity', 'count')]).to_pandas()
+    daily.columns = ['Date', 'Sentiment', 'Articles']
+    categories = table.group_by('category').aggregate([('polarity', 'count')]).to_pandas()
+    categories.columns = ['Category', 'Articles']
+    
+    def build_daily(daily):
+        fig = px.bar(daily.sort_values('Date'), x='Date', y='Articles', color='Sentiment',
+                     title='Articles per Day by Sentiment',
+                     color_discrete_map={'Positive': '#2d8659', 'Neutral': '#8B8B8B', 'Negative': '#8B0000'})
+        fig.update_layout(**CHART_LAYOUT)
+        return fig
+    
+    def build_categories(categories):
+        fig = px.pie(categories, values='Articles', names='Category', title='Category Share',
+                     color_discrete_sequence=px.colors.sequential.Reds_r)
+        fig.update_layout(**CHART_LAYOUT)
+        return fig
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        show_chart('archive_daily_sentiment', daily, build_daily, (label, filter_state))
+    with col2:
+        show_chart('archive_categories', categories, build_categories, (label, filter_state))
+    st.markdown("---")
+
+def archive_trend_view(table, label, filter_state):
+    """Daily mean polarity and volume over an archive scan"""
+    if not len(table):
+        return
+    daily = table.group_by('date').aggregate([('polarity', 'mean'), ('polarity', 'count')]).to_pandas()
+    daily.columns = ['Date', 'Mean polarity', 'Articles']
+    daily = daily.sort_values('Date')
+    
+    def build_daily(daily):
+        fig = go.Figure()
+        fig.add_trace(go.Bar(x=daily['Date'], y=daily['Articles'], name='Articles',
+                             marker_color='#e8b4b4', yaxis='y2'))
+        fig.add_trace(go.Scatter(x=daily['Date'], y=daily['Mean polarity'], mode='lines+markers',
+                                 name='Mean polarity', line=dict(color='#8B0000', width=3)))
+        fig.update_layout(title=f'Daily Sentiment ({label})', yaxis_title='Mean Polarity',
+                          yaxis2=dict(title='Articles', overlaying='y', side='right', showgrid=False),
+                          hovermode='x unified', **CHART_LAYOUT)
+        return fig
+    
+    st.markdown(f'<h3 style="color: #8B0000;">📚 {label}</h3>', unsafe_allow_html=True)
+    show_chart('archive_daily_trend', daily, build_daily, (label, filter_state))
+    st.markdown("---")
+
+def archive_entity_view(table, label, filter_state, top_n=20):
+    """Most mentioned entities over an archive scan"""
+    if not len(table):
+        return
+    counts = pc.value_counts(pc.list_flatten(table['entities']))
+    df_entities = pd.DataFrame({'Entity': counts.field('values').to_pylist(),
+                                'Mentions': counts.field('counts').to_pylist()})
+    df_entities = df_entities.nlargest(top_n, 'Mentions')
+    
+    def build_entities(df_entities):
+        fig = px.bar(df_entities, x='Mentions', y='Entity', orientation='h',
+                     title=f'Top Entities ({label})', color='Mentions',
+                     color_continuous_scale=['#ffcccc', '#8B0000'])
+        fig.update_layout(**ENTITY_CHART_LAYOUT)
+        return fig
+    
+    st.markdown(f'<h3 style="color: #8B0000;">📚 {label}</h3>', unsafe_allow_html=True)
+    show_chart('archive_entities', df_entities, build_entities, (label, filter_state))
+    st.markdown("---")
+
+def cache_diagnostics(store):
+    """Sidebar expander with the size, budget and eviction counts of every cache"""
+    with st.sidebar.expander("🧮 Cache diagnostics"):
+        caches = list(get_cache_registry().values())
+        for cache in caches:
+            cache.expire()
+        st.dataframe(pd.DataFrame([cache.stats() for cache in caches]), use_container_width=True, hide_index=True)
+        st.caption("Streamlit data caches: " + ", ".join(
+            f"{name} ≤{policy['max_entries']} entries, {policy['ttl']}s" for name, policy in CACHE_POLICY.items()
+            if 'max_entries' in policy))
+        with store.lock:
+            st.caption(f"Article store: {len(store.articles)} articles, "
+                       f"{len(store.timeseries.series)} sentiment series, "
+                       f"{len(store.briefings.days)} daily digests")
+
+# Card markup is compiled once and only formatted per item; the styling lives in
+# apply_page_style. Each template is a single line: a blank line inside the
+# markdown would end the HTML block.
+HEADLINE_CARD_TEMPLATE = (
+    '<div class="headline-card">'
+    '<div class="headline-top">'
+    '<span class="headline-title"><span class="headline-rank">#{rank}</span> {title}{badges}</span>'
+    '<span class="category-badge">{category}</span>'
+    '</div>'
+    '<div class="headline-meta">'
+    '<span class="meta-item">🕐 {published}</span>'
+    '<span class="meta-item">💭 Sentiment: <span class="sentiment-{sentiment_class}">{sentiment}</span></span>'
+    '<span class="meta-item headline-score">📊 Score: {polarity:.3f}</span>'
+    '<a class="meta-item headline-link" href="{link}" target="_blank" rel="noopener">📖 Read Article</a>'
+    '</div>'
+    '</div>'
+)
+CATEGORY_TILE_TEMPLATE = (
+    '<div class="category-tile">'
+    '<div class="category-tile-icon">{icon}</div>'
+    '<div class="category-tile-count">{count}</div>'
+    '<div class="category-tile-label">{label}</div>'
+    '</div>'
+)
+COUNT_ROW_TEMPLATE = (
+    '<div class="count-row">'
+    '<span class="count-row-name">{name}</span>'
+    '<span class="stat-badge count-row-badge">{count} {unit}</span>'
+    '</div>'
+)
+
+# Cards rendered per rerun in the Headlines tab
+HEADLINES_PER_PAGE = 25
+
+def html_text(value):
+    """Escaped single-line text for the card templates"""
+    return html.escape(' '.join(str(value).split()))
+
+def change_badges(status, now=None, hours=3):
+    """New / revised markers for a card from a FeedTracker status"""
+    if status is None:
+        return ''
+    now = time.time() if now is None else now
+    first_seen, _, revisions = status
+    badges = ''
+    if first_seen >= now - hours * 3600:
+        badges += '<span class="change-badge">🆕 New</span>'
+    if revisions:
+        times = f" ×{len(revisions)}" if len(revisions) > 1 else ''
+        badges += (f'<span class="change-badge" title="Was: {html_text(revisions[-1]["title"])}">'
+                   f'✏️ Revised{times}</span>')
+    return badges
+
+def render_headline_cards(articles, first_rank=1, tracker=None):
+    """One HTML block with a card per article, marked new or revised when a tracker is given"""
+    now = time.time()
+    return ''.join(HEADLINE_CARD_TEMPLATE.format(
+        rank=first_rank + i,
+        title=html_text(article['title']),
+        badges=change_badges(tracker.status(article), now) if tracker else '',
+        category=html_text(article.get('category', '📰 General')),
+        published=html_text(article['published']),
+        sentiment_class=article['sentiment'].lower(),
+        sentiment=article['sentiment'],
+        polarity=article['polarity'],
+        link=html.escape(article['link'], quote=True),
+    ) for i, article in enumerate(articles))
+
+def render_category_tiles(category_counts):
+    """The category tiles as one grid"""
+    tiles = []
+    for category, count in category_counts:
+        icon, _, label = category.partition(' ')
+        tiles.append(CATEGORY_TILE_TEMPLATE.format(icon=html_text(icon), count=count,
+                                                   label=html_text(label or 'Articles')))
+    return f'<div class="category-tiles">{"".join(tiles)}</div>'
+
+def render_count_rows(items, unit):
+    """Name and count rows for the entity lists"""
+    return ''.join(COUNT_ROW_TEMPLATE.format(name=html_text(name), count=count, unit=unit)
+                   for name, count in items)
+
+def apply_page_style():
+    """Page config and theme CSS; must run before any other Streamlit command"""
+    # Page config
+    st.set_page_config(
+        page_title="NYT Politics Dashboard",
+        page_icon="📰",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # Custom CSS for wine red theme and enhanced styling
+    st.markdown("""
+        <style>
+        @import url('https://fonts.googleapis.com/css2?family=Playfair+Display:wght@700&family=Inter:wght@400;600&display=swap');
     
-    .main {
-        padding: 0rem 1rem;
-        background: linear-gradient(135deg, #fafafa 0%, #f5f0f0 100%);
-    }
+        .main {
+            padding: 0rem 1rem;
+            background: linear-gradient(135deg, #fafafa 0%, #f5f0f0 100%);
+        }
     
-    .stMetric {
-        background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
-        color: white;
-        padding: 20px;
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(139, 0, 0, 0.2);
-        border: none;
-    }
+        .stMetric {
+            background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
+            color: white;
+            padding: 20px;
+            border-radius: 15px;
+            box-shadow: 0 4px 15px rgba(139, 0, 0, 0.2);
+            border: none;
+        }
     
-    .stMetric label {
-        color: #ffd6d6 !important;
-        font-weight: 600;
-    }
+        .stMetric label {
+            color: #ffd6d6 !important;
+            font-weight: 600;
+        }
     
-    .stMetric [data-testid="stMetricValue"] {
-        color: white !important;
-        font-size: 2rem !important;
-    }
+        .stMetric [data-testid="stMetricValue"] {
+            color: white !important;
+            font-size: 2rem !important;
+        }
     
-    .headline-card {
-        background: white;
-        padding: 25px;
-        border-radius: 15px;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        margin-bottom: 20px;
-        border-left: 6px solid #8B0000;
-        transition: all 0.3s ease;
-        position: relative;
-        overflow: hidden;
-    }
+        .headline-card {
+            background: white;
+            padding: 25px;
+            border-radius: 15px;
+            box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+            margin-bottom: 20px;
+            border-left: 6px solid #8B0000;
+            transition: all 0.3s ease;
+            position: relative;
+            overflow: hidden;
+        }
     
-    .headline-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        width: 100%;
-        height: 4px;
-        background: linear-gradient(90deg, #8B0000 0%, #DC143C 50%, #8B0000 100%);
-    }
+        .headline-card::before {
+            content: '';
+            position: absolute;
+            top: 0;
+            left: 0;
+            width: 100%;
+            height: 4px;
+            background: linear-gradient(90deg, #8B0000 0%, #DC143C 50%, #8B0000 100%);
+        }
     
-    .headline-card:hover {
-        transform: translateY(-3px);
-        box-shadow: 0 8px 30px rgba(139, 0, 0, 0.15);
-    }
+        .headline-card:hover {
+            transform: translateY(-3px);
+            box-shadow: 0 8px 30px rgba(139, 0, 0, 0.15);
+        }
     
-    .headline-title {
-        font-size: 20px;
-        font-weight: 700;
-        color: #1a1a1a;
-        margin-bottom: 12px;
-        line-height: 1.4;
-        font-family: 'Inter', sans-serif;
-    }
+        .headline-top {
+            display: flex;
+            justify-content: space-between;
+            align-items: start;
+            margin-bottom: 10px;
+        }
     
-    .headline-meta {
-        font-size: 13px;
-        color: #666;
-        margin-bottom: 12px;
-        display: flex;
-        gap: 15px;
-        flex-wrap: wrap;
-    }
+        .headline-rank {
+            color: #8B0000;
+            font-weight: 800;
+        }
     
-    .meta-item {
-        display: inline-flex;
-        align-items: center;
-        gap: 5px;
-    }
+        .category-badge {
+            background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
+            color: white;
+            padding: 5px 12px;
+            border-radius: 15px;
+            font-size: 12px;
+            white-space: nowrap;
+            margin-left: 10px;
+        }
     
-    .sentiment-positive {
-        color: #2d8659;
-        font-weight: bold;
-        background: #e6f7ef;
-        padding: 3px 10px;
-        border-radius: 12px;
-        font-size: 12px;
-    }
+        .change-badge {
+            background: #fff0f0;
+            color: #8B0000;
+            border: 1px solid #e8c4c4;
+            padding: 2px 8px;
+            border-radius: 10px;
+            font-size: 11px;
+            font-weight: 600;
+            margin-left: 8px;
+            white-space: nowrap;
+        }
     
-    .sentiment-negative {
-        color: #c41e3a;
-        font-weight: bold;
-        background: #fde8eb;
-        padding: 3px 10px;
-        border-radius: 12px;
-        font-size: 12px;
-    }
+        .headline-score {
+            color: #8B0000;
+        }
     
-    .sentiment-neutral {
-        color: #5a5a5a;
-        font-weight: bold;
-        background: #f0f0f0;
-        padding: 3px 10px;
-        border-radius: 12px;
-        font-size: 12px;
-    }
+        .headline-link {
+            color: #8B0000 !important;
+            font-weight: 600;
+            text-decoration: none;
+            margin-left: auto;
+        }
     
-    .summary-box {
-        background: linear-gradient(135deg, #8B0000 0%, #6b0000 100%);
-        color: white;
-        padding: 30px;
-        border-radius: 20px;
-        box-shadow: 0 8px 30px rgba(139, 0, 0, 0.3);
-        margin: 20px 0;
-        border: 2px solid #a01010;
-    }
+        .category-tiles {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
+            gap: 16px;
+        }
     
-    .summary-title {
-        font-family: 'Playfair Display', serif;
-        font-size: 28px;
-        font-weight: 700;
-        margin-bottom: 20px;
-        color: #ffd6d6;
-        text-align: center;
-    }
+        .category-tile {
+            text-align: center;
+            padding: 10px;
+            background: linear-gradient(135deg, #fff9f9 0%, #ffffff 100%);
+            border-radius: 10px;
+            border: 2px solid #ffebeb;
+        }
     
-    .summary-content {
-        font-size: 16px;
-        line-height: 1.8;
-        color: #fff;
-        font-family: 'Inter', sans-serif;
-    }
+        .category-tile-icon {
+            font-size: 24px;
+        }
     
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 10px;
-        background: linear-gradient(135deg, #fafafa 0%, #f5f0f0 100%);
-        padding: 10px;
-        border-radius: 15px;
-    }
+        .category-tile-count {
+            font-size: 20px;
+            font-weight: 700;
+            color: #8B0000;
+        }
     
-    .stTabs [data-baseweb="tab"] {
-        background: white;
-        border-radius: 10px;
-        color: #8B0000;
-        font-weight: 600;
-        padding: 10px 20px;
-        border: 2px solid transparent;
-    }
+        .category-tile-label {
+            font-size: 12px;
+            color: #666;
+        }
     
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
-        color: white;
-        border: 2px solid #DC143C;
-    }
+        .count-row {
+            background: #f8f9fa;
+            padding: 10px;
+            margin: 5px 0;
+            border-radius: 8px;
+            display: flex;
+            justify-content: space-between;
+        }
     
-    h1, h2, h3 {
-        font-family: 'Playfair Display', serif;
-        color: #8B0000;
-    }
+        .count-row-name {
+            font-weight: 600;
+        }
     
-    .stButton button {
-        background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 10px 25px;
-        font-weight: 600;
-        box-shadow: 0 4px 15px rgba(139, 0, 0, 0.2);
-        transition: all 0.3s ease;
-    }
+        .count-row-badge {
+            font-size: 12px;
+        }
     
-    .stButton button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(139, 0, 0, 0.3);
-    }
+        .headline-title {
+            font-size: 20px;
+            font-weight: 700;
+            color: #1a1a1a;
+            margin-bottom: 12px;
+            line-height: 1.4;
+            font-family: 'Inter', sans-serif;
+        }
     
-    .insight-card {
-        background: linear-gradient(135deg, #fff9f9 0%, #ffffff 100%);
-        padding: 20px;
-        border-radius: 15px;
-        border: 2px solid #ffebeb;
-        box-shadow: 0 2px 10px rgba(139, 0, 0, 0.05);
-    }
+        .headline-meta {
+            font-size: 13px;
+            color: #666;
+            margin-bottom: 12px;
+            display: flex;
+            gap: 15px;
+            flex-wrap: wrap;
+        }
     
-    .stat-badge {
-        display: inline-block;
-        background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
-        color: white;
-        padding: 5px 15px;
-        border-radius: 20px;
-        font-weight: 600;
-        font-size: 14px;
-        box-shadow: 0 2px 8px rgba(139, 0, 0, 0.2);
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def fetch_nyt_politics_feed():
-    """Fetch NYT Politics RSS feed"""
-    try:
-        # NYT Politics RSS feed
-        feed_url = "https://rss.nytimes.com/services/xml/rss/nyt/Politics.xml"
-        feed = feedparser.parse(feed_url)
-        
-        articles = []
-        for entry in feed.entries:
-            article = {
-                'title': entry.get('title', 'No title'),
-                'link': entry.get('link', ''),
-                'published': entry.get('published', ''),
-                'summary': entry.get('summary', ''),
-                'published_parsed': entry.get('published_parsed', None)
-            }
-            articles.append(article)
-        
-        return articles, feed.feed.get('title', 'NYT Politics')
-    except Exception as e:
-        st.error(f"Error fetching feed: {str(e)}")
-        return [], "Error"
-
-def analyze_sentiment(text):
-    """Analyze sentiment of text using TextBlob"""
-    try:
-        blob = TextBlob(text)
-        polarity = blob.sentiment.polarity
-        
-        if polarity > 0.1:
-            return 'Positive', polarity
-        elif polarity < -0.1:
-            return 'Negative', polarity
-        else:
-            return 'Neutral', polarity
-    except:
-        return 'Neutral', 0.0
-
-def extract_keywords(articles, top_n=20):
-    """Extract common keywords from headlines"""
-    all_text = ' '.join([article['title'] for article in articles])
-    # Remove common words
-    stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-                  'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-                  'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would',
-                  'could', 'should', 'may', 'might', 'can', 'after', 'over', 'says',
-                  'new', 'how', 'what', 'when', 'where', 'who', 'why', 'it', 'its'}
+        .meta-item {
+            display: inline-flex;
+            align-items: center;
+            gap: 5px;
+        }
     
-    words = re.findall(r'\b[a-z]{4,}\b', all_text.lower())
-    words = [w for w in words if w not in stop_words]
+        .sentiment-positive {
+            color: #2d8659;
+            font-weight: bold;
+            background: #e6f7ef;
+            padding: 3px 10px;
+            border-radius: 12px;
+            font-size: 12px;
+        }
     
-    return Counter(words).most_common(top_n)
-
-def categorize_article(title):
-    """Categorize article based on keywords in title"""
-    title_lower = title.lower()
-    
-    categories = {
-        '🏛️ Legislation': ['bill', 'senate', 'congress', 'house', 'legislation', 'law', 'vote', 'passes'],
-        '🗳️ Elections': ['election', 'campaign', 'ballot', 'primary', 'candidate', 'voter'],
-        '🌍 International': ['foreign', 'international', 'china', 'russia', 'ukraine', 'israel', 'gaza', 'war'],
-        '💰 Economy': ['economy', 'inflation', 'budget', 'spending', 'tax', 'debt', 'financial'],
-        '⚖️ Judicial': ['court', 'supreme', 'judge', 'ruling', 'legal', 'justice'],
-        '🏛️ Executive': ['president', 'white house', 'administration', 'executive', 'biden', 'trump'],
-        '🏥 Healthcare': ['healthcare', 'medicaid', 'medicare', 'health', 'medical'],
-        '🌱 Environment': ['climate', 'environment', 'energy', 'emissions', 'green'],
-        '🔒 Security': ['security', 'defense', 'military', 'border', 'immigration', 'police'],
-    }
+        .sentiment-negative {
+            color: #c41e3a;
+            font-weight: bold;
+            background: #fde8eb;
+            padding: 3px 10px;
+            border-radius: 12px;
+            font-size: 12px;
+        }
     
-    for category, keywords in categories.items():
-        if any(keyword in title_lower for keyword in keywords):
-            return category
+        .sentiment-neutral {
+            color: #5a5a5a;
+            font-weight: bold;
+            background: #f0f0f0;
+            padding: 3px 10px;
+            border-radius: 12px;
+            font-size: 12px;
+        }
     
-    return '📰 General'
-
-def extract_entities(articles):
-    """Extract key political entities (people, places, orgs) from headlines"""
-    all_text = ' '.join([a['title'] for a in articles])
-    
-    # Common politicians and figures
-    politicians = {
-        'Trump': 0, 'Biden': 0, 'Harris': 0, 'Vance': 0, 'Obama': 0,
-        'Pelosi': 0, 'McCarthy': 0, 'McConnell': 0, 'Schumer': 0,
-        'DeSantis': 0, 'Newsom': 0, 'Pence': 0, 'Sanders': 0,
-        'AOC': 0, 'Ocasio-Cortez': 0, 'Warren': 0, 'Cruz': 0
-    }
+        .summary-box {
+            background: linear-gradient(135deg, #8B0000 0%, #6b0000 100%);
+            color: white;
+            padding: 30px;
+            border-radius: 20px;
+            box-shadow: 0 8px 30px rgba(139, 0, 0, 0.3);
+            margin: 20px 0;
+            border: 2px solid #a01010;
+        }
     
-    # Countries and regions
-    locations = {
-        'China': 0, 'Russia': 0, 'Ukraine': 0, 'Israel': 0, 'Gaza': 0,
-        'Iran': 0, 'Mexico': 0, 'Europe': 0, 'Asia': 0, 'Middle East': 0
-    }
+        .summary-title {
+            font-family: 'Playfair Display', serif;
+            font-size: 28px;
+            font-weight: 700;
+            margin-bottom: 20px;
+            color: #ffd6d6;
+            text-align: center;
+        }
     
-    # Organizations
-    organizations = {
-        'GOP': 0, 'Republican': 0, 'Democrat': 0, 'Democratic': 0,
-        'Senate': 0, 'House': 0, 'Congress': 0, 'Supreme Court': 0,
-        'White House': 0, 'Pentagon': 0, 'FBI': 0, 'CIA': 0, 'NATO': 0
-    }
+        .summary-content {
+            font-size: 16px;
+            line-height: 1.8;
+            color: #fff;
+            font-family: 'Inter', sans-serif;
+        }
     
-    # Count mentions
-    for entity in politicians:
-        politicians[entity] = len(re.findall(rf'\b{entity}\b', all_text, re.IGNORECASE))
+        .stTabs [data-baseweb="tab-list"] {
+            gap: 10px;
+            background: linear-gradient(135deg, #fafafa 0%, #f5f0f0 100%);
+            padding: 10px;
+            border-radius: 15px;
+        }
     
-    for entity in locations:
-        locations[entity] = len(re.findall(rf'\b{entity}\b', all_text, re.IGNORECASE))
+        .stTabs [data-baseweb="tab"] {
+            background: white;
+            border-radius: 10px;
+            color: #8B0000;
+            font-weight: 600;
+            padding: 10px 20px;
+            border: 2px solid transparent;
+        }
     
-    for entity in organizations:
-        organizations[entity] = len(re.findall(rf'\b{entity}\b', all_text, re.IGNORECASE))
+        .stTabs [aria-selected="true"] {
+            background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
+            color: white;
+            border: 2px solid #DC143C;
+        }
     
-    # Filter out zero mentions and sort
-    politicians = {k: v for k, v in sorted(politicians.items(), key=lambda x: x[1], reverse=True) if v > 0}
-    locations = {k: v for k, v in sorted(locations.items(), key=lambda x: x[1], reverse=True) if v > 0}
-    organizations = {k: v for k, v in sorted(organizations.items(), key=lambda x: x[1], reverse=True) if v > 0}
+        h1, h2, h3 {
+            font-family: 'Playfair Display', serif;
+            color: #8B0000;
+        }
     
-    return politicians, locations, organizations
-
-def extract_main_topic(title):
-    """Extract the main topic from headline for search"""
-    # Remove common political phrases
-    cleaned = title
-    remove_phrases = ['Trump', 'Biden', 'says', 'plans to', 'wants to', 'will', 'could', 'may']
+        .stButton button {
+            background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
+            color: white;
+            border: none;
+            border-radius: 10px;
+            padding: 10px 25px;
+            font-weight: 600;
+            box-shadow: 0 4px 15px rgba(139, 0, 0, 0.2);
+            transition: all 0.3s ease;
+        }
     
-    # Extract key noun phrases (simplified)
-    words = title.split()
-    if len(words) > 4:
-        # Take middle portion as likely to contain the main topic
-        topic = ' '.join(words[1:4])
-    else:
-        topic = ' '.join(words[:3])
+        .stButton button:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 6px 20px rgba(139, 0, 0, 0.3);
+        }
     
-    return topic
-
-@st.cache_data(ttl=1800)  # Cache for 30 minutes
-def generate_summary(articles):
-    """Generate intelligent summary of today's headlines"""
-    try:
-        # Get today's articles
-        today = datetime.now().date()
-        today_articles = []
-        
-        for article in articles[:20]:
-            if article['published_parsed']:
-                article_date = datetime(*article['published_parsed'][:6]).date()
-                if article_date == today:
-                    today_articles.append(article)
-        
-        if not today_articles:
-            today_articles = articles[:15]
-        
-        # Analyze sentiment distribution
-        positive = sum(1 for a in today_articles if a.get('sentiment') == 'Positive')
-        negative = sum(1 for a in today_articles if a.get('sentiment') == 'Negative')
-        neutral = sum(1 for a in today_articles if a.get('sentiment') == 'Neutral')
-        
-        # Extract key topics
-        all_text = ' '.join([a['title'] for a in today_articles])
-        keywords = extract_keywords(today_articles, top_n=8)
-        top_topics = [kw[0] for kw in keywords[:5]]
-        
-        # Identify key themes from headlines
-        themes = []
-        theme_words = {
-            'election': ['election', 'vote', 'campaign', 'ballot', 'primary'],
-            'legislation': ['bill', 'senate', 'congress', 'house', 'legislation', 'law'],
-            'international': ['foreign', 'international', 'china', 'russia', 'ukraine', 'israel'],
-            'economic': ['economy', 'inflation', 'budget', 'spending', 'tax'],
-            'judicial': ['court', 'supreme', 'judge', 'ruling', 'legal'],
-            'executive': ['president', 'white house', 'administration', 'executive']
+        .insight-card {
+            background: linear-gradient(135deg, #fff9f9 0%, #ffffff 100%);
+            padding: 20px;
+            border-radius: 15px;
+            border: 2px solid #ffebeb;
+            box-shadow: 0 2px 10px rgba(139, 0, 0, 0.05);
         }
-        
-        for theme, words in theme_words.items():
-            if any(word in all_text.lower() for word in words):
-                themes.append(theme)
-        
-        # Generate summary
-        sentiment_tone = "mixed" if abs(positive - negative) < 3 else ("positive" if positive > negative else "negative")
-        
-        summary_parts = []
-        
-        # Opening
-        summary_parts.append(f"Today's political coverage features {len(today_articles)} articles with a {sentiment_tone} overall tone.")
-        
-        # Key topics
-        if top_topics:
-            topics_str = ", ".join([f"**{t}**" for t in top_topics[:3]])
-            summary_parts.append(f"The dominant themes include {topics_str}.")
-        
-        # Sentiment breakdown
-        if positive > 0 or negative > 0:
-            summary_parts.append(f"Sentiment analysis shows {positive} positive, {neutral} neutral, and {negative} negative headlines.")
-        
-        # Theme analysis
-        if themes:
-            theme_str = ", ".join([t.capitalize() for t in themes[:3]])
-            summary_parts.append(f"Major areas of focus: {theme_str}.")
-        
-        # Top headlines
-        top_3 = today_articles[:3]
-        summary_parts.append(f"\n\n**Top Stories:**")
-        for i, article in enumerate(top_3, 1):
-            summary_parts.append(f"\n{i}. {article['title']}")
-        
-        summary = " ".join(summary_parts)
-        
-        return summary, len(today_articles)
     
-    except Exception as e:
-        return f"Analyzing {len(articles)} recent political headlines. Use the tabs below to explore sentiment analysis, trending keywords, and detailed insights.", len(articles)
+        .stat-badge {
+            display: inline-block;
+            background: linear-gradient(135deg, #8B0000 0%, #a01010 100%);
+            color: white;
+            padding: 5px 15px;
+            border-radius: 20px;
+            font-weight: 600;
+            font-size: 14px;
+            box-shadow: 0 2px 8px rgba(139, 0, 0, 0.2);
+        }
+        </style>
+        """, unsafe_allow_html=True)
 
 def main():
+    apply_page_style()
+    
     # Initialize session state
     if 'initialized' not in st.session_state:
         st.session_state.initialized = True
@@ -462,116 +3355,155 @@ def main():
     
     # Fetch data FIRST
     with st.spinner("Fetching latest headlines..."):
-        articles, feed_title = fetch_nyt_politics_feed()
+        articles, feed_title = fetch_nyt_politics_feed(feed_source())
     
     if not articles:
         st.warning("No articles found. Please check your connection.")
         return
     
-    # Add sentiment analysis and categorization
-    for article in articles:
-        sentiment, polarity = analyze_sentiment(article['title'])
-        article['sentiment'] = sentiment
-        article['polarity'] = polarity
-        article['category'] = categorize_article(article['title'])
+    # Add sentiment analysis and categorization (each article is enriched once per process)
+    store = get_article_store()
+    alert_engine = get_alert_engine()
+    # Edits to the taxonomy file only rebuild the data the edited sections feed
+    store.apply_taxonomy(get_taxonomy_loader().check())
+    store.catch_up()  # Articles logged by other processes (API server, backfills)
+    # Diff against the previous fetch: reworded entries replace their stored version,
+    # new ones are enriched and published; everything else is a lookup
+    feed_tracker = get_feed_tracker()
+    delta = feed_tracker.diff(articles)
+    if delta.revised:
+        store.revise(delta.revised)
+    store.ingest(articles)
     
     # NOW add filters in sidebar (after articles are processed)
     st.sidebar.markdown('<h3 style="color: #8B0000;">🔍 Filters</h3>', unsafe_allow_html=True)
     
-    search_query = st.sidebar.text_input("🔎 Search headlines", "")
+    saved_views = get_saved_views()
+    saved_view_name = saved_view_selector(saved_views)
+    view, view_articles = saved_views.lookup(saved_view_name)
+    # Stored articles inside the widest time window; ad hoc filters and saved views both select from these
+    candidates = store.published_since(window_cutoff(MAX_HOURS_BACK))
+    
+    search_query = st.sidebar.text_input("🔎 Search headlines", "", key="search_query")
     
-    # Category filter
-    all_categories = sorted(list(set([a.get('category', '📰 General') for a in articles])))
+    # Category filter (an open view may name categories none of the candidates have right now)
+    all_categories = sorted(list(set([a.get('category', '📰 General') for a in candidates])))
+    if view is not None and view.categories:
+        all_categories = sorted(set(all_categories) | view.categories)
     selected_categories = st.sidebar.multiselect(
         "📑 Filter by category",
         all_categories,
-        default=all_categories
+        default=all_categories,
+        key="selected_categories"
     )
     
     sentiment_filter = st.sidebar.multiselect(
         "😊 Filter by sentiment",
         ["Positive", "Neutral", "Negative"],
-        default=["Positive", "Neutral", "Negative"]
+        default=["Positive", "Neutral", "Negative"],
+        key="sentiment_filter"
     )
     
-    hours_back = st.sidebar.slider("⏰ Show articles from last N hours", 1, 168, 24)
+    hours_back = st.sidebar.slider("⏰ Show articles from last N hours", 1, MAX_HOURS_BACK, 24, key="hours_back")
     
     # Breaking news toggle
-    show_breaking = st.sidebar.checkbox("🚨 Breaking News Only (last 3 hours)", value=False)
+    show_breaking = st.sidebar.checkbox("🚨 Breaking News Only (last 3 hours)", value=False, key="show_breaking")
+    
+    history_label = st.sidebar.selectbox("📚 History window", list(HISTORY_WINDOWS), key="history_window",
+                                         help="Adds archive charts over stored history to Analytics, Trends and Entities")
+    history_days = HISTORY_WINDOWS[history_label]
+    
+    filters = {'search_query': search_query, 'selected_categories': selected_categories,
+               'sentiment_filter': sentiment_filter, 'hours_back': hours_back, 'show_breaking': show_breaking}
+    # An open, unmodified saved view is a lookup of its materialized results
+    materialized = view is not None and view.applies_to(filters, all_categories)
+    saved_views_sidebar(saved_views, filters, all_categories, view, materialized)
     
-    # Filter by time
-    if show_breaking:
-        cutoff_time = datetime.now() - timedelta(hours=3)
+    if materialized:
+        filtered_articles = view_articles
     else:
-        cutoff_time = datetime.now() - timedelta(hours=hours_back)
+        # Filter by time (stored times are UTC epoch seconds; undated articles carry their ingestion time)
+        cutoff = window_cutoff(3 if show_breaking else hours_back)
+        filtered_articles = [a for a in candidates if a['published_ts'] >= cutoff]
+        
+        # Filter by search query
+        if search_query:
+            filtered_articles = [
+                a for a in filtered_articles 
+                if search_query.lower() in a['title'].lower() or 
+                   search_query.lower() in a.get('summary_text', a.get('summary', '')).lower()
+            ]
+        
+        # Filter by category
+        filtered_articles = [a for a in filtered_articles if a.get('category', '📰 General') in selected_categories]
+        
+        # Filter by sentiment
+        filtered_articles = [a for a in filtered_articles if a['sentiment'] in sentiment_filter]
     
-    filtered_articles = []
-    for article in articles:
-        if article['published_parsed']:
-            article_time = datetime(*article['published_parsed'][:6])
-            if article_time >= cutoff_time:
-                filtered_articles.append(article)
-        else:
-            filtered_articles.append(article)
-    
-    # Filter by search query
-    if search_query:
-        filtered_articles = [
-            a for a in filtered_articles 
-            if search_query.lower() in a['title'].lower() or 
-               search_query.lower() in a.get('summary', '').lower()
-        ]
+    # Part of every chart cache key
+    filter_state = (search_query, tuple(selected_categories), tuple(sentiment_filter), hours_back, show_breaking)
     
-    # Filter by category
-    filtered_articles = [a for a in filtered_articles if a.get('category', '📰 General') in selected_categories]
+    # Long windows are scanned from the columnar archive with the same filters pushed down
+    archive_table = None
+    if history_days:
+        category_subset = set(selected_categories) != set(all_categories)
+        if category_subset and store.archive.tag() != store.taxonomy.tag:
+            # Archived categories are from an older taxonomy until the background retag finishes
+            st.sidebar.caption("📚 History archive is being retagged; its charts ignore the category filter for now")
+            category_subset = False
+        archive_table = store.archive.scan(
+            time.time() - history_days * 86400,
+            categories=selected_categories if category_subset else None,
+            sentiments=sentiment_filter if len(sentiment_filter) < 3 else None,
+            text=search_query,
+            columns=['date', 'published_ts', 'polarity', 'sentiment', 'category', 'entities'],
+        )
     
-    # Filter by sentiment
-    filtered_articles = [a for a in filtered_articles if a['sentiment'] in sentiment_filter]
+    # Watchlist alerts raised by newly ingested articles
+    alert_sidebar(alert_engine, current_taxonomy().category_names + ['📰 General'])
+    show_alerts(alert_engine)
+    show_feed_changes(feed_tracker)
     
     # Metrics row
     col1, col2, col3, col4, col5 = st.columns(5)
     
+    # Counts come with a materialized view; otherwise they are taken from the filtered list
+    if materialized:
+        sentiment_counts = view.sentiment_counts
+    else:
+        sentiment_counts = Counter(a['sentiment'] for a in filtered_articles)
+    
     with col1:
         st.metric("📰 Total Articles", len(filtered_articles))
     
     with col2:
-        positive_count = sum(1 for a in filtered_articles if a['sentiment'] == 'Positive')
+        positive_count = sentiment_counts['Positive']
         st.metric("😊 Positive", positive_count)
     
     with col3:
-        negative_count = sum(1 for a in filtered_articles if a['sentiment'] == 'Negative')
+        negative_count = sentiment_counts['Negative']
         st.metric("😞 Negative", negative_count)
     
     with col4:
-        neutral_count = sum(1 for a in filtered_articles if a['sentiment'] == 'Neutral')
+        neutral_count = sentiment_counts['Neutral']
         st.metric("😐 Neutral", neutral_count)
     
     with col5:
-        # Count breaking news (last 3 hours)
-        breaking_cutoff = datetime.now() - timedelta(hours=3)
-        breaking_count = sum(1 for a in filtered_articles 
-                           if a.get('published_parsed') and 
-                           datetime(*a['published_parsed'][:6]) >= breaking_cutoff)
-        st.metric("🚨 Breaking", breaking_count)
+        # Count breaking news (first seen in the feed within the last 3 hours)
+        st.metric("🚨 Breaking", feed_tracker.breaking_count(filtered_articles))
     
     # Category distribution
     st.markdown("---")
     st.markdown('<h3 style="color: #8B0000; text-align: center;">📊 Coverage by Category</h3>', 
                 unsafe_allow_html=True)
     
-    category_counts = Counter([a.get('category', '📰 General') for a in filtered_articles])
+    if materialized:
+        category_counts = Counter(view.category_counts)
+    else:
+        category_counts = Counter([a.get('category', '📰 General') for a in filtered_articles])
     
-    cols = st.columns(min(len(category_counts), 5))
-    for idx, (category, count) in enumerate(category_counts.most_common(5)):
-        with cols[idx]:
-            st.markdown(f"""
-                <div style="text-align: center; padding: 10px; background: linear-gradient(135deg, #fff9f9 0%, #ffffff 100%);
-                            border-radius: 10px; border: 2px solid #ffebeb;">
-                    <div style="font-size: 24px;">{category.split()[0]}</div>
-                    <div style="font-size: 20px; font-weight: 700; color: #8B0000;">{count}</div>
-                    <div style="font-size: 12px; color: #666;">{category.split(' ', 1)[1] if ' ' in category else 'Articles'}</div>
-                </div>
-            """, unsafe_allow_html=True)
+    if category_counts:
+        st.markdown(render_category_tiles(category_counts.most_common(5)), unsafe_allow_html=True)
     
     # AI Summary Section
     st.markdown("---")
@@ -586,8 +3518,15 @@ def main():
         if generate_new:
             st.cache_data.clear()
     
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        briefing_period = st.radio("Briefing period", ["Day", "Week"], horizontal=True, key="briefing_period")
+    with col2:
+        briefing_date = st.date_input("Briefing date", value=datetime.now().date(),
+                                      max_value=datetime.now().date(), key="briefing_date")
+    
     with st.spinner("Generating daily briefing from latest headlines..."):
-        summary, article_count = generate_summary(articles)
+        summary, article_count = generate_summary(store, briefing_date, days=7 if briefing_period == "Week" else 1)
     
     st.markdown(f"""
         <div class="summary-box">
@@ -603,8 +3542,8 @@ def main():
     st.markdown("---")
     
     # Tabs for different views
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📋 Headlines", "📊 Analytics", "🔤 Keywords", "📈 Trends", "💡 Insights", "👥 Entities"
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+        "📋 Headlines", "📊 Analytics", "🔤 Keywords", "📈 Trends", "💡 Insights", "👥 Entities", "📅 Compare"
     ])
     
     with tab1:
@@ -618,86 +3557,57 @@ def main():
         elif sort_by == "Sentiment (Negative first)":
             filtered_articles.sort(key=lambda x: x['polarity'])
         
-        # Display articles
-        for idx, article in enumerate(filtered_articles):
-            sentiment_class = f"sentiment-{article['sentiment'].lower()}"
-            pub_time = article['published']
-            category = article.get('category', '📰 General')
-            
-            st.markdown(f"""
-                <div class="headline-card">
-                    <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 10px;">
-                        <span class="headline-title">
-                            <span style="color: #8B0000; font-weight: 800;">#{idx + 1}</span> {article['title']}
-                        </span>
-                        <span style="background: linear-gradient(135deg, #8B0000 0%, #a01010 100%); 
-                                     color: white; padding: 5px 12px; border-radius: 15px; 
-                                     font-size: 12px; white-space: nowrap; margin-left: 10px;">
-                            {category}
-                        </span>
-                    </div>
-                    <div class="headline-meta">
-                        <span class="meta-item">🕐 {pub_time}</span>
-                        <span class="meta-item">
-                            💭 Sentiment: <span class="{sentiment_class}">{article['sentiment']}</span>
-                        </span>
-                        <span class="meta-item" style="color: #8B0000;">
-                            📊 Score: {article['polarity']:.3f}
-                        </span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # Article actions in columns
-            col_a, col_b, col_c = st.columns([1, 1, 2])
-            
+        # One page of cards goes out as a single HTML block
+        pages = max((len(filtered_articles) + HEADLINES_PER_PAGE - 1) // HEADLINES_PER_PAGE, 1)
+        page = st.selectbox("Page", range(1, pages + 1), key="headline_page") if pages > 1 else 1
+        first = (page - 1) * HEADLINES_PER_PAGE
+        page_articles = filtered_articles[first:first + HEADLINES_PER_PAGE]
+        if page_articles:
+            st.markdown(render_headline_cards(page_articles, first_rank=first + 1, tracker=feed_tracker),
+                        unsafe_allow_html=True)
+        
+        # Keyed by link so a panel follows its article when the list reorders
+        def context_flag(article):
+            return f"show_context_{hashlib.blake2b(article['link'].encode(), digest_size=8).hexdigest()}"
+        
+        context_service = get_context_service()
+        shown_flags = {context_flag(article) for article in filtered_articles}
+        if page_articles:
+            col_a, col_b = st.columns([3, 1])
             with col_a:
-                if st.button("📖 Read Article", key=f"read_{idx}"):
-                    st.markdown(f'<meta http-equiv="refresh" content="0;url={article["link"]}">', 
-                              unsafe_allow_html=True)
-                    st.write(f"[Open in new tab]({article['link']})")
-            
+                pick = st.selectbox(
+                    "Background for headline",
+                    range(len(page_articles)),
+                    format_func=lambda i: f"#{first + i + 1} {page_articles[i]['title']}",
+                    key="context_article"
+                )
             with col_b:
-                if st.button("🔍 Get Context", key=f"context_{idx}"):
-                    st.session_state[f'show_context_{idx}'] = True
-            
-            # Show context if requested
-            if st.session_state.get(f'show_context_{idx}', False):
-                with st.spinner("Gathering additional context..."):
-                    topic = extract_main_topic(article['title'])
-                    
-                    # Create search query
-                    search_query = f"{topic} politics news"
-                    
-                    try:
-                        # Import web_search here to avoid errors if not available
-                        from anthropic import Anthropic
-                        
-                        # Use a simple contextual summary
-                        st.markdown(f"""
-                        <div style="background: #f8f9fa; padding: 15px; border-radius: 10px; 
-                                    border-left: 4px solid #8B0000; margin: 10px 0;">
-                            <h4 style="color: #8B0000; margin-bottom: 10px;">📰 Article Context</h4>
-                            <p><strong>Main Topic:</strong> {topic}</p>
-                            <p><strong>Category:</strong> {category}</p>
-                            <p><strong>Sentiment:</strong> {article['sentiment']} ({article['polarity']:.2f})</p>
-                            <p style="margin-top: 10px;">
-                                <a href="{article['link']}" target="_blank" 
-                                   style="color: #8B0000; text-decoration: underline;">
-                                    Read full article on NYT →
-                                </a>
-                            </p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                    except Exception as e:
-                        st.info(f"**Topic:** {topic} | **Category:** {category}")
-            
-            st.markdown("---")
+                if st.button("🔍 Get Context", key="context_show"):
+                    st.session_state[context_flag(page_articles[pick])] = True
+        
+        # Show context for the headlines on this page that asked for it
+        for article in page_articles:
+            if not st.session_state.get(context_flag(article), False):
+                continue
+            st.markdown(f"**{article['title']}**")
+            # No-op when the topic is already cached or being looked up
+            context_service.request(article)
+            if context_service.status(article)[0] == 'pending' and hasattr(st, 'fragment'):
+                # Poll just this panel until the lookup finishes
+                st.fragment(run_every=1)(poll_context_panel)(article, context_service)
+            else:
+                render_context_panel(article, context_service)
+        
+        # Forget context panels for articles that are no longer listed
+        for key in [k for k in st.session_state if k.startswith('show_context_') and k not in shown_flags]:
+            del st.session_state[key]
     
     with tab2:
         st.markdown('<h2 style="color: #8B0000;">Sentiment Analysis</h2>', unsafe_allow_html=True)
         
+        if archive_table is not None:
+            archive_sentiment_view(archive_table, history_label, filter_state)
+        
         col1, col2 = st.columns(2)
         
         with col1:
@@ -708,89 +3618,135 @@ def main():
                 {'Sentiment': 'Negative', 'Count': negative_count}
             ])
             
-            fig_pie = px.pie(
-                sentiment_counts, 
-                values='Count', 
-                names='Sentiment',
-                title='Sentiment Distribution',
-                color='Sentiment',
-                color_discrete_map={
-                    'Positive': '#2d8659',
-                    'Neutral': '#8B8B8B',
-                    'Negative': '#8B0000'
-                },
-                hole=0.4
-            )
-            fig_pie.update_layout(
-                font=dict(family="Inter, sans-serif"),
-                title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif")
-            )
-            st.plotly_chart(fig_pie, use_container_width=True)
+            def build_pie(sentiment_counts):
+                fig_pie = px.pie(
+                    sentiment_counts, 
+                    values='Count', 
+                    names='Sentiment',
+                    title='Sentiment Distribution',
+                    color='Sentiment',
+                    color_discrete_map={
+                        'Positive': '#2d8659',
+                        'Neutral': '#8B8B8B',
+                        'Negative': '#8B0000'
+                    },
+                    hole=0.4
+                )
+                fig_pie.update_layout(**CHART_LAYOUT)
+                return fig_pie
+            
+            show_chart('sentiment_pie', sentiment_counts, build_pie, filter_state)
         
         with col2:
             # Sentiment polarity distribution
-            polarities = [a['polarity'] for a in filtered_articles]
-            fig_hist = go.Figure(data=[go.Histogram(
-                x=polarities, 
-                nbinsx=20,
-                marker_color='#8B0000',
-                marker_line_color='#6b0000',
-                marker_line_width=1.5
-            )])
-            fig_hist.update_layout(
-                title='Sentiment Polarity Distribution',
-                xaxis_title='Polarity Score',
-                yaxis_title='Number of Articles',
-                showlegend=False,
-                font=dict(family="Inter, sans-serif"),
-                title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            st.plotly_chart(fig_hist, use_container_width=True)
+            # Binned here so only the bin counts are sent to the browser
+            polarities = pd.Series([a['polarity'] for a in filtered_articles], dtype=float)
+            if polarities.empty:
+                bins = pd.Series(dtype=int)
+            else:
+                bins = pd.cut(polarities, bins=HISTOGRAM_BINS).value_counts(sort=False)
+            hist_df = pd.DataFrame({
+                'mid': [interval.mid for interval in bins.index],
+                'width': [interval.length for interval in bins.index],
+                'count': bins.values
+            })
+            
+            def build_hist(hist_df):
+                fig_hist = go.Figure(data=[go.Bar(
+                    x=hist_df['mid'],
+                    y=hist_df['count'],
+                    width=hist_df['width'],
+                    marker_color='#8B0000',
+                    marker_line_color='#6b0000',
+                    marker_line_width=1.5
+                )])
+                fig_hist.update_layout(
+                    title='Sentiment Polarity Distribution',
+                    xaxis_title='Polarity Score',
+                    yaxis_title='Number of Articles',
+                    showlegend=False,
+                    **CHART_LAYOUT
+                )
+                return fig_hist
+            
+            show_chart('polarity_hist', hist_df, build_hist, filter_state)
         
         # Timeline view
         if filtered_articles:
             df_timeline = []
             for article in filtered_articles:
-                if article['published_parsed']:
-                    df_timeline.append({
-                        'datetime': datetime(*article['published_parsed'][:6]),
-                        'title': article['title'],
-                        'sentiment': article['sentiment'],
-                        'polarity': article['polarity']
-                    })
+                df_timeline.append({
+                    'datetime': utc_datetime(article['published_ts']),
+                    'title': article['title'],
+                    'sentiment': article['sentiment'],
+                    'polarity': article['polarity']
+                })
             
             if df_timeline:
                 df_timeline = pd.DataFrame(df_timeline)
-                df_timeline['hour'] = df_timeline['datetime'].dt.floor('H')
+                # Bar width adapts to the visible range so the bar count stays bounded
+                bucket = choose_time_bucket(df_timeline['datetime'].min(), df_timeline['datetime'].max())
+                df_timeline['period'] = df_timeline['datetime'].dt.floor(bucket)
                 
-                hourly_sentiment = df_timeline.groupby(['hour', 'sentiment']).size().reset_index(name='count')
+                hourly_sentiment = df_timeline.groupby(['period', 'sentiment']).size().reset_index(name='count')
                 
-                fig_timeline = px.bar(
-                    hourly_sentiment,
-                    x='hour',
-                    y='count',
-                    color='sentiment',
-                    title='Articles Over Time (by Sentiment)',
-                    color_discrete_map={
-                        'Positive': '#2d8659',
-                        'Neutral': '#8B8B8B',
-                        'Negative': '#8B0000'
-                    }
-                )
-                fig_timeline.update_layout(
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                st.plotly_chart(fig_timeline, use_container_width=True)
+                def build_timeline(hourly_sentiment):
+                    fig_timeline = px.bar(
+                        hourly_sentiment,
+                        x='period',
+                        y='count',
+                        color='sentiment',
+                        title='Articles Over Time (by Sentiment)',
+                        color_discrete_map={
+                            'Positive': '#2d8659',
+                            'Neutral': '#8B8B8B',
+                            'Negative': '#8B0000'
+                        }
+                    )
+                    fig_timeline.update_layout(**CHART_LAYOUT)
+                    return fig_timeline
+                
+                show_chart('timeline', hourly_sentiment, build_timeline, filter_state)
+        
+        # Headlines are written to grab attention; the summary often reads differently
+        with_summary = [a for a in filtered_articles if a.get('summary_sentiment')]
+        if with_summary:
+            st.subheader("Headline vs. summary sentiment")
+            df_tone = pd.DataFrame([
+                {'Headline': a['sentiment'], 'Summary': a['summary_sentiment'],
+                 'Gap': a['polarity'] - a['summary_polarity']}
+                for a in with_summary
+            ])
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                st.dataframe(pd.crosstab(df_tone['Headline'], df_tone['Summary']), use_container_width=True)
+            with col2:
+                agree = (df_tone['Headline'] == df_tone['Summary']).mean()
+                st.metric("Same label", f"{agree:.0%}")
+                st.metric("Mean headline − summary polarity", f"{df_tone['Gap'].mean():+.3f}")
     
     with tab3:
         st.markdown('<h2 style="color: #8B0000;">Keyword Analysis</h2>', unsafe_allow_html=True)
         
-        keywords = extract_keywords(filtered_articles, top_n=30)
+        # Spiking terms across stored history, not just the filtered window
+        st.subheader("🔥 Trending now")
+        with store.lock:
+            trending = store.bursts.trending()
+        if trending:
+            st.dataframe(pd.DataFrame([
+                {
+                    'Term': term.split(':', 1)[1],
+                    'Type': term.split(':', 1)[0].title(),
+                    f'Last {BURST_WINDOW_HOURS}h': recent,
+                    'Expected': round(expected, 1),
+                    'Burst score': round(score, 1),
+                }
+                for term, score, recent, expected in trending
+            ]), use_container_width=True, hide_index=True)
+        else:
+            st.info(f"No keyword or entity is spiking above its usual rate in the last {BURST_WINDOW_HOURS} hours.")
+        
+        keywords = extract_keywords(filtered_articles, top_n=30, reference=store.phrases)
         
         col1, col2 = st.columns(2)
         
@@ -798,48 +3754,43 @@ def main():
             # Top keywords bar chart
             if keywords:
                 kw_df = pd.DataFrame(keywords, columns=['Keyword', 'Frequency'])
-                fig_kw = px.bar(
-                    kw_df.head(15),
-                    x='Frequency',
-                    y='Keyword',
-                    orientation='h',
-                    title='Top 15 Keywords',
-                    color='Frequency',
-                    color_continuous_scale=['#ffcccc', '#8B0000']
-                )
-                fig_kw.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                st.plotly_chart(fig_kw, use_container_width=True)
+                
+                def build_keywords(kw_df):
+                    fig_kw = px.bar(
+                        kw_df,
+                        x='Frequency',
+                        y='Keyword',
+                        orientation='h',
+                        title='Top 15 Keywords',
+                        color='Frequency',
+                        color_continuous_scale=['#ffcccc', '#8B0000']
+                    )
+                    fig_kw.update_layout(yaxis={'categoryorder': 'total ascending'}, **CHART_LAYOUT)
+                    return fig_kw
+                
+                show_chart('keywords', kw_df.head(15), build_keywords, filter_state)
         
         with col2:
             # Word cloud-style scatter
             if keywords:
                 kw_df = pd.DataFrame(keywords[:30], columns=['Keyword', 'Frequency'])
-                fig_scatter = px.scatter(
-                    kw_df,
-                    x=range(len(kw_df)),
-                    y='Frequency',
-                    text='Keyword',
-                    size='Frequency',
-                    title='Keyword Bubble View',
-                    color='Frequency',
-                    color_continuous_scale=['#ffcccc', '#8B0000']
-                )
-                fig_scatter.update_traces(textposition='top center')
-                fig_scatter.update_layout(
-                    showlegend=False, 
-                    xaxis={'visible': False},
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                st.plotly_chart(fig_scatter, use_container_width=True)
+                
+                def build_bubbles(kw_df):
+                    fig_scatter = px.scatter(
+                        kw_df,
+                        x=range(len(kw_df)),
+                        y='Frequency',
+                        text='Keyword',
+                        size='Frequency',
+                        title='Keyword Bubble View',
+                        color='Frequency',
+                        color_continuous_scale=['#ffcccc', '#8B0000']
+                    )
+                    fig_scatter.update_traces(textposition='top center')
+                    fig_scatter.update_layout(showlegend=False, xaxis={'visible': False}, **CHART_LAYOUT)
+                    return fig_scatter
+                
+                show_chart('keyword_bubbles', kw_df, build_bubbles, filter_state)
         
         # Keywords table
         st.subheader("All Keywords")
@@ -850,47 +3801,55 @@ def main():
     with tab4:
         st.markdown('<h2 style="color: #8B0000;">Article Trends</h2>', unsafe_allow_html=True)
         
+        if archive_table is not None:
+            archive_trend_view(archive_table, history_label, filter_state)
+        
         # Average sentiment over time
         if filtered_articles:
             df_trends = []
             for article in filtered_articles:
-                if article['published_parsed']:
-                    df_trends.append({
-                        'datetime': datetime(*article['published_parsed'][:6]),
-                        'polarity': article['polarity']
-                    })
+                df_trends.append({
+                    'datetime': utc_datetime(article['published_ts']),
+                    'polarity': article['polarity']
+                })
             
             if df_trends:
                 df_trends = pd.DataFrame(df_trends)
                 df_trends = df_trends.sort_values('datetime')
                 df_trends['rolling_avg'] = df_trends['polarity'].rolling(window=5, min_periods=1).mean()
                 
-                fig_trend = go.Figure()
-                fig_trend.add_trace(go.Scatter(
-                    x=df_trends['datetime'],
-                    y=df_trends['polarity'],
-                    mode='markers',
-                    name='Individual Articles',
-                    marker=dict(size=8, opacity=0.5, color='#a01010')
-                ))
-                fig_trend.add_trace(go.Scatter(
-                    x=df_trends['datetime'],
-                    y=df_trends['rolling_avg'],
-                    mode='lines',
-                    name='5-Article Moving Average',
-                    line=dict(color='#8B0000', width=3)
-                ))
-                fig_trend.update_layout(
-                    title='Sentiment Trend Over Time',
-                    xaxis_title='Time',
-                    yaxis_title='Sentiment Polarity',
-                    hovermode='x unified',
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                st.plotly_chart(fig_trend, use_container_width=True)
+                # Only a shape-preserving subset of points is plotted for long histories
+                df_points = downsample_line(df_trends, 'datetime', 'polarity')
+                df_line = downsample_line(df_trends, 'datetime', 'rolling_avg')
+                sampled = len(df_points) < len(df_trends)
+                
+                def build_trend(data):
+                    df_points, df_line, sampled = data
+                    fig_trend = go.Figure()
+                    fig_trend.add_trace(go.Scatter(
+                        x=df_points['datetime'],
+                        y=df_points['polarity'],
+                        mode='markers',
+                        name='Individual Articles (sampled)' if sampled else 'Individual Articles',
+                        marker=dict(size=8, opacity=0.5, color='#a01010')
+                    ))
+                    fig_trend.add_trace(go.Scatter(
+                        x=df_line['datetime'],
+                        y=df_line['rolling_avg'],
+                        mode='lines',
+                        name='5-Article Moving Average',
+                        line=dict(color='#8B0000', width=3)
+                    ))
+                    fig_trend.update_layout(
+                        title='Sentiment Trend Over Time',
+                        xaxis_title='Time',
+                        yaxis_title='Sentiment Polarity',
+                        hovermode='x unified',
+                        **CHART_LAYOUT
+                    )
+                    return fig_trend
+                
+                show_chart('trend', (df_points, df_line, sampled), build_trend, filter_state)
         
         # Publication frequency
         col1, col2 = st.columns(2)
@@ -899,30 +3858,102 @@ def main():
             if filtered_articles:
                 df_freq = []
                 for article in filtered_articles:
-                    if article['published_parsed']:
-                        df_freq.append({
-                            'hour': datetime(*article['published_parsed'][:6]).hour
-                        })
+                    df_freq.append({
+                        'hour': utc_datetime(article['published_ts']).hour
+                    })
                 
                 if df_freq:
                     df_freq = pd.DataFrame(df_freq)
-                    hour_counts = df_freq['hour'].value_counts().sort_index()
+                    hour_counts = df_freq['hour'].value_counts().sort_index().reset_index()
+                    hour_counts.columns = ['hour', 'count']
                     
-                    fig_hours = px.bar(
-                        x=hour_counts.index,
-                        y=hour_counts.values,
-                        title='Articles by Hour of Day',
-                        labels={'x': 'Hour', 'y': 'Number of Articles'},
-                        color=hour_counts.values,
-                        color_continuous_scale=['#ffcccc', '#8B0000']
-                    )
-                    fig_hours.update_layout(
-                        font=dict(family="Inter, sans-serif"),
-                        title_font=dict(size=20, color='#8B0000', family="Playfair Display, serif"),
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)'
+                    def build_hours(hour_counts):
+                        fig_hours = px.bar(
+                            x=hour_counts['hour'],
+                            y=hour_counts['count'],
+                            title='Articles by Hour of Day',
+                            labels={'x': 'Hour', 'y': 'Number of Articles'},
+                            color=hour_counts['count'],
+                            color_continuous_scale=['#ffcccc', '#8B0000']
+                        )
+                        fig_hours.update_layout(**CHART_LAYOUT)
+                        return fig_hours
+                    
+                    show_chart('hours', hour_counts, build_hours, filter_state)
+        
+        # Long-horizon sentiment served by the streaming time-series engine
+        st.markdown("---")
+        st.markdown('<h3 style="color: #8B0000;">📉 Long-horizon Sentiment</h3>', unsafe_allow_html=True)
+        
+        with store.lock:
+            series_names = store.timeseries.names()
+        if series_names:
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                series_name = st.selectbox("Series", series_names, key="ts_series")
+            with col2:
+                resolution = st.radio("Resolution", ["Hourly (7 days)", "Daily (90 days)"],
+                                      horizontal=True, key="ts_resolution")
+            
+            if resolution.startswith("Hourly"):
+                bucket_hours, span_hours = 1, 7 * 24
+                rolling_window, rolling_label = 24, '24-Hour Moving Average'
+            else:
+                bucket_hours, span_hours = 24, 90 * 24
+                rolling_window, rolling_label = 7, '7-Day Moving Average'
+            
+            # Everything is read from the series under the lock, since ingestion keeps adding to it
+            now = time.time()
+            with store.lock:
+                series = store.timeseries.series[series_name]
+                windows = [(label, series.window(seconds, now=now)) for label, seconds in SENTIMENT_WINDOWS.items()]
+                ewma = series.ewma
+                rows = series.resample(bucket_hours, span_hours, now=now)
+            
+            window_cols = st.columns(len(SENTIMENT_WINDOWS) + 1)
+            for col, (label, (mean, count)) in zip(window_cols, windows):
+                with col:
+                    st.metric(f"Avg {label}", f"{mean:.3f}" if mean is not None else "—",
+                              help=f"{count} articles")
+            with window_cols[-1]:
+                st.metric("EWMA (24h half-life)", f"{ewma:.3f}")
+            
+            if rows:
+                df_series = pd.DataFrame(rows, columns=['period', 'polarity', 'articles'])
+                # Article-weighted moving average over the resampled buckets
+                weighted = (df_series['polarity'] * df_series['articles']).rolling(rolling_window, min_periods=1).sum()
+                df_series['rolling_avg'] = weighted / df_series['articles'].rolling(rolling_window, min_periods=1).sum()
+                
+                def build_series(data):
+                    df_series, series_name, rolling_label = data
+                    fig_series = go.Figure()
+                    fig_series.add_trace(go.Bar(
+                        x=df_series['period'],
+                        y=df_series['polarity'],
+                        name='Mean Polarity',
+                        marker_color='#e8b4b4',
+                        customdata=df_series['articles'],
+                        hovertemplate='%{y:.3f} (%{customdata} articles)'
+                    ))
+                    fig_series.add_trace(go.Scatter(
+                        x=df_series['period'],
+                        y=df_series['rolling_avg'],
+                        mode='lines',
+                        name=rolling_label,
+                        line=dict(color='#8B0000', width=3)
+                    ))
+                    fig_series.update_layout(
+                        title=f'{series_name} Sentiment',
+                        xaxis_title='Time (UTC)',
+                        yaxis_title='Sentiment Polarity',
+                        hovermode='x unified',
+                        **CHART_LAYOUT
                     )
-                    st.plotly_chart(fig_hours, use_container_width=True)
+                    return fig_series
+                
+                show_chart('sentiment_series', (df_series, series_name, rolling_label), build_series)
+            else:
+                st.info("No articles in this series for the selected period")
     
     with tab5:
         st.markdown('<h2 style="color: #8B0000;">Key Insights</h2>', unsafe_allow_html=True)
@@ -964,7 +3995,7 @@ def main():
                 """, unsafe_allow_html=True)
         
         with col2:
-            top_keywords = extract_keywords(filtered_articles, top_n=5)
+            top_keywords = extract_keywords(filtered_articles, top_n=5, reference=store.phrases)
             keyword_list = ", ".join([f"<strong>{kw[0]}</strong>" for kw in top_keywords])
             
             st.markdown(f"""
@@ -1039,8 +4070,14 @@ def main():
         st.markdown('<h2 style="color: #8B0000;">Entity Tracking</h2>', unsafe_allow_html=True)
         st.markdown("Track mentions of key political figures, locations, and organizations in today's headlines.")
         
+        if archive_table is not None:
+            archive_entity_view(archive_table, history_label, filter_state)
+        
         # Extract entities
-        politicians, locations, organizations = extract_entities(filtered_articles)
+        if materialized:
+            politicians, locations, organizations = group_entity_mentions(view.entity_mentions)
+        else:
+            politicians, locations, organizations = extract_entities(filtered_articles)
         
         # Display in three columns
         col1, col2, col3 = st.columns(3)
@@ -1051,33 +4088,18 @@ def main():
             if politicians:
                 # Create bar chart
                 pol_df = pd.DataFrame(list(politicians.items())[:10], columns=['Name', 'Mentions'])
-                fig_pol = px.bar(
-                    pol_df,
+                show_chart('politicians', pol_df, lambda df: px.bar(
+                    df,
                     x='Mentions',
                     y='Name',
                     orientation='h',
                     title='Top Politicians Mentioned',
                     color='Mentions',
                     color_continuous_scale=['#ffcccc', '#8B0000']
-                )
-                fig_pol.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=16, color='#8B0000'),
-                    height=400,
-                    showlegend=False
-                )
-                st.plotly_chart(fig_pol, use_container_width=True)
+                ).update_layout(**ENTITY_CHART_LAYOUT), filter_state)
                 
                 # List view
-                for name, count in list(politicians.items())[:5]:
-                    st.markdown(f"""
-                        <div style="background: #f8f9fa; padding: 10px; margin: 5px 0; 
-                                    border-radius: 8px; display: flex; justify-content: space-between;">
-                            <span style="font-weight: 600;">{name}</span>
-                            <span class="stat-badge" style="font-size: 12px;">{count} mentions</span>
-                        </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(render_count_rows(list(politicians.items())[:5], 'mentions'), unsafe_allow_html=True)
             else:
                 st.info("No political figures mentioned in filtered articles")
         
@@ -1087,33 +4109,18 @@ def main():
             if locations:
                 # Create bar chart
                 loc_df = pd.DataFrame(list(locations.items())[:10], columns=['Location', 'Mentions'])
-                fig_loc = px.bar(
-                    loc_df,
+                show_chart('locations', loc_df, lambda df: px.bar(
+                    df,
                     x='Mentions',
                     y='Location',
                     orientation='h',
                     title='Top Locations Mentioned',
                     color='Mentions',
                     color_continuous_scale=['#ffcccc', '#8B0000']
-                )
-                fig_loc.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=16, color='#8B0000'),
-                    height=400,
-                    showlegend=False
-                )
-                st.plotly_chart(fig_loc, use_container_width=True)
+                ).update_layout(**ENTITY_CHART_LAYOUT), filter_state)
                 
                 # List view
-                for name, count in list(locations.items())[:5]:
-                    st.markdown(f"""
-                        <div style="background: #f8f9fa; padding: 10px; margin: 5px 0; 
-                                    border-radius: 8px; display: flex; justify-content: space-between;">
-                            <span style="font-weight: 600;">{name}</span>
-                            <span class="stat-badge" style="font-size: 12px;">{count} mentions</span>
-                        </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(render_count_rows(list(locations.items())[:5], 'mentions'), unsafe_allow_html=True)
             else:
                 st.info("No locations mentioned in filtered articles")
         
@@ -1123,33 +4130,18 @@ def main():
             if organizations:
                 # Create bar chart
                 org_df = pd.DataFrame(list(organizations.items())[:10], columns=['Organization', 'Mentions'])
-                fig_org = px.bar(
-                    org_df,
+                show_chart('organizations', org_df, lambda df: px.bar(
+                    df,
                     x='Mentions',
                     y='Organization',
                     orientation='h',
                     title='Top Organizations Mentioned',
                     color='Mentions',
                     color_continuous_scale=['#ffcccc', '#8B0000']
-                )
-                fig_org.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    font=dict(family="Inter, sans-serif"),
-                    title_font=dict(size=16, color='#8B0000'),
-                    height=400,
-                    showlegend=False
-                )
-                st.plotly_chart(fig_org, use_container_width=True)
+                ).update_layout(**ENTITY_CHART_LAYOUT), filter_state)
                 
                 # List view
-                for name, count in list(organizations.items())[:5]:
-                    st.markdown(f"""
-                        <div style="background: #f8f9fa; padding: 10px; margin: 5px 0; 
-                                    border-radius: 8px; display: flex; justify-content: space-between;">
-                            <span style="font-weight: 600;">{name}</span>
-                            <span class="stat-badge" style="font-size: 12px;">{count} mentions</span>
-                        </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(render_count_rows(list(organizations.items())[:5], 'mentions'), unsafe_allow_html=True)
             else:
                 st.info("No organizations mentioned in filtered articles")
         
@@ -1184,6 +4176,112 @@ def main():
                         <p>Mentioned in <strong>{top_location[1]}</strong> headlines</p>
                     </div>
                 """, unsafe_allow_html=True)
+        
+        # Co-occurrence from the per-article index over stored history
+        st.markdown("---")
+        st.markdown('<h3 style="color: #8B0000;">🕸️ Co-mentioned Entities</h3>', unsafe_allow_html=True)
+        
+        cooc_days = st.slider("Look back N days", 1, 30, 7, key="cooc_days")
+        # Read under the lock: other sessions and the background catch-up add to the index
+        with store.lock:
+            mention_counts = store.cooccurrence.mention_counts(days=cooc_days)
+            top_pairs = store.cooccurrence.top_pairs(days=cooc_days)
+        
+        if mention_counts:
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                focus_entity = st.selectbox(
+                    "Entity",
+                    [entity for entity, _ in mention_counts.most_common()],
+                    key="cooc_entity"
+                )
+                with store.lock:
+                    comentions = store.cooccurrence.top_comentions(focus_entity, days=cooc_days)
+                
+                if comentions:
+                    cooc_df = pd.DataFrame(comentions, columns=['Entity', 'Shared Headlines'])
+                    show_chart('cooccurrence', (cooc_df, focus_entity), lambda data: px.bar(
+                        data[0],
+                        x='Shared Headlines',
+                        y='Entity',
+                        orientation='h',
+                        title=f'Mentioned Alongside {data[1]}',
+                        color='Shared Headlines',
+                        color_continuous_scale=['#ffcccc', '#8B0000']
+                    ).update_layout(**ENTITY_CHART_LAYOUT))
+                else:
+                    st.info(f"{focus_entity} has not shared a headline with another tracked entity in the last {cooc_days} days")
+            
+            with col2:
+                st.markdown('<h4 style="color: #8B0000;">Top Pairs</h4>', unsafe_allow_html=True)
+                if top_pairs:
+                    st.markdown(render_count_rows([(f"{a} + {b}", count) for (a, b), count in top_pairs], 'headlines'),
+                                unsafe_allow_html=True)
+                else:
+                    st.info("No entity pairs found in this period")
+        else:
+            st.info(f"No tracked entities mentioned in the last {cooc_days} days")
+    
+    with tab7:
+        st.markdown('<h2 style="color: #8B0000;">Period Comparison</h2>', unsafe_allow_html=True)
+        st.markdown("Compare a day's coverage with the previous day and the same day a week earlier.")
+        
+        rollups = get_rollup_store()
+        rollups.close_days(store)
+        
+        compare_date = st.date_input("Day to compare", value=datetime.now().date(),
+                                     max_value=datetime.now().date(), key="compare_date")
+        compare_day = (compare_date - datetime(1970, 1, 1).date()).days
+        current = rollups.get(compare_day, store)
+        baselines = [
+            ("Previous day", rollups.get(compare_day - 1, store)),
+            ("Same day last week", rollups.get(compare_day - 7, store)),
+        ]
+        
+        if current is None:
+            st.info("No stored articles for this day")
+        else:
+            def share(rollup, sentiment):
+                return rollup['sentiments'].get(sentiment, 0) / rollup['count'] * 100 if rollup['count'] else 0.0
+            
+            for label, baseline in baselines:
+                st.markdown(f'<h4 style="color: #8B0000;">vs {label}</h4>', unsafe_allow_html=True)
+                if baseline is None:
+                    st.caption(f"No stored articles for the {label.lower()}")
+                    continue
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("📰 Articles", current['count'], current['count'] - baseline['count'])
+                with col2:
+                    st.metric("😊 Positive share", f"{share(current, 'Positive'):.1f}%",
+                              f"{share(current, 'Positive') - share(baseline, 'Positive'):+.1f} pts")
+                with col3:
+                    st.metric("😞 Negative share", f"{share(current, 'Negative'):.1f}%",
+                              f"{share(current, 'Negative') - share(baseline, 'Negative'):+.1f} pts",
+                              delta_color="inverse")
+                with col4:
+                    st.metric("📊 Mean polarity", f"{current['mean_polarity']:.3f}",
+                              f"{current['mean_polarity'] - baseline['mean_polarity']:+.3f}")
+            
+            col1, col2, col3 = st.columns(3)
+            for col, field, title, column in [(col1, 'categories', 'Categories', 'Category'),
+                                              (col2, 'entities', 'Entities', 'Entity'),
+                                              (col3, 'keywords', 'Keywords', 'Keyword')]:
+                with col:
+                    st.markdown(f'<h4 style="color: #8B0000;">{title}</h4>', unsafe_allow_html=True)
+                    rows = []
+                    for name, count in sorted(current[field].items(), key=lambda x: x[1], reverse=True)[:10]:
+                        row = {column: name, 'Count': count}
+                        for label, baseline in baselines:
+                            if baseline is not None:
+                                row[f"Δ {label.lower()}"] = count - baseline[field].get(name, 0)
+                        rows.append(row)
+                    if rows:
+                        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    
+    cache_diagnostics(store)
     
     # Footer
     st.sidebar.markdown("---")
@@ -1199,7 +4297,9 @@ def main():
                 'Link': a['link'],
                 'Published': a['published'],
                 'Sentiment': a['sentiment'],
-                'Polarity': a['polarity']
+                'Polarity': a['polarity'],
+                'Summary Sentiment': a.get('summary_sentiment'),
+                'Summary Polarity': a.get('summary_polarity')
             }
             for a in filtered_articles
         ])
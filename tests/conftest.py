@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Keep the app's data files out of the working tree
+os.environ.setdefault('NYT_DASHBOARD_DATA', tempfile.mkdtemp(prefix='nyt-dashboard-tests-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
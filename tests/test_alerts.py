@@ -0,0 +1,25 @@
+import streamlit_app as app
+
+
+def headline(title):
+    return {'title': title, 'link': 'http://x/1', 'entities': (), 'category': '📰 General',
+            'sentiment': 'Neutral'}
+
+
+def test_overlapping_keywords_fire_every_rule():
+    engine = app.AlertEngine()
+    engine.add_rule('House', ['house'])
+    engine.add_rule('White House', ['White House'])
+    engine.add_rule('House budget', ['house', 'budget'])
+    
+    fired = {rule['name'] for rule in engine.match(headline("White House budget fight"))}
+    
+    assert fired == {'House', 'White House', 'House budget'}
+    assert {rule['name'] for rule in engine.match(headline("Housing bill stalls"))} == set()
+
+
+def test_rule_ids_are_unique():
+    engine = app.AlertEngine()
+    ids = {engine.add_rule(f"rule {i}", ['senate'])['id'] for i in range(50)}
+    
+    assert len(ids) == 50
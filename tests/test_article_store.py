@@ -0,0 +1,43 @@
+import time
+
+import streamlit_app as app
+
+
+def feed_article(i, title=None):
+    return {'title': title or f"Senate votes on bill {i}", 'link': f"http://x/{i}", 'published': '',
+            'summary': f"summary {i}", 'published_parsed': time.gmtime(time.time() - 3600)}
+
+
+def test_shared_log_lines_are_not_revisions(tmp_path):
+    log = str(tmp_path / 'articles.jsonl')
+    a = app.ArticleStore(log)
+    b = app.ArticleStore(log)
+    a.ingest([feed_article(1)])
+    b.catch_up()
+    b.ingest([feed_article(2)])
+    # Both processes fetched the same new item
+    a.ingest([feed_article(3)])
+    b.ingest([feed_article(3)])
+    
+    revised = []
+    a.revision_listeners.append(revised.extend)
+    b.revision_listeners.append(revised.extend)
+    a.catch_up()
+    b.catch_up()
+    
+    assert sorted(a.articles) == sorted(b.articles) == ['http://x/1', 'http://x/2', 'http://x/3']
+    assert not a.revised and not b.revised and not revised
+
+
+def test_reworded_log_line_is_a_revision(tmp_path):
+    log = str(tmp_path / 'articles.jsonl')
+    a = app.ArticleStore(log)
+    b = app.ArticleStore(log)
+    a.ingest([feed_article(1)])
+    b.catch_up()
+    a.revise([feed_article(1, "Senate passes bill 1")])
+    
+    b.catch_up()
+    
+    assert [key for _, key in b.revised] == ['http://x/1']
+    assert b.articles['http://x/1']['title'] == "Senate passes bill 1"